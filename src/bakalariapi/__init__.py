@@ -2,6 +2,7 @@
 
 Modul primárně exportuje:
 BakalariAPI - Základní classa pro práci s BakalářiAPI
+AsyncBakalariAPI - Asynchroní obal BakalariAPI
 GetMode - Enum sloužící pro specifikování módu při získávání dat
 Looting - Třída pro správu získaných dat
 SeleniumHandler - Classa obsahující nastavení Selenia
@@ -10,10 +11,12 @@ Browser - Enum pro SeleniumHandler
 
 __all__ = [
     "BakalariAPI",
+    "AsyncBakalariAPI",
     "GetMode",
     "Looting",
     "SeleniumHandler",
     "Browser",
+    "CancellationToken",
     # From .objects:
     "ServerInfo",
     "UserInfo",
@@ -32,16 +35,24 @@ __all__ = [
 __version__ = "4.0.0"
 
 from . import (
+    archive,
+    asyncapi,
     bakalari,
+    cache,
+    cancellation,
     exceptions,
     looting,
     modules,
     objects,
+    resilience,
     seleniumhandler,
     serialization,
     sessions,
+    transport,
 )
+from .asyncapi import AsyncBakalariAPI
 from .bakalari import BakalariAPI, GetMode
+from .cancellation import CancellationToken
 from .looting import Looting
 from .objects import (
     BakalariFile,
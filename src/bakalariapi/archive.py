@@ -0,0 +1,191 @@
+"""Modul obsahující archiv surových dat (odpovědí serveru) a jejich opětovné parsování.
+
+Tento modul primárně implementuje:
+    RawArchive - Archiv surových dat `GetterOutput`ů (viz `BakalariAPI.archive`)
+    reparse - Sestavení `Looting` instance z archivu pomocí současných parserů (bez jediného requestu)
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from threading import Lock
+from typing import Any, Iterator
+
+from .bakalari import _html_output, _json_output, _parse
+from .looting import GetterOutput, Looting
+
+__all__ = ["RawArchive", "ArchiveEntry", "reparse"]
+
+
+class ArchiveEntry:
+    """Záznam v indexu archivu.
+
+    Atributy:
+        time:
+            Čas, kdy byla data archivována.
+        endpoint:
+            Endpoint, ze kterého data pochází.
+        type:
+            Typ dat - "html" nebo "json".
+        digest:
+            SHA-256 hash surových dat (a zároveň jejich adresa v archivu).
+    """
+
+    def __init__(self, time: datetime, endpoint: str, type_: str, digest: str):
+        self.time: datetime = time
+        self.endpoint: str = endpoint
+        self.type: str = type_
+        self.digest: str = digest
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "time": self.time.isoformat(),
+            "endpoint": self.endpoint,
+            "type": self.type,
+            "digest": self.digest,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> ArchiveEntry:
+        return cls(
+            datetime.fromisoformat(data["time"]),
+            data["endpoint"],
+            data["type"],
+            data["digest"],
+        )
+
+
+class RawArchive:
+    """Archiv surových dat `GetterOutput`ů.
+
+    Surová data se ukládají komprimovaná (gzip) a adresovaná svým SHA-256 hashem, takže stejná data
+    (např. nezměněná stránka) se uloží pouze jednou. Každé archivování se zapíše do indexu ("index.jsonl")
+    s časem a endpointem, takže lze data později znovu naparsovat (viz `reparse()`), např. po opravě parseru.
+    Pozn.: Archiv obsahuje osobní data, takže se soubory vytváří s právy pouze pro vlastníka.
+
+    Atributy:
+        directory:
+            Adresář archivu.
+        compresslevel:
+            Úroveň komprese (viz `gzip.compress()`).
+    """
+
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, directory: str, compresslevel: int = 6):
+        self.directory: str = directory
+        self.compresslevel: int = compresslevel
+        self.__lock = Lock()
+        os.makedirs(os.path.join(directory, "objects"), mode=0o700, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".gz")
+
+    def store(self, getter_output: GetterOutput) -> ArchiveEntry | None:
+        """Uloží surová data daného GetterOutput(u) do archivu.
+
+        Args:
+            getter_output:
+                GetterOutput, jehož surová data se mají uložit.
+
+        Returns:
+            Záznam v indexu archivu; Pokud GetterOutput nemá surová data, vrátí `None`.
+        """
+        if getter_output.raw is None:
+            return None
+        digest = hashlib.sha256(getter_output.raw).hexdigest()
+        entry = ArchiveEntry(
+            datetime.now(),
+            getter_output.endpoint,
+            # `type` místo `data`, ať se kvůli archivaci zbytečně neparsují ještě nenaparsovaná data
+            "json" if getter_output.type is dict else "html",
+            digest,
+        )
+        path = self._path(digest)
+        with self.__lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+                tmp = path + ".tmp"
+                with open(
+                    os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb"
+                ) as f:
+                    f.write(gzip.compress(getter_output.raw, self.compresslevel))
+                os.replace(tmp, path)
+            with open(
+                os.open(
+                    os.path.join(self.directory, self.INDEX_FILE),
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                    0o600,
+                ),
+                "a",
+                encoding="utf-8",
+            ) as f:
+                f.write(json.dumps(entry.to_json()) + "\n")
+        return entry
+
+    def entries(self, endpoint: str | None = None) -> Iterator[ArchiveEntry]:
+        """Vrátí záznamy z indexu archivu (v pořadí, v jakém byla data archivována).
+
+        Args:
+            endpoint:
+                Pokud není `None`, vrátí pouze záznamy daného endpointu.
+        """
+        try:
+            f = open(os.path.join(self.directory, self.INDEX_FILE), encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if line.strip() == "":
+                    continue
+                entry = ArchiveEntry.from_json(json.loads(line))
+                if endpoint is None or entry.endpoint == endpoint:
+                    yield entry
+
+    def load(self, entry: ArchiveEntry) -> bytes:
+        """Načte surová data daného záznamu."""
+        with open(self._path(entry.digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def getter_output(self, entry: ArchiveEntry) -> GetterOutput:
+        """Sestaví z daného záznamu GetterOutput (stejný, jaký vytvořil getter při archivaci)."""
+        raw = self.load(entry)
+        if entry.type == "json":
+            return _json_output(entry.endpoint, raw)
+        return _html_output(entry.endpoint, raw)
+
+
+def reparse(
+    archive: RawArchive,
+    looting: Looting | None = None,
+    endpoint: str | None = None,
+) -> Looting:
+    """Znovu naparsuje archivovaná data pomocí současných (registrovaných) parserů.
+
+    Data se parsují v pořadí, v jakém byla archivována, a objektům se nastaví `_date` na čas archivace,
+    takže výsledek odpovídá tomu, jako by se data v danou dobu získala ze serveru. Nevykoná se žádný request.
+
+    Args:
+        archive:
+            Archiv, jehož data se mají naparsovat.
+        looting:
+            `Looting` instance, do které se mají výsledky přidat. Pokud `None`, vytvoří se nová.
+        endpoint:
+            Pokud není `None`, naparsují se pouze data daného endpointu.
+
+    Returns:
+        `Looting` instance s naparsovanými objekty.
+    """
+    if looting is None:
+        looting = Looting()
+    for entry in archive.entries(endpoint):
+        result_set = _parse(archive.getter_output(entry))
+        for lst in result_set.data.values():
+            for o in lst:
+                o._date = entry.time
+        looting.add_result_set(result_set)
+    return looting
@@ -0,0 +1,353 @@
+"""Modul obsahující asynchroní rozhraní BakalářiAPI.
+
+Tento modul primárně implementuje:
+    AsyncBakalariAPI - Asynchroní obal `BakalariAPI` instance
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from . import cancellation, exceptions
+from .bakalari import BakalariAPI, GetMode, _completed_results, _resolve_one
+from .looting import ResultSet
+from .modules import komens, meetings
+from .objects import (
+    BakalariObj,
+    Grade,
+    Homework,
+    Komens,
+    Meeting,
+    Student,
+    UnresolvedID,
+)
+
+__all__ = ["AsyncBakalariAPI"]
+
+T = TypeVar("T")
+
+
+class AsyncBakalariAPI:
+    """Asynchroní obal `BakalariAPI` instance.
+
+    Metody mají stejné parametry jako metody `BakalariAPI`, ale jsou to coroutiny, takže jedna event loopa
+    může najednou obsluhovat mnoho dotazů (i pro více účtů/`BakalariAPI` instancí).
+    Používají se stejné gettery, parsery, resolvery, `SessionManager` i `Looting` jako u obalené instance.
+
+    Jelikož `requests` modul je blokující, vykonávají se blokující části (requesty a parsování) v executoru
+    event loopu. Resolvování neprobíhá přes thread pool `BakalariAPI._resolve()`, ale každé `UnresolvedID`
+    se resolvuje jako samostatná úloha v event loopě, takže se počet najednou běžících resolverů
+    omezuje pouze atributem `max_concurrency` (a velikostí executoru).
+
+    Zrušení úlohy (např. přes `asyncio.wait_for()`) se do blokujících částí propaguje přes `cancellation.CancellationToken`,
+    takže rozběhnuté gettery a resolvery skončí nejpozději před dalším requestem. Token aktivní v kontextu úlohy
+    (resp. předaný parametrem `token`) se do blokujících částí propaguje také.
+
+    Atributy:
+        api:
+            Obalená `BakalariAPI` instance.
+        executor:
+            Executor, ve kterém se vykonávají blokující části.
+            Pokud je `None`, použije se výchozí executor event loopu.
+        max_concurrency:
+            Maximální počet resolverů, které mohou (v rámci této instance) běžet najednou.
+    """
+
+    def __init__(
+        self,
+        bakalariAPI: BakalariAPI,
+        executor: Executor | None = None,
+        max_concurrency: int = 16,
+    ):
+        self.api: BakalariAPI = bakalariAPI
+        self.executor: Executor | None = executor
+        self.max_concurrency: int = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Vykoná danou (blokující) funkci v executoru a vrátí její výsledek."""
+        token = cancellation.CancellationToken(parent=cancellation.current())
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                partial(cancellation.run_with, token, func, *args, **kwargs),
+            )
+        except asyncio.CancelledError:
+            # Samotný thread zrušit nejde, takže ho alespoň necháme skončit před dalším requestem
+            token.cancel()
+            raise
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semafor se musí vytvořit až v běžící event loopě
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def init(self):
+        """Asynchroní varianta `BakalariAPI.init()`."""
+        await self._run(self.api.init)
+
+    async def is_server_running(self) -> bool:
+        """Asynchroní varianta `BakalariAPI.is_server_running()`."""
+        return await self._run(self.api.is_server_running)
+
+    async def is_login_valid(self) -> bool:
+        """Asynchroní varianta `BakalariAPI.is_login_valid()`."""
+        return await self._run(self.api.is_login_valid)
+
+    # GRADES
+    async def get_grades(self, mode: GetMode, **kwargs) -> list[Grade]:
+        """Asynchroní varianta `BakalariAPI.get_grades()`."""
+        return await self._run(self.api.get_grades, mode, **kwargs)
+
+    async def get_all_grades(self) -> list[Grade]:
+        """Asynchroní varianta `BakalariAPI.get_all_grades()`."""
+        return await self._run(self.api.get_all_grades)
+
+    # HOMEWORKS
+    async def get_homeworks(self, mode: GetMode, **kwargs) -> list[Homework]:
+        """Asynchroní varianta `BakalariAPI.get_homeworks()`."""
+        return await self._run(self.api.get_homeworks, mode, **kwargs)
+
+    async def get_all_homeworks(self) -> list[Homework]:
+        """Asynchroní varianta `BakalariAPI.get_all_homeworks()`."""
+        return await self._run(self.api.get_all_homeworks)
+
+    # MEETINGS
+    async def get_meetings(self, mode: GetMode, **kwargs) -> list[Meeting]:
+        """Asynchroní varianta `BakalariAPI.get_meetings()`."""
+        token = kwargs.pop("token", None)
+        if token is not None:
+            with token:
+                return await self.get_meetings(mode, **kwargs)
+
+        if mode == GetMode.CACHED:
+            return self.api.looting.get(Meeting)
+        elif mode == GetMode.FRESH:
+            if self.api.is_partial_init:
+                raise exceptions.PartialInitError()
+            if "from_date" in kwargs:
+                getter_output = await self._run(
+                    meetings.getter_meetings_ids,
+                    self.api,
+                    kwargs["from_date"],
+                    kwargs["to_date"],
+                )
+            else:
+                getter_output = await self._run(
+                    meetings.getter_future_meetings_ids, self.api
+                )
+            unresolved = (await self._run(self.api._parse, getter_output)).get(
+                UnresolvedID
+            )
+            return (await self._resolve(unresolved)).get(Meeting)
+        elif mode == GetMode.CACHED_OR_FRESH:
+            if self.api.is_fresh(Meeting):
+                return await self.get_meetings(GetMode.CACHED)
+            return await self.get_meetings(GetMode.FRESH, **kwargs)
+        elif mode == GetMode.STALE_WHILE_REVALIDATE:
+            output = await self.get_meetings(GetMode.CACHED)
+            if len(output) == 0:
+                return await self.get_meetings(GetMode.FRESH, **kwargs)
+            if not self.api.is_fresh(Meeting):
+                if self.api.is_partial_init:
+                    raise exceptions.PartialInitError()
+                # Načtení na pozadí sdílí deduplikaci s `BakalariAPI`
+                self.api._revalidate(
+                    Meeting, partial(self.api.get_meetings, GetMode.FRESH, **kwargs)
+                )
+            return output
+        raise ValueError
+
+    async def get_all_meetings(self) -> list[Meeting]:
+        """Asynchroní varianta `BakalariAPI.get_all_meetings()`."""
+        return await self.get_meetings(
+            GetMode.FRESH,
+            from_date=datetime(1, 1, 1),
+            to_date=datetime(9999, 12, 31, 23, 59, 59),
+        )
+
+    # STUDENTS
+    async def get_students(self, mode: GetMode) -> list[Student]:
+        """Asynchroní varianta `BakalariAPI.get_students()`."""
+        return await self._run(self.api.get_students, mode)
+
+    # KOMENS
+    async def get_komens(self, mode: GetMode, **kwargs) -> list[Komens]:
+        """Asynchroní varianta `BakalariAPI.get_komens()`."""
+        token = kwargs.pop("token", None)
+        if token is not None:
+            with token:
+                return await self.get_komens(mode, **kwargs)
+
+        kwargs = {"from_date": None, "to_date": None, "limit": None, **kwargs}
+
+        if mode == GetMode.CACHED:
+            return self.api.looting.get(Komens)
+        elif mode == GetMode.FRESH:
+            if self.api.is_partial_init:
+                raise exceptions.PartialInitError()
+            getter_output = await self._run(
+                komens.getter_komens_ids,
+                self.api,
+                kwargs["from_date"],
+                kwargs["to_date"],
+            )
+            unresolved = (await self._run(self.api._parse, getter_output)).get(
+                UnresolvedID
+            )[: kwargs["limit"]]
+            return (await self._resolve(unresolved)).get(Komens)
+        elif mode == GetMode.CACHED_OR_FRESH:
+            if self.api.is_fresh(Komens):
+                return await self.get_komens(GetMode.CACHED)
+            return await self.get_komens(GetMode.FRESH, **kwargs)
+        elif mode == GetMode.STALE_WHILE_REVALIDATE:
+            output = await self.get_komens(GetMode.CACHED)
+            if len(output) == 0:
+                return await self.get_komens(GetMode.FRESH, **kwargs)
+            if not self.api.is_fresh(Komens):
+                if self.api.is_partial_init:
+                    raise exceptions.PartialInitError()
+                # Načtení na pozadí sdílí deduplikaci s `BakalariAPI`
+                self.api._revalidate(
+                    Komens, partial(self.api.get_komens, GetMode.FRESH, **kwargs)
+                )
+            return output
+        raise ValueError
+
+    async def get_all_komens(self) -> list[Komens]:
+        """Asynchroní varianta `BakalariAPI.get_all_komens()`."""
+        return await self.get_komens(
+            GetMode.FRESH,
+            from_date=datetime(1953, 1, 1),
+            to_date=datetime.today() + timedelta(1),
+        )
+
+    # ITERATORS
+    async def _iter_resolve(
+        self, unresolved: list[UnresolvedID[BakalariObj]]
+    ) -> AsyncIterator[BakalariObj]:
+        """Asynchroní varianta `BakalariAPI._iter_resolve()`.
+
+        Každé UnresolvedID se resolvuje jako samostatná úloha (najednou jich ale běží maximálně `max_concurrency`)
+        a objekty se vrací ve stejném pořadí jako na vstupu. Pokud iterace skončí dříve, zbylé úlohy se zruší.
+        """
+        semaphore = self._get_semaphore()
+
+        async def resolve_one(o: UnresolvedID) -> Any:
+            async with semaphore:
+                return await self._run(_resolve_one, o, self.api)
+
+        tasks = [asyncio.ensure_future(resolve_one(o)) for o in unresolved]
+        consumed = 0
+        try:
+            for task in tasks:
+                result = await task
+                self.api.looting.add_loot(result)
+                consumed += 1
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Objekty, které se stihly resolvovat (ale už se nevrátily), nezahazujeme
+            self.api.looting.add_loot(_completed_results(tasks[consumed:]))
+
+    async def iter_komens(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[Komens]:
+        """Asynchroní varianta `BakalariAPI.iter_komens()`."""
+        if self.api.is_partial_init:
+            raise exceptions.PartialInitError()
+        getter_output = await self._run(
+            komens.getter_komens_ids, self.api, from_date, to_date
+        )
+        unresolved = (await self._run(self.api._parse, getter_output)).get(
+            UnresolvedID
+        )[:limit]
+        async for o in self._iter_resolve(unresolved):
+            yield o
+
+    async def iter_meetings(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+    ) -> AsyncIterator[Meeting]:
+        """Asynchroní varianta `BakalariAPI.iter_meetings()`."""
+        if self.api.is_partial_init:
+            raise exceptions.PartialInitError()
+        if from_date is None and to_date is None:
+            getter_output = await self._run(
+                meetings.getter_future_meetings_ids, self.api
+            )
+        else:
+            getter_output = await self._run(
+                meetings.getter_meetings_ids,
+                self.api,
+                datetime(1, 1, 1) if from_date is None else from_date,
+                datetime(9999, 12, 31, 23, 59, 59) if to_date is None else to_date,
+            )
+        unresolved = [
+            o
+            for o in (await self._run(self.api._parse, getter_output)).get(
+                UnresolvedID
+            )
+            if o.type is Meeting
+        ]
+        async for o in self._iter_resolve(unresolved):
+            yield o
+
+    async def _resolve(
+        self,
+        unresolved: UnresolvedID | list[UnresolvedID] | ResultSet,
+        silence_querry_errors: bool = False,
+    ) -> ResultSet:
+        """Asynchroní varianta `BakalariAPI._resolve()`.
+
+        Každé UnresolvedID se resolvuje jako samostatná úloha, najednou jich ale běží maximálně `max_concurrency`.
+        Pokud některý z resolverů vyhodí výjimku, zbylé (ještě nedokončené) úlohy se zruší.
+
+        Returns:
+            ResultSet, který obsahuje všechna data od jednotlivých resolverů (ve stejném pořadí jako na vstupu).
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+        """
+        if self.api.is_partial_init:
+            raise exceptions.PartialInitError()
+        if isinstance(unresolved, ResultSet):
+            output = unresolved
+            unresolved = output.get(UnresolvedID)
+            output.remove(UnresolvedID)
+        else:
+            output = ResultSet()
+            if not isinstance(unresolved, list):
+                unresolved = [unresolved]
+
+        semaphore = self._get_semaphore()
+
+        async def resolve_one(o: UnresolvedID) -> Any:
+            async with semaphore:
+                return await self._run(
+                    _resolve_one, o, self.api, silence_querry_errors
+                )
+
+        tasks = [asyncio.ensure_future(resolve_one(o)) for o in unresolved]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Už resolvované objekty nezahazujeme
+            output.add_loot(_completed_results(tasks))
+            self.api.looting.add_result_set(output)
+            raise
+        output.add_loot(results)
+        self.api.looting.add_result_set(output)
+        return output
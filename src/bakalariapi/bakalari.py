@@ -11,16 +11,30 @@ Tento modul primárně implementuje:
 
 from __future__ import annotations
 
+import codecs
+import hashlib
 import json
 import logging
 import warnings
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Literal, overload
+from functools import partial
+from itertools import islice
+from threading import Lock, Thread
+from typing import Any, Callable, Iterable, Iterator, Literal, overload
 
 import requests
+from bs4 import BeautifulSoup, SoupStrainer
 
-from .utils import parseHTML
+from .utils import incremental_parser, parseHTML
 
 LOGGER = logging.getLogger("bakalariapi")
 LOGGER.addHandler(logging.NullHandler())
@@ -63,20 +77,34 @@ _resolvers: dict[
     type[BakalariObject],
     list[Callable[[BakalariAPI, UnresolvedID], BakalariObject | None]],
 ] = {}
+# Endpoint => `parse_only` všech HTML parserů endpointu (`None` = parser potřebuje celý strom)
+_html_strainers: dict[str, list[SoupStrainer | None]] = {}
+# Endpoint => streamové parsery endpointu (viz `_register_stream_parser()`)
+_stream_parsers: dict[str, list[type[_StreamParser]]] = {}
 
 
-def _register_parser(endpoint: str, type_: type[looting.GetterOutputTypeVar]):
+def _register_parser(
+    endpoint: str,
+    type_: type[looting.GetterOutputTypeVar],
+    parse_only: SoupStrainer | None = None,
+):
     """Dekorátor, který zaregistruje funkci jako parser pro daný endpoint.
 
     Pro běžné užití BakalářiAPI není doporučeno tento dekorátor používat.
     Samotný dekorátor funkci nijak neupravuje.
     Dekorovaná funkce by měla brát GetterOutput (typu, který se passuje jako argument `type_` tohoto dekorátoru) a měla by vracet looting.ResultSet či None, pokud není schopná z daného GetterOutput(u) nic získat.
+    Parser registrovaný pro typ `bytes` dostane GetterOutput libovolného typu daného endpointu a čte jeho surová data
+    (`GetterOutput.raw`), takže si kvůli němu nemusí vytvářet (parsovat) data pro ostatní parsery.
 
     Args:
         endpoint:
             Endpoint, který daná funkce umí parsovat.
         type_:
-            Typ generické třídy GetterOutput, který funkce přijímá.
+            Typ generické třídy GetterOutput, který funkce přijímá; `bytes` pro surová data.
+        parse_only:
+            Pouze pro HTML parsery (`type_` je `BeautifulSoup`) - `SoupStrainer` určující, které části stránky
+            parser potřebuje. Pokud ho specifikují všechny HTML parsery endpointu, gettery (viz `_parse_html()`)
+            nestaví celý strom stránky, ale pouze tyto části. Pokud `None`, parser dostane celý strom.
     """
     LOGGER.debug("New parser registered for endpoint '%s' (Type: %s)", endpoint, type_)
 
@@ -86,11 +114,98 @@ def _register_parser(endpoint: str, type_: type[looting.GetterOutputTypeVar]):
         ]
     ):
         _parsers[endpoint].setdefault(type_, []).append(func)
+        if type_ is BeautifulSoup:
+            _html_strainers.setdefault(endpoint, []).append(parse_only)
         return func
 
     return decorator
 
 
+def _parse_html(
+    endpoint: str, markup: str | bytes, backend: str | None = None
+) -> BeautifulSoup:
+    """Naparsuje HTML stránku daného endpointu pro jeho registrované parsery.
+
+    Pokud všechny HTML parsery endpointu deklarují, co ze stránky potřebují (parametr `parse_only`
+    u `_register_parser()`), postaví se strom pouze z těchto částí, jinak se postaví celý strom.
+
+    Args:
+        endpoint:
+            Endpoint, ze kterého stránka pochází.
+        markup:
+            HTML stránky.
+        backend:
+            Parser, který se má použít (viz `utils.parseHTML()`).
+    """
+    strainers = _html_strainers.get(endpoint, [])
+    # Více různých `SoupStrainer`ů spojit nejde, takže v tom případě (stejně jako bez deklarace) stavíme celý strom
+    if len(strainers) != 1 or strainers[0] is None:
+        return parseHTML(markup, backend)
+    return parseHTML(markup, backend, strainers[0])
+
+
+class _StreamParser:
+    """Základ streamových parserů, které data ze stránky extrahují inkrementálně (bez stavění stromu).
+
+    Parser dostává události z `utils.incremental_parser()` (viz metody `start()`, `end()`, `data()` a `close()`)
+    a extrahované objekty přidává do `output`, odkud si je (ještě během čtení stránky) průběžně bere `take()`.
+    Pro každou stránku se vytváří nová instance.
+
+    Atributy:
+        output:
+            ResultSet s objekty, které ještě nebyly převzaty přes `take()`.
+    """
+
+    def __init__(self):
+        self.output: looting.ResultSet = looting.ResultSet()
+
+    def start(self, tag: str, attrs: dict[str, str]):
+        pass
+
+    def end(self, tag: str):
+        pass
+
+    def data(self, data: str):
+        pass
+
+    def close(self):
+        pass
+
+    def take(self) -> looting.ResultSet:
+        """Navrátí objekty extrahované od posledního zavolání a vyprázdní `output`."""
+        output, self.output = self.output, looting.ResultSet()
+        return output
+
+
+def _register_stream_parser(endpoint: str):
+    """Dekorátor, který zaregistruje třídu (potomka `_StreamParser`) jako streamový parser pro daný endpoint.
+
+    Pro běžné užití BakalářiAPI není doporučeno tento dekorátor používat.
+    Samotný dekorátor třídu nijak neupravuje.
+    Streamové parsery endpointu se použijí místo jeho HTML parserů (viz `BakalariAPI.stream_parsing`),
+    takže musí dohromady extrahovat to samé, co HTML parsery.
+
+    Args:
+        endpoint:
+            Endpoint, který daná třída umí parsovat.
+    """
+    LOGGER.debug("New stream parser registered for endpoint '%s'", endpoint)
+
+    def decorator(cls: type[_StreamParser]):
+        _stream_parsers.setdefault(endpoint, []).append(cls)
+        return cls
+
+    return decorator
+
+
+def _iter_response(response: requests.Response, chunk_size: int) -> Iterator[bytes]:
+    """Iteruje tělo odpovědi (`stream` requestu) po částech; Po dočtení (či přerušení) odpověď zavře."""
+    try:
+        yield from response.iter_content(chunk_size)
+    finally:
+        response.close()
+
+
 def _register_resolver(type_: type[BakalariObj]):
     """Dekorátor, který zaregistruje funkci jako resolver pro daný typ.
 
@@ -122,6 +237,9 @@ def _parse(
     Pro běžné užití BakalářiAPI není tato funkce nutná. Pokud nevíte, jestli tuto
     funkci máte/potřebujete použít, tak ji nepotřebujete.
 
+    Nejprve doběhnou parsery surových dat (registrované pro `bytes`), potom parsery pro typ GetterOutput(u).
+    Po doběhnutí všech parserů se data GetterOutput(u) uvolní (viz `looting.GetterOutput.release()`).
+
     Args:
         getter_output:
             GetterOutput, ze kterého se mají data extrahovat.
@@ -130,17 +248,144 @@ def _parse(
         looting.ResultSet, který obsahuje všechna data od jednotlivých parserů.
     """
     output = looting.ResultSet()
-    for parser in _parsers[getter_output.endpoint].setdefault(getter_output.type, []):
-        parser_output = parser(getter_output)
-        if parser_output is not None:
-            output.merge(parser_output)
+    parsers = _parsers[getter_output.endpoint]
+    if getter_output.type is bytes:
+        selected = parsers.get(bytes, [])
+    elif getter_output.raw is None:
+        selected = parsers.get(getter_output.type, [])
+    else:
+        selected = parsers.get(bytes, []) + parsers.get(getter_output.type, [])
+    try:
+        for parser in selected:
+            parser_output = parser(getter_output)
+            if parser_output is not None:
+                output.merge(parser_output)
+    finally:
+        getter_output.release()
     return output
 
 
+def _parse_stream(
+    getter_output: looting.GetterOutput[BeautifulSoup],
+    keep_raw: bool = True,
+    backend: str | None = None,
+) -> Iterator[looting.ResultSet]:
+    """Extrahují se data ze streamovaného GetterOutput(u) za pomoci registrovaných streamových parserů.
+
+    Data se extrahují už během čtení surových dat a průběžně (po každé přečtené části) se vrací.
+    Na rozdíl od `BakalariAPI._parse_stream()` se data neukládají do looting instance.
+
+    Args:
+        getter_output:
+            GetterOutput vytvořený přes `looting.GetterOutput.from_stream()`.
+        keep_raw:
+            Mají se přečtená surová data uložit do `getter_output.raw` (viz `looting.GetterOutput.stream()`)?
+        backend:
+            Parser, který se má použít (viz `utils.incremental_parser()`).
+
+    Returns:
+        Iterátor ResultSetů s daty extrahovanými z jednotlivých částí surových dat.
+    """
+    stream_parsers = [cls() for cls in _stream_parsers[getter_output.endpoint]]
+    feeders = [incremental_parser(x, backend) for x in stream_parsers]
+    # Bakaláři posílají stránky v UTF-8; Inkrementální dekodér si poradí i se znakem rozděleným mezi části
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+    def take() -> looting.ResultSet:
+        output = looting.ResultSet()
+        for stream_parser in stream_parsers:
+            output.merge(stream_parser.take())
+        return output
+
+    for chunk in getter_output.stream(keep_raw):
+        cancellation.check()
+        text = decoder.decode(chunk)
+        for feeder in feeders:
+            feeder.feed(text)
+        output = take()
+        if len(output.data) != 0:
+            yield output
+    text = decoder.decode(b"", True)
+    for feeder in feeders:
+        feeder.feed(text)
+        feeder.close()
+    output = take()
+    if len(output.data) != 0:
+        yield output
+
+
+def _html_output(
+    endpoint: str, raw: bytes, query: str | None = None
+) -> looting.GetterOutput[BeautifulSoup]:
+    """Vytvoří GetterOutput z HTML stránky daného endpointu; Stránka se naparsuje (viz `_parse_html()`) až při potřebě."""
+    return looting.GetterOutput.from_raw(
+        endpoint, BeautifulSoup, raw, partial(_parse_html, endpoint), query
+    )
+
+
+def _html_stream_output(
+    endpoint: str,
+    response: requests.Response,
+    query: str | None = None,
+    chunk_size: int = 64 * 1024,
+) -> looting.GetterOutput[BeautifulSoup]:
+    """Vytvoří GetterOutput z odpovědi `stream` requestu na HTML stránku daného endpointu.
+
+    Tělo odpovědi se čte až při parsování (viz `BakalariAPI._parse()`), takže se stránka může parsovat už během stahování.
+    """
+    return looting.GetterOutput.from_stream(
+        endpoint,
+        BeautifulSoup,
+        _iter_response(response, chunk_size),
+        partial(_parse_html, endpoint),
+        query,
+    )
+
+
+def _json_output(
+    endpoint: str, raw: bytes, query: str | None = None
+) -> looting.GetterOutput[dict]:
+    """Vytvoří GetterOutput z JSON odpovědi daného endpointu; JSON se dekóduje až při potřebě."""
+    return looting.GetterOutput.from_raw(endpoint, dict, raw, json.loads, query)
+
+
+def _parse_raw(endpoint: str, type_: type, raw: bytes) -> looting.ResultSet:
+    """Naparsuje surová data daného endpointu registrovanými parsery (viz `BakalariAPI.parse_executor`).
+
+    Funkce je (stejně jako její argumenty a výsledek) picklovatelná, takže ji lze spustit i v jiném procesu.
+    """
+    if type_ is BeautifulSoup:
+        return _parse(_html_output(endpoint, raw))
+    return _parse(_json_output(endpoint, raw))
+
+
+def _resolve_one(
+    unresolved: UnresolvedID,
+    bakalariAPI: BakalariAPI,
+    silence_querry_errors: bool = False,
+) -> BakalariObject:
+    """Pokusí se získat plnohodnotný objekt pro jedno UnresolvedID.
+
+    Pokud se objekt získat nepodaří (nebo pro daný typ není registrovaný žádný resolver), vrátí se samotné UnresolvedID.
+    """
+    cancellation.check()
+    for resolver in _resolvers.get(unresolved.type, []):
+        try:
+            tmp = resolver(bakalariAPI, unresolved)
+        except exceptions.BakalariQuerrySuccessError as e:
+            if silence_querry_errors:
+                continue
+            raise e
+        if tmp is not None:
+            return tmp
+    return unresolved
+
+
 def _resolve(
     unresolved: UnresolvedID | list[UnresolvedID] | looting.ResultSet,
     bakalariAPI: BakalariAPI,
     silence_querry_errors: bool = False,
+    workers: int = 1,
 ) -> looting.ResultSet:
     """Pokusí se získat plnohodnotný objekt pro dané UnresolvedID za pomoci registrovaných resolverů.
 
@@ -151,9 +396,19 @@ def _resolve(
     Args:
         unresolved:
             Jedno nebo více UnresolvedID, pro které se BakalářiAPI pokusí získat plnohodnotný objekt.
+        silence_querry_errors:
+            Pokud `True`, `BakalariQuerrySuccessError` z resolveru se ignoruje a zkusí se další resolver.
+        workers:
+            Maximální počet UnresolvedID, které se resolvují najednou (každé ve vlastním threadu a tedy i přes vlastní session).
+            Pokud je 1, resolvuje se postupně v tomto threadu.
 
     Returns:
         looting.ResultSet, který obsahuje všechna data od jednotlivých resolverů.
+        Pořadí objektů odpovídá pořadí UnresolvedID na vstupu (i při paralelním resolvování).
+
+    Raises:
+        OperationCancelledError: Pokud byla operace zrušena (viz `cancellation`);
+            Objekty, které se do té doby podařilo resolvovat, jsou i tak uloženy v looting instanci.
     """
     if isinstance(unresolved, looting.ResultSet):
         output = unresolved
@@ -164,27 +419,60 @@ def _resolve(
         if not isinstance(unresolved, list):
             unresolved = [unresolved]
 
-    for o in unresolved:
-        if o.type in _resolvers:
-            resolved = False
-            for resolver in _resolvers[o.type]:
-                try:
-                    tmp = resolver(bakalariAPI, o)
-                except exceptions.BakalariQuerrySuccessError as e:
-                    if silence_querry_errors:
-                        continue
-                    raise e
-                if tmp is not None:
-                    output.add_loot(tmp)
-                    resolved = True
-                    break
-            if not resolved:
-                output.add_loot(o)
-        else:
-            output.add_loot(o)
+    workers = min(workers, len(unresolved))
+    if workers <= 1:
+        try:
+            for o in unresolved:
+                output.add_loot(_resolve_one(o, bakalariAPI, silence_querry_errors))
+        except BaseException:
+            # Už resolvované objekty nezahazujeme
+            bakalariAPI.looting.add_result_set(output)
+            raise
+        return output
+
+    # Vlastní (podřízený) token, přes který můžeme zastavit rozběhnuté resolvery, pokud nastane chyba (nebo Ctrl+C)
+    token = cancellation.CancellationToken(parent=cancellation.current())
+    executor = ThreadPoolExecutor(workers, "bakalariapi-resolve")
+    futures: list[Future] = []
+    consumed = 0
+    try:
+        futures = [
+            executor.submit(
+                cancellation.run_with,
+                token,
+                _resolve_one,
+                o,
+                bakalariAPI,
+                silence_querry_errors,
+            )
+            for o in unresolved
+        ]
+        # Výsledky bereme v pořadí vstupu, takže se chyba propaguje stejně jako při postupném resolvování
+        for future in futures:
+            output.add_loot(future.result())
+            consumed += 1
+    except BaseException:
+        token.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Už resolvované objekty (i ty, které doběhly mimo pořadí) nezahazujeme
+        output.add_loot(_completed_results(futures[consumed:]))
+        bakalariAPI.looting.add_result_set(output)
+        raise
+    finally:
+        # Pokud nastala chyba, tak další (ještě nezačaté) resolvování už nechceme
+        executor.shutdown(wait=True, cancel_futures=True)
     return output
 
 
+def _completed_results(futures: Iterable[Future]) -> list:
+    """Vrátí výsledky úspěšně dokončených futures (ostatní přeskočí)."""
+    return [
+        future.result()
+        for future in futures
+        if future.done() and not future.cancelled() and future.exception() is None
+    ]
+
+
 def is_version_supported(version: str):
     """Zkontroluje, jestli `BakaláriAPI` podporuje danou verzi Bakalářů.
 
@@ -203,12 +491,17 @@ class GetMode(Enum):
 
     CACHED - Data se získají pouze z `Looting` instance
     FRESH - Data se získají pouze ze serveru
-    CACHED_OR_FRESH - Nejprve se zkusí načíst data z `Looting` instance, pokud zde nejsou, načtou se data ze serveru
+    CACHED_OR_FRESH - Nejprve se zkusí načíst data z `Looting` instance, pokud zde nejsou (nebo jsou zastaralá), načtou se data ze serveru
+    STALE_WHILE_REVALIDATE - Data se získají z `Looting` instance (i když jsou zastaralá), zastaralá data se na pozadí načtou ze serveru;
+        Pokud v `Looting` instanci žádná data nejsou, načtou se data ze serveru (stejně jako u `CACHED_OR_FRESH`)
+
+    Stáří dat se určuje podle nejnovějšího `BakalariObject._date` daného typu (viz `BakalariAPI.max_ages`).
     """
 
     CACHED = 0
     FRESH = 1
     CACHED_OR_FRESH = 2
+    STALE_WHILE_REVALIDATE = 3
 
 
 class BakalariAPI:
@@ -229,13 +522,52 @@ class BakalariAPI:
             Instance classy UserInfo obsahující údaje o uživaleli.
         server_info:
             Instance classy ServerInfo obsahující údaje o serveru a Bakalářích.
+        resolve_workers:
+            Maximální počet UnresolvedID, které se resolvují najednou (tzn. kolik sessionů se při resolvování použije zároveň).
+            Pokud je 1, resolvuje se postupně.
+        max_ages:
+            Slovník, kde klíč je typ objektu a hodnota maximální stáří dat tohoto typu pro `GetMode.CACHED_OR_FRESH`
+            a `GetMode.STALE_WHILE_REVALIDATE`. Pokud typ ve slovníku není (nebo je hodnota `None`), data nikdy nezastarají.
+        archive:
+            Archiv surových dat (viz `archive.RawArchive`), do kterého se ukládají data všech `GetterOutput`ů,
+            která projdou parsováním. Pokud `None` (default), data se nearchivují.
+        skip_unchanged:
+            Pokud `True` (default), pamatuje se hash surových dat poslední naparsované stránky pro každý endpoint
+            a parametry requestu (viz `GetterOutput.query`). Pokud je stránka beze změny, nenaparsuje se znovu
+            a její objekty se ani znovu neslučují do looting instance, pouze se jim aktualizuje `_date`
+            (viz `Looting.touch()`); Vrátí se objekty minulého parsování. Netýká se streamovaných stránek.
+        skip_unchanged_pages:
+            Maximální počet stránek, pro které se pamatuje hash (viz `skip_unchanged`); Nejdéle nepoužité se zapomínají.
+        ingest_skipped:
+            Počet stránek, jejichž parsování se díky `skip_unchanged` přeskočilo.
+        stream_parsing:
+            Pokud `True`, stránky endpointů se streamovými parsery (viz `_register_stream_parser()`) se parsují
+            inkrementálně už během stahování a extrahované objekty se do looting instance přidávají průběžně.
+            Nestaví se strom stránky a (pokud není nastaven `archive`) stránka se nedrží v paměti celá, což u velkých
+            stránek snižuje jak dobu do prvního objektu, tak paměťovou náročnost. Stránky se ale takto načítají mimo
+            `SessionManager.response_cache` a slučování requestů. Default je `False`.
+        parse_executor:
+            Executor (typicky `concurrent.futures.ProcessPoolExecutor`), ve kterém se parsují surová data stránek
+            (tedy `GetterOutput`y, jejichž data ještě nebyla vytvořena, viz `GetterOutput.from_raw()`).
+            Parsování je CPU náročné, takže v jiných procesech neblokuje GIL a jeho propustnost roste s počtem jader.
+            Jeden executor lze sdílet mezi více `BakalariAPI` instancemi. Pokud `None` (default), parsuje se v threadu,
+            který data získal. Streamované stránky (viz `stream_parsing`) se parsují vždy v threadu, který je stahuje.
+            Pozn.: V jiných procesech jsou k dispozici pouze parsery registrované při importu BakalářiAPI.
+        sync_overlap:
+            O kolik dříve, než skončila poslední synchronizace, začíná synchronizace následující (viz `sync_grades()`, ...).
+            Překryv pokrývá data, která se na serveru objeví se zpětným datem (např. známka zapsaná o pár dní později).
         is_partial_init:
             Indikuje, zda je instance částečně nebo plně inicializována.
             Je `True` pokud částečně, `False` pokud plně.
             Pokud je `True`, tak je možnost
 
     Pozn.:
-        "get" metody mohou při `GetMode.FRESH` a `GetMode.CACHED_OR_FRESH` mohou vyvolat výjimku `PartialInitError`, pokud není instance plně inicializována.
+        "get" metody mohou při `GetMode.FRESH`, `GetMode.CACHED_OR_FRESH` a `GetMode.STALE_WHILE_REVALIDATE` mohou vyvolat výjimku `PartialInitError`, pokud není instance plně inicializována.
+        Při `GetMode.STALE_WHILE_REVALIDATE` se případná výjimka z načítání na pozadí pouze zaloguje.
+        "get", "iter", "fetch" a "sync" metody přijímají parametr `token` (viz `cancellation.CancellationToken`), přes který lze
+        načítání zrušit nebo omezit deadlinem; Gettery a resolvery ho dostávají skrze kontext (viz `cancellation.current()`).
+        Při zrušení vyvolají výjimku `OperationCancelledError` (resp. `DeadlineExceededError`), data načtená do té doby
+        jsou ale uložena v looting instanci.
     """
 
     @property
@@ -262,6 +594,30 @@ class BakalariAPI:
         self.looting: looting.Looting = looting.Looting()
         self.user_info: UserInfo = UserInfo()
         self.server_info: ServerInfo = ServerInfo(url)
+        self.resolve_workers: int = 4
+        self.max_ages: dict[type[BakalariObject], timedelta | None] = {
+            Grade: timedelta(hours=1),
+            Homework: timedelta(hours=1),
+            Komens: timedelta(hours=1),
+            Meeting: timedelta(hours=1),
+            Student: timedelta(days=7),
+        }
+        self.sync_overlap: timedelta = timedelta(days=5)
+        self.archive: archive.RawArchive | None = None
+        self.skip_unchanged: bool = True
+        self.ingest_skipped: int = 0
+        self.skip_unchanged_pages: int = 64
+        # (endpoint, query) => (hash surových dat, odkazy na loot) poslední naparsované stránky; Seřazeno od nejdéle
+        # nepoužité, jelikož parametry (např. data u synchronizace) se mění a staré záznamy by se nikdy nepoužily
+        self.__ingested: OrderedDict[
+            tuple[str, str | None],
+            tuple[bytes, list[tuple[type[BakalariObject], str, bool]]],
+        ] = OrderedDict()
+        self.__ingested_lock: Lock = Lock()
+        self.stream_parsing: bool = False
+        self.parse_executor: Executor | None = None
+        self.__revalidating: set[type[BakalariObject]] = set()
+        self.__revalidating_lock: Lock = Lock()
 
     def get_endpoint(self, endpoint: str) -> str:
         """Vrátí celou URL adresu daného endpointu.
@@ -307,9 +663,9 @@ class BakalariAPI:
         if self.server_info.url is None:
             raise exceptions.PartialInitError()
         try:
-            response = requests.get(self.server_info.url)
+            response = self.session_manager._request("GET", self.server_info.url)
             response.raise_for_status()
-        except requests.exceptions.RequestException:
+        except (requests.exceptions.RequestException, exceptions.CircuitOpenError):
             return False
         return True
 
@@ -340,14 +696,13 @@ class BakalariAPI:
         with self.session_manager.get_session_or_create(
             sessions.RequestsSession
         ) as session:
-            getter_output = looting.GetterOutput(
-                Endpoint.USER_INFO,
-                parseHTML(session.get(self.get_endpoint(Endpoint.USER_INFO)).content),
-            )
-        self._parse(getter_output)
+            response = session.get(self.get_endpoint(Endpoint.USER_INFO))
+        getter_output = _html_output(Endpoint.USER_INFO, response.content)
 
         # Možná by se mohl registrovat parser
+        # Čteme před `_parse()`, jelikož ten po parsování strom stránky uvolní
         data = json.loads(getter_output.data.head["data-pageinfo"])  # type: ignore # Jelikož "head" může být None, tak Pylance naříká
+        self._parse(getter_output)
         self.user_info.type = data["userType"]
         self.user_info.hash = data["userHash"]
         self.server_info.version = data["applicationVersion"]
@@ -370,6 +725,99 @@ class BakalariAPI:
             else is_version_supported(self.server_info.version)
         )
 
+    def is_fresh(self, type_: type[BakalariObject]) -> bool:
+        """Zjistí, zda jsou data daného typu v looting instanci aktuální.
+
+        Data jsou aktuální, pokud je v looting instanci alespoň jeden objekt daného typu a nejnovější z nich
+        (podle `BakalariObject._date`) není starší než maximální stáří v `max_ages`.
+
+        Args:
+            type_:
+                Typ objektů, jejichž aktualita se má zjistit.
+
+        Returns:
+            `True` pokud jsou data aktuální, jinak `False`.
+        """
+        cached = self.looting.get(type_)
+        if len(cached) == 0:
+            return False
+        max_age = self.max_ages.get(type_)
+        if max_age is None:
+            return True
+        return datetime.now() - max(o._date for o in cached) <= max_age
+
+    def is_revalidating(self, type_: type[BakalariObject]) -> bool:
+        """Zjistí, zda se data daného typu právě načítají na pozadí (viz `GetMode.STALE_WHILE_REVALIDATE`)."""
+        return type_ in self.__revalidating
+
+    def _revalidate(self, type_: type[BakalariObject], fresh: Callable[[], Any]):
+        """Spustí načtení dat daného typu na pozadí; Pokud se data tohoto typu již načítají, nedělá nic."""
+        with self.__revalidating_lock:
+            if type_ in self.__revalidating:
+                return
+            self.__revalidating.add(type_)
+
+        def worker():
+            try:
+                fresh()
+            except Exception:
+                LOGGER.exception("Background refresh of %s failed", type_.__name__)
+            finally:
+                with self.__revalidating_lock:
+                    self.__revalidating.discard(type_)
+
+        Thread(
+            target=worker, name=f"bakalariapi-revalidate-{type_.__name__}", daemon=True
+        ).start()
+
+    def _get(
+        self,
+        type_: type[BakalariObj],
+        mode: GetMode,
+        fresh: Callable[[], list[BakalariObj]],
+        token: cancellation.CancellationToken | None = None,
+    ) -> list[BakalariObj]:
+        """Vrátí objekty daného typu podle daného módu.
+
+        Args:
+            type_:
+                Typ objektů, které se mají vrátit.
+            mode:
+                Mód získání dat (viz `GetMode`).
+            fresh:
+                Funkce, která načte (a vrátí) nová data ze serveru.
+            token:
+                Token, kterým lze načítání nových dat zrušit (viz `cancellation`).
+                Pokud je `None`, platí token aktuálního kontextu (pokud nějaký je).
+                Na načítání na pozadí (viz `GetMode.STALE_WHILE_REVALIDATE`) se token nevztahuje.
+
+        Returns:
+            List objektů.
+
+        Raises:
+            OperationCancelledError: Pokud bylo načítání zrušeno (resp. vypršel deadline).
+        """
+        if mode == GetMode.CACHED:
+            return self.looting.get(type_)
+        elif mode == GetMode.FRESH:
+            if self.is_partial_init:
+                raise exceptions.PartialInitError()
+            return cancellation.run_with(token, fresh)
+        elif mode == GetMode.CACHED_OR_FRESH:
+            if self.is_fresh(type_):
+                return self.looting.get(type_)
+            return self._get(type_, GetMode.FRESH, fresh, token)
+        elif mode == GetMode.STALE_WHILE_REVALIDATE:
+            output = self.looting.get(type_)
+            if len(output) == 0:
+                return self._get(type_, GetMode.FRESH, fresh, token)
+            if not self.is_fresh(type_):
+                if self.is_partial_init:
+                    raise exceptions.PartialInitError()
+                self._revalidate(type_, fresh)
+            return output
+        raise ValueError
+
     # GRADES
     @overload
     def get_grades(self, mode: Literal[GetMode.CACHED]) -> list[Grade]:
@@ -381,7 +829,11 @@ class BakalariAPI:
 
     @overload
     def get_grades(
-        self, mode: Literal[GetMode.FRESH], *, from_date: datetime | None = None
+        self,
+        mode: Literal[GetMode.FRESH],
+        *,
+        from_date: datetime | None = None,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Grade]:
         """Nově načte a vrátí známky.
 
@@ -397,13 +849,16 @@ class BakalariAPI:
     @overload
     def get_grades(
         self,
-        mode: Literal[GetMode.CACHED_OR_FRESH],
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
         *,
         from_date: datetime | None = None,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Grade]:
-        """Načte a vrátí známky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné známky, pokusí se načíst nové.
+        """Načte a vrátí známky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné známky nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
-        Pokud jsou známky přítomny v looting instanci, argumenty této metody jsou nepodstatné.
+        Pokud jsou v looting instanci přítomny aktuální známky, argumenty této metody jsou nepodstatné.
 
         Args:
             from_date:
@@ -416,22 +871,18 @@ class BakalariAPI:
 
     def get_grades(self, mode: GetMode, **kwargs) -> list[Grade]:
         kwargs = {"from_date": None, **kwargs}
-        if mode == GetMode.CACHED:
-            return self.looting.get(Grade)
-        elif mode == GetMode.FRESH:
-            if self.is_partial_init:
-                raise exceptions.PartialInitError()
-            return self._parse(modules.grades.getter(self, kwargs["from_date"])).get(
-                Grade
-            )
-        elif mode == GetMode.CACHED_OR_FRESH:
-            output = self.get_grades(GetMode.CACHED)
-            return (
-                self.get_grades(GetMode.FRESH, **kwargs) if len(output) == 0 else output
-            )
-        raise ValueError
+        return self._get(
+            Grade,
+            mode,
+            lambda: self._parse(
+                modules.grades.getter(self, kwargs["from_date"])
+            ).get(Grade),
+            kwargs.get("token"),
+        )
 
-    def get_all_grades(self) -> list[Grade]:
+    def get_all_grades(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Grade]:
         """Nově načte a vrátí všechny známky.
 
         Vždy načítá čerstvá data z Bakalářů.
@@ -439,7 +890,7 @@ class BakalariAPI:
         Returns:
             Nově načtený list všech známek.
         """
-        return self.get_grades(GetMode.FRESH, from_date=datetime(1, 1, 1))
+        return self.get_grades(GetMode.FRESH, from_date=datetime(1, 1, 1), token=token)
 
     # HOMEWORKS
     @overload
@@ -456,6 +907,7 @@ class BakalariAPI:
         mode: Literal[GetMode.FRESH],
         *,
         fast_mode: Literal[True],
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Homework]:
         """Nově načte a vrátí úkoly.
 
@@ -479,6 +931,7 @@ class BakalariAPI:
         only_first_page: bool = False,
         first_loading_timeout: float = 5,
         second_loading_timeout: float = 10,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Homework]:
         """Nově načte a vrátí úkoly.
 
@@ -512,13 +965,16 @@ class BakalariAPI:
     @overload
     def get_homeworks(
         self,
-        mode: Literal[GetMode.CACHED_OR_FRESH],
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
         *,
         fast_mode: Literal[True],
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Homework]:
-        """Načte a vrátí úkoly z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné úkoly, pokusí se načíst nové.
+        """Načte a vrátí úkoly z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné úkoly nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
 
-        Pokud jsou úkoly přítomny v looting instanci, argumenty této metody jsou nepodstatné.
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
+
+        Pokud jsou v looting instanci přítomny aktuální úkoly, argumenty této metody jsou nepodstatné.
 
         Args:
             fast_mode:
@@ -533,17 +989,20 @@ class BakalariAPI:
     @overload
     def get_homeworks(
         self,
-        mode: Literal[GetMode.CACHED_OR_FRESH],
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
         *,
         fast_mode: Literal[False],
         unfinished_only: bool = True,
         only_first_page: bool = False,
         first_loading_timeout: float = 5,
         second_loading_timeout: float = 10,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Homework]:
-        """Načte a vrátí úkoly z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné úkoly, pokusí se načíst nové.
+        """Načte a vrátí úkoly z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné úkoly nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
-        Pokud jsou úkoly přítomny v looting instanci, argumenty této metody jsou nepodstatné.
+        Pokud jsou v looting instanci přítomny aktuální úkoly, argumenty této metody jsou nepodstatné.
 
         Args:
             fast_mode:
@@ -581,31 +1040,22 @@ class BakalariAPI:
             **kwargs,
         }
 
-        if mode == GetMode.CACHED:
-            return self.looting.get(Homework)
-        elif mode == GetMode.FRESH:
-            if self.is_partial_init:
-                raise exceptions.PartialInitError()
+        def fresh() -> list[Homework]:
             if kwargs["fast_mode"]:
                 return self._parse(modules.homeworks.getter_fast(self)).get(Homework)
-            else:
-                return modules.homeworks.get_slow(
-                    self,
-                    kwargs["unfinished_only"],
-                    kwargs["only_first_page"],
-                    kwargs["first_loading_timeout"],
-                    kwargs["second_loading_timeout"],
-                ).get(Homework)
-        elif mode == GetMode.CACHED_OR_FRESH:
-            output = self.get_homeworks(GetMode.CACHED)
-            return (
-                self.get_homeworks(GetMode.FRESH, **kwargs)
-                if len(output) == 0
-                else output
-            )
-        raise ValueError
-
-    def get_all_homeworks(self) -> list[Homework]:
+            return modules.homeworks.get_slow(
+                self,
+                kwargs["unfinished_only"],
+                kwargs["only_first_page"],
+                kwargs["first_loading_timeout"],
+                kwargs["second_loading_timeout"],
+            ).get(Homework)
+
+        return self._get(Homework, mode, fresh, kwargs.get("token"))
+
+    def get_all_homeworks(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Homework]:
         """Nově načte a vrátí všechny úkoly.
 
         Vždy načítá čerstvá data z Bakalářů a načtení úkolů proběhne v "pomalém módu".
@@ -614,7 +1064,11 @@ class BakalariAPI:
             Nově načtený list všech úkolů.
         """
         return self.get_homeworks(
-            GetMode.FRESH, fast_mode=False, unfinished_only=False, only_first_page=False
+            GetMode.FRESH,
+            fast_mode=False,
+            unfinished_only=False,
+            only_first_page=False,
+            token=token,
         )
 
     # MEETINGS
@@ -627,7 +1081,12 @@ class BakalariAPI:
         """
 
     @overload
-    def get_meetings(self, mode: Literal[GetMode.FRESH]) -> list[Meeting]:
+    def get_meetings(
+        self,
+        mode: Literal[GetMode.FRESH],
+        *,
+        token: cancellation.CancellationToken | None = None,
+    ) -> list[Meeting]:
         """Nově načte a vrátí nadcházející schůzky.
 
         Returns:
@@ -636,7 +1095,12 @@ class BakalariAPI:
 
     @overload
     def get_meetings(
-        self, mode: Literal[GetMode.FRESH], *, from_date: datetime, to_date: datetime
+        self,
+        mode: Literal[GetMode.FRESH],
+        *,
+        from_date: datetime,
+        to_date: datetime,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Meeting]:
         """Nově načte a vrátí schůzky.
 
@@ -653,8 +1117,15 @@ class BakalariAPI:
         """
 
     @overload
-    def get_meetings(self, mode: Literal[GetMode.CACHED_OR_FRESH]) -> list[Meeting]:
-        """Načte a vrátí schůzky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné schůzky, pokusí se načíst nové nadchézející schůzky.
+    def get_meetings(
+        self,
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
+        *,
+        token: cancellation.CancellationToken | None = None,
+    ) -> list[Meeting]:
+        """Načte a vrátí schůzky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné schůzky nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové nadchézející schůzky.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
         Returns:
             Načtený list schůzek.
@@ -663,15 +1134,18 @@ class BakalariAPI:
     @overload
     def get_meetings(
         self,
-        mode: Literal[GetMode.CACHED_OR_FRESH],
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
         *,
         from_date: datetime,
         to_date: datetime,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Meeting]:
-        """Načte a vrátí schůzky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné schůzky, pokusí se načíst nové.
+        """Načte a vrátí schůzky z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné schůzky nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
         Je nutné specifikovat horní i dolní časovou hranici. Nejmenší možný čas je `datetime(1, 1, 1)`, největší možný je `datetime(9999, 12, 31, 23, 59, 59)`.
-        Pokud jsou schůzky přítomny v looting instanci, argumenty této metody jsou nepodstatné.
+        Pokud jsou v looting instanci přítomny aktuální schůzky, argumenty této metody jsou nepodstatné.
 
         Args:
             from_date:
@@ -684,11 +1158,7 @@ class BakalariAPI:
         """
 
     def get_meetings(self, mode: GetMode, **kwargs) -> list[Meeting]:
-        if mode == GetMode.CACHED:
-            return self.looting.get(Meeting)
-        elif mode == GetMode.FRESH:
-            if self.is_partial_init:
-                raise exceptions.PartialInitError()
+        def fresh() -> list[Meeting]:
             if "from_date" in kwargs:
                 return self._resolve(
                     self._parse(
@@ -697,22 +1167,17 @@ class BakalariAPI:
                         )
                     )
                 ).get(Meeting)
-            else:
-                return self._resolve(
-                    self._parse(modules.meetings.getter_future_meetings_ids(self)).get(
-                        UnresolvedID
-                    )
-                ).get(Meeting)
-        elif mode == GetMode.CACHED_OR_FRESH:
-            output = self.get_meetings(GetMode.CACHED)
-            return (
-                self.get_meetings(GetMode.FRESH, **kwargs)
-                if len(output) == 0
-                else output
-            )
-        raise ValueError
+            return self._resolve(
+                self._parse(modules.meetings.getter_future_meetings_ids(self)).get(
+                    UnresolvedID
+                )
+            ).get(Meeting)
+
+        return self._get(Meeting, mode, fresh, kwargs.get("token"))
 
-    def get_all_meetings(self) -> list[Meeting]:
+    def get_all_meetings(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Meeting]:
         """Nově načte a vrátí všechny schůzky.
 
         Vždy načítá čerstvá data z Bakalářů.
@@ -724,6 +1189,7 @@ class BakalariAPI:
             GetMode.FRESH,
             from_date=datetime(1, 1, 1),
             to_date=datetime(9999, 12, 31, 23, 59, 59),
+            token=token,
         )
 
     # STUDENTS
@@ -736,7 +1202,12 @@ class BakalariAPI:
         """
 
     @overload
-    def get_students(self, mode: Literal[GetMode.FRESH]) -> list[Student]:
+    def get_students(
+        self,
+        mode: Literal[GetMode.FRESH],
+        *,
+        token: cancellation.CancellationToken | None = None,
+    ) -> list[Student]:
         """Nově načte a vrátí seznam studentů.
 
         Returns:
@@ -744,26 +1215,31 @@ class BakalariAPI:
         """
 
     @overload
-    def get_students(self, mode: Literal[GetMode.CACHED_OR_FRESH]) -> list[Student]:
-        """Načte a vrátí studenty z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádní studenti, pokusí se načíst nové.
+    def get_students(
+        self,
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
+        *,
+        token: cancellation.CancellationToken | None = None,
+    ) -> list[Student]:
+        """Načte a vrátí studenty z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádní studenti nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
         Returns:
             Načtený list studentů.
         """
 
-    def get_students(self, mode: GetMode) -> list[Student]:
-        if mode == GetMode.CACHED:
-            return self.looting.get(Student)
-        elif mode == GetMode.FRESH:
-            if self.is_partial_init:
-                raise exceptions.PartialInitError()
-            return self._parse(modules.meetings.getter_future_meetings_ids(self)).get(
-                Student
-            )
-        elif mode == GetMode.CACHED_OR_FRESH:
-            output = self.get_students(GetMode.CACHED)
-            return self.get_students(GetMode.FRESH) if len(output) == 0 else output
-        raise ValueError
+    def get_students(
+        self, mode: GetMode, token: cancellation.CancellationToken | None = None
+    ) -> list[Student]:
+        return self._get(
+            Student,
+            mode,
+            lambda: self._parse(
+                modules.meetings.getter_future_meetings_ids(self)
+            ).get(Student),
+            token,
+        )
 
     # KOMENS
     @overload
@@ -782,6 +1258,7 @@ class BakalariAPI:
         from_date: datetime | None = None,
         to_date: datetime | None = None,
         limit: int | None = None,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Komens]:
         """Nově načte a vrátí komens zprávy.
 
@@ -808,16 +1285,19 @@ class BakalariAPI:
     @overload
     def get_komens(
         self,
-        mode: Literal[GetMode.CACHED_OR_FRESH],
+        mode: Literal[GetMode.CACHED_OR_FRESH, GetMode.STALE_WHILE_REVALIDATE],
         *,
         from_date: datetime | None = None,
         to_date: datetime | None = None,
         limit: int | None = None,
+        token: cancellation.CancellationToken | None = None,
     ) -> list[Komens]:
-        """Načte a vrátí komens zprávy z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné komens zprávy, pokusí se načíst nové.
+        """Načte a vrátí komens zprávy z vlastní looting instance. Pokud v looting instanci nejsou přítomny žádné komens zprávy nebo jsou zastaralé (viz `BakalariAPI.max_ages`), pokusí se načíst nové.
+
+        Při `GetMode.STALE_WHILE_REVALIDATE` se zastaralá data vrátí ihned a nová se načtou na pozadí.
 
         Kvůli limitaci Bakalářů je možné případně načíst pouze 300 zpráv na jednou.
-        Pokud jsou schůzky přítomny v looting instanci, argumenty této metody jsou nepodstatné.
+        Pokud jsou v looting instanci přítomny aktuální komens zprávy, argumenty této metody jsou nepodstatné.
 
         Args:
             from_date:
@@ -839,26 +1319,22 @@ class BakalariAPI:
     def get_komens(self, mode: GetMode, **kwargs) -> list[Komens]:
         kwargs = {"from_date": None, "to_date": None, "limit": None, **kwargs}
 
-        if mode == GetMode.CACHED:
-            return self.looting.get(Komens)
-        elif mode == GetMode.FRESH:
-            if self.is_partial_init:
-                raise exceptions.PartialInitError()
-            return self._resolve(
+        return self._get(
+            Komens,
+            mode,
+            lambda: self._resolve(
                 self._parse(
                     modules.komens.getter_komens_ids(
                         self, kwargs["from_date"], kwargs["to_date"]
                     )
                 ).get(UnresolvedID)[: kwargs["limit"]]
-            ).get(Komens)
-        elif mode == GetMode.CACHED_OR_FRESH:
-            output = self.get_komens(GetMode.CACHED)
-            return (
-                self.get_komens(GetMode.FRESH, **kwargs) if len(output) == 0 else output
-            )
-        raise ValueError
+            ).get(Komens),
+            kwargs.get("token"),
+        )
 
-    def get_all_komens(self) -> list[Komens]:
+    def get_all_komens(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Komens]:
         """Nově načte a vrátí všechny komens zprávy.
 
         Vždy načítá čerstvá data z Bakalářů.
@@ -871,8 +1347,412 @@ class BakalariAPI:
             GetMode.FRESH,
             from_date=datetime(1953, 1, 1),
             to_date=datetime.today() + timedelta(1),
+            token=token,
         )
 
+    # ITERATORS
+    def _iter_resolve(
+        self,
+        unresolved: list[UnresolvedID[BakalariObj]],
+        progress: Callable[[int, int], None] | None = None,
+        workers: int | None = None,
+        token: cancellation.CancellationToken | None = None,
+    ) -> Iterator[BakalariObj]:
+        """Resolvuje daná UnresolvedID a postupně vrací (yielduje) výsledné objekty ve stejném pořadí.
+
+        Najednou se resolvuje (resp. je "dopředu" rozpracováno) maximálně dvojnásobek `workers` ID, takže pokud
+        se iterace ukončí dříve, zbytečně se nenačítají všechna ID. Výsledné objekty se ukládají do looting instance.
+
+        Args:
+            unresolved:
+                UnresolvedID, která se mají resolvovat.
+            progress:
+                Funkce, která se volá s počtem hotových a celkovým počtem objektů (poprvé ještě před resolvováním).
+            workers:
+                Maximální počet UnresolvedID, které se resolvují najednou.
+                Pokud je `None`, použije se hodnota atributu `resolve_workers`.
+            token:
+                Token, kterým lze resolvování zrušit. Pokud je `None`, platí token aktuálního kontextu.
+        """
+        total = len(unresolved)
+        if progress is not None:
+            progress(0, total)
+        if total == 0:
+            return
+        workers = max(1, self.resolve_workers if workers is None else workers)
+        remaining = iter(unresolved)
+        in_flight: deque[Future] = deque()
+        # Podřízený token, přes který zastavíme rozběhnuté resolvery, pokud iterace skončí dříve
+        token = cancellation.CancellationToken(
+            parent=cancellation.current() if token is None else token
+        )
+        executor = ThreadPoolExecutor(min(workers, total), "bakalariapi-resolve")
+        try:
+            for o in islice(remaining, 2 * workers):
+                in_flight.append(
+                    executor.submit(cancellation.run_with, token, _resolve_one, o, self)
+                )
+            completed = 0
+            while len(in_flight) != 0:
+                result = in_flight.popleft().result()
+                for o in islice(remaining, 1):
+                    in_flight.append(
+                        executor.submit(
+                            cancellation.run_with, token, _resolve_one, o, self
+                        )
+                    )
+                self.looting.add_loot(result)
+                completed += 1
+                if progress is not None:
+                    progress(completed, total)
+                yield result
+        finally:
+            # Pokud iterace skončila dříve (nebo nastala chyba), tak další (ještě nezačaté) resolvování už nechceme
+            token.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Objekty, které se stihly resolvovat (ale už se nevrátily), nezahazujeme
+            self.looting.add_loot(_completed_results(in_flight))
+
+    def iter_komens(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        limit: int | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        token: cancellation.CancellationToken | None = None,
+    ) -> Iterator[Komens]:
+        """Nově načte komens zprávy a postupně je vrací, jakmile je každá z nich načtena.
+
+        Zprávy jsou vraceny ve stejném pořadí, v jakém je vrátil server (tedy stejně jako u `get_komens()`).
+        Data se začnou načítat až při první iteraci.
+
+        Args:
+            from_date:
+                Viz `get_komens()`.
+            to_date:
+                Viz `get_komens()`.
+            limit:
+                Viz `get_komens()`.
+            progress:
+                Funkce, která se volá s počtem načtených a celkovým počtem zpráv.
+            token:
+                Token, kterým lze načítání zrušit (viz `cancellation`).
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+            OperationCancelledError: Pokud bylo načítání zrušeno.
+        """
+        if self.is_partial_init:
+            raise exceptions.PartialInitError()
+        getter_output = cancellation.run_with(
+            token, modules.komens.getter_komens_ids, self, from_date, to_date
+        )
+        unresolved = self._parse(getter_output).get(UnresolvedID)[:limit]
+        yield from self._iter_resolve(unresolved, progress, token=token)
+
+    def iter_meetings(
+        self,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        token: cancellation.CancellationToken | None = None,
+    ) -> Iterator[Meeting]:
+        """Nově načte schůzky a postupně je vrací, jakmile je každá z nich načtena.
+
+        Schůzky jsou vraceny ve stejném pořadí, v jakém je vrátil server (tedy stejně jako u `get_meetings()`).
+        Data se začnou načítat až při první iteraci.
+
+        Args:
+            from_date:
+                Určuje datum a čas, od kterého se mají schůzky načíst.
+                Pokud `from_date` i `to_date` jsou `None`, načtou se nadcházející schůzky.
+                Pokud je `None` (a `to_date` není), načtou se schůzky od nejmenšího možného času.
+            to_date:
+                Určuje datum a čas, do kterého se mají schůzky načíst.
+                Pokud je `None` (a `from_date` není), načtou se schůzky do největšího možného času.
+            progress:
+                Funkce, která se volá s počtem načtených a celkovým počtem schůzek.
+            token:
+                Token, kterým lze načítání zrušit (viz `cancellation`).
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+            OperationCancelledError: Pokud bylo načítání zrušeno.
+        """
+        if self.is_partial_init:
+            raise exceptions.PartialInitError()
+        if from_date is None and to_date is None:
+            getter_output = cancellation.run_with(
+                token, modules.meetings.getter_future_meetings_ids, self
+            )
+        else:
+            getter_output = cancellation.run_with(
+                token,
+                modules.meetings.getter_meetings_ids,
+                self,
+                datetime(1, 1, 1) if from_date is None else from_date,
+                datetime(9999, 12, 31, 23, 59, 59) if to_date is None else to_date,
+            )
+        unresolved = [
+            o for o in self._parse(getter_output).get(UnresolvedID) if o.type is Meeting
+        ]
+        yield from self._iter_resolve(unresolved, progress, token=token)
+
+    # FETCH
+    def fetch(
+        self,
+        types: list[type[BakalariObject]],
+        workers: int | None = None,
+        progress: Callable[[type[BakalariObject], int, int], None] | None = None,
+        incremental: bool = False,
+        token: cancellation.CancellationToken | None = None,
+    ) -> looting.ResultSet:
+        """Nově načte data několika typů najednou.
+
+        Naplánuje všechny potřebné gettery (stránky, které potřebuje více typů, např. přehled schůzek
+        pro schůzky i studenty, se načtou pouze jednou) a resolvery a vykoná je souběžně na sdíleném
+        počtu threadů (a tedy i sessionů). Resolvery se spouští hned, jak je načtená stránka s jejich ID.
+
+        Podporované typy a co se pro ně načte:
+            `Grade` - Všechny známky (resp. při `incremental` známky od poslední synchronizace)
+            `Homework` - Úkoly v "rychlém módu" (viz `get_homeworks()`)
+            `Komens` - Všechny komens zprávy (resp. při `incremental` nové zprávy od poslední synchronizace,
+                při první synchronizaci zprávy z výchozího období serveru)
+            `Meeting` - Nadcházející schůzky (resp. při `incremental` nové schůzky od poslední synchronizace,
+                při první synchronizaci nadcházející schůzky)
+            `Student` - Studenti
+
+        Args:
+            types:
+                Typy objektů, které se mají načíst.
+            workers:
+                Maximální počet getterů a resolverů, které běží najednou.
+                Pokud je `None`, použije se hodnota atributu `resolve_workers`.
+            progress:
+                Funkce, která se volá při postupu načítání s argumenty typ, počet hotových a celkový počet objektů daného typu.
+                Za hotové se počítají i ID, která se nepodařilo vyřešit (ve výsledku tedy být nemusí).
+                Volá se z threadu, který `fetch()` zavolal.
+            incremental:
+                Pokud `True`, načtou se pouze data od poslední úspěšné synchronizace (s překryvem `sync_overlap`),
+                již známá ID se neresolvují a po úspěšném načtení se posune kurzor synchronizace (viz `Looting.cursors`).
+            token:
+                Token, kterým lze načítání zrušit (viz `cancellation`). Pokud je `None`, platí token aktuálního kontextu.
+
+        Returns:
+            ResultSet, který obsahuje všechny načtené objekty (bez `UnresolvedID`).
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+            ValueError: Pokud některý z typů není podporován.
+            OperationCancelledError: Pokud bylo načítání zrušeno; Data načtená do té doby jsou uložena v looting instanci,
+                kurzory synchronizace se ale neposunou.
+        """
+        if self.is_partial_init:
+            raise exceptions.PartialInitError()
+        started = datetime.now()
+
+        # Plán - klíč stránky => getter stránky; typ => (klíč stránky, endpoint kurzoru)
+        pages: dict[str, Callable[[], looting.GetterOutput]] = {}
+        plan: dict[type[BakalariObject], tuple[str, str | None]] = {}
+        for type_ in types:
+            if type_ is Grade:
+                from_date = self._sync_from(Endpoint.GRADES) if incremental else None
+                if from_date is None:
+                    from_date = datetime(1, 1, 1)
+                pages["grades"] = partial(modules.grades.getter, self, from_date)
+                plan[Grade] = ("grades", Endpoint.GRADES)
+            elif type_ is Homework:
+                pages["homeworks"] = partial(modules.homeworks.getter_fast, self)
+                plan[Homework] = ("homeworks", None)
+            elif type_ is Komens:
+                if incremental:
+                    # Bez kurzoru se načtou zprávy z výchozího období serveru, ne celá historie
+                    from_date = self._sync_from(Endpoint.KOMENS)
+                    to_date = None if from_date is None else started + timedelta(1)
+                else:
+                    from_date = datetime(1953, 1, 1)
+                    to_date = started + timedelta(1)
+                pages["komens"] = partial(
+                    modules.komens.getter_komens_ids, self, from_date, to_date
+                )
+                plan[Komens] = ("komens", Endpoint.KOMENS)
+            elif type_ is Meeting:
+                from_date = (
+                    self._sync_from(Endpoint.MEETINGS_OVERVIEW) if incremental else None
+                )
+                if from_date is not None:
+                    pages["meetings"] = partial(
+                        modules.meetings.getter_meetings_ids,
+                        self,
+                        from_date,
+                        datetime(9999, 12, 31, 23, 59, 59),
+                    )
+                    plan[Meeting] = ("meetings", Endpoint.MEETINGS_OVERVIEW)
+                else:
+                    # Bez kurzoru (první synchronizace) se načtou pouze nadcházející schůzky, ne celá historie
+                    pages["meetings_future"] = partial(
+                        modules.meetings.getter_future_meetings_ids, self
+                    )
+                    plan[Meeting] = (
+                        "meetings_future",
+                        Endpoint.MEETINGS_OVERVIEW if incremental else None,
+                    )
+            elif type_ is Student:
+                # Studenti jsou (pouze) na HTML stránce nadcházejících schůzek
+                pages["meetings_future"] = partial(
+                    modules.meetings.getter_future_meetings_ids, self
+                )
+                plan[Student] = ("meetings_future", None)
+            else:
+                raise ValueError(f"Typ {type_.__name__} nelze načíst přes fetch()")
+
+        def report(type_: type[BakalariObject], completed: int, total: int):
+            if progress is not None:
+                progress(type_, completed, total)
+
+        def to_resolve(
+            result: looting.ResultSet, type_: type[BakalariObject]
+        ) -> list[UnresolvedID]:
+            return [
+                o
+                for o in result.get(UnresolvedID)
+                if o.type is type_
+                and not (incremental and self.looting.have_id(type_, o.ID))
+            ]
+
+        output = looting.ResultSet()
+        resolving: dict[type[BakalariObject], list[int]] = {}
+        # Podřízený token, přes který zastavíme rozběhnuté úlohy, pokud nastane chyba (nebo Ctrl+C)
+        token = cancellation.CancellationToken(
+            parent=cancellation.current() if token is None else token
+        )
+        executor = ThreadPoolExecutor(
+            self.resolve_workers if workers is None else workers, "bakalariapi-fetch"
+        )
+        pending: dict[Future, str | type[BakalariObject]] = {}
+        try:
+            pending = {
+                executor.submit(
+                    cancellation.run_with,
+                    token,
+                    lambda getter: self._parse(getter()),
+                    getter,
+                ): key
+                for key, getter in pages.items()
+            }
+            while len(pending) != 0:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = pending.pop(future)
+                    result = future.result()
+                    if isinstance(key, str):
+                        # Stránka
+                        for type_, (page, _) in plan.items():
+                            if page != key:
+                                continue
+                            if type_ in _resolvers:
+                                unresolved = to_resolve(result, type_)
+                                resolving[type_] = [0, len(unresolved)]
+                                report(type_, 0, len(unresolved))
+                                for o in unresolved:
+                                    pending[
+                                        executor.submit(
+                                            cancellation.run_with,
+                                            token,
+                                            _resolve_one,
+                                            o,
+                                            self,
+                                        )
+                                    ] = type_
+                            else:
+                                objs = result.get(type_)
+                                output.add_loot(objs)
+                                report(type_, len(objs), len(objs))
+                    else:
+                        # Resolvované ID; Pokud se ho nepodařilo vyřešit, vrátí se samo
+                        # (a v looting instanci už je z parsování stránky)
+                        if not isinstance(result, UnresolvedID):
+                            output.add_loot(result)
+                            self.looting.add_loot(result)
+                        resolving[key][0] += 1
+                        report(key, *resolving[key])
+        except BaseException:
+            token.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Stránky se do looting instance ukládají už při parsování, resolvované objekty ale musíme uložit sami
+            self.looting.add_loot(
+                _completed_results(
+                    future for future, key in pending.items() if not isinstance(key, str)
+                )
+            )
+            raise
+        finally:
+            # Pokud nastala chyba, tak další (ještě nezačaté) úlohy už nechceme
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if incremental:
+            for _, endpoint in plan.values():
+                if endpoint is not None:
+                    self.looting.set_cursor(endpoint, started)
+        return output
+
+    # SYNC
+    def _sync_from(self, endpoint: str) -> datetime | None:
+        """Vrátí datum, od kterého se má endpoint synchronizovat (viz `sync_overlap`); Bez kurzoru navrátí `None`."""
+        cursor = self.looting.get_cursor(endpoint)
+        return None if cursor is None else cursor - self.sync_overlap
+
+    def sync_grades(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Grade]:
+        """Načte známky, které přibyly od poslední synchronizace.
+
+        Při první synchronizaci (tzn. pokud v looting instanci není kurzor pro známky) se načtou všechny známky,
+        při dalších pouze známky od začátku poslední úspěšné synchronizace (minus `sync_overlap`).
+
+        Returns:
+            List známek načtených touto synchronizací.
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+        """
+        return self.fetch([Grade], incremental=True, token=token).get(Grade)
+
+    def sync_komens(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Komens]:
+        """Načte komens zprávy, které přibyly od poslední synchronizace.
+
+        Při první synchronizaci se načtou zprávy z výchozího období serveru (ne celá historie; Pro tu viz
+        `get_all_komens()`), při dalších pouze zprávy od začátku poslední
+        úspěšné synchronizace (minus `sync_overlap`). Zprávy, které již jsou v looting instanci, se znovu nenačítají
+        (tzn. nezjistí se ani např. změna potvrzení zprávy). Kvůli limitaci Bakalářů je možné načíst pouze 300 zpráv na jednou.
+
+        Returns:
+            List nově načtených komens zpráv.
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+        """
+        return self.fetch([Komens], incremental=True, token=token).get(Komens)
+
+    def sync_meetings(
+        self, token: cancellation.CancellationToken | None = None
+    ) -> list[Meeting]:
+        """Načte schůzky, které přibyly od poslední synchronizace.
+
+        Při první synchronizaci se načtou pouze nadcházející schůzky, při dalších schůzky, které začínají nejdříve
+        na začátku poslední úspěšné synchronizace (minus `sync_overlap`). Schůzky, které již jsou v looting instanci,
+        se znovu nenačítají.
+
+        Returns:
+            List nově načtených schůzek.
+
+        Raises:
+            PartialInitError: Pokud není instance plně inicializována.
+        """
+        return self.fetch([Meeting], incremental=True, token=token).get(Meeting)
+
     def _parse(
         self, getter_output: looting.GetterOutput[looting.GetterOutputTypeVar]
     ) -> looting.ResultSet:
@@ -889,14 +1769,102 @@ class BakalariAPI:
         Returns:
             ResultSet, který obsahuje všechna data od jednotlivých parserů.
         """
-        output = _parse(getter_output)
+        if getter_output.is_streamed and getter_output.endpoint in _stream_parsers:
+            return self._parse_stream(getter_output)
+        self._archive(getter_output)
+        key = (getter_output.endpoint, getter_output.query)
+        digest = None
+        if self.skip_unchanged and getter_output.raw is not None:
+            digest = hashlib.sha256(getter_output.raw).digest()
+            unchanged = self._ingest_unchanged(key, digest)
+            if unchanged is not None:
+                getter_output.release()
+                return unchanged
+        if (
+            self.parse_executor is not None
+            and not getter_output.is_loaded
+            and getter_output.raw is not None
+        ):
+            output = self.parse_executor.submit(
+                _parse_raw,
+                getter_output.endpoint,
+                getter_output.type,
+                getter_output.raw,
+            ).result()
+        else:
+            output = _parse(getter_output)
         self.looting.add_result_set(output)
+        if digest is not None:
+            refs = looting.Looting.ref_result_set(output)
+            with self.__ingested_lock:
+                self.__ingested[key] = (digest, refs)
+                self.__ingested.move_to_end(key)
+                while len(self.__ingested) > self.skip_unchanged_pages:
+                    self.__ingested.popitem(last=False)
+        return output
+
+    def _ingest_unchanged(
+        self, key: tuple[str, str | None], digest: bytes
+    ) -> looting.ResultSet | None:
+        """Zpracuje stránku, pokud se od jejího posledního parsování nezměnila (viz `skip_unchanged`).
+
+        Returns:
+            Objekty z posledního parsování stránky (v looting instanci se pouze označí jako aktuální);
+            Pokud se stránka změnila (nebo ještě parsována nebyla, případně její objekty v looting instanci už nejsou),
+            navrátí `None`.
+        """
+        with self.__ingested_lock:
+            last = self.__ingested.get(key)
+            if last is None or last[0] != digest:
+                return None
+            self.__ingested.move_to_end(key)
+        # Pokud v looting instanci objekty už nejsou (např. byla nahrazena), stránka se musí naparsovat znovu
+        output = self.looting.touch(last[1], datetime.now())
+        if output is not None:
+            with self.__ingested_lock:
+                self.ingest_skipped += 1
         return output
 
+    def _is_streamed(self, endpoint: str) -> bool:
+        """Má se stránka daného endpointu načíst jako stream (viz `stream_parsing`)?"""
+        return self.stream_parsing and endpoint in _stream_parsers
+
+    def _parse_stream(
+        self, getter_output: looting.GetterOutput[BeautifulSoup]
+    ) -> looting.ResultSet:
+        """Naparsuje streamovaný GetterOutput streamovými parsery jeho endpointu už během čtení jeho dat.
+
+        Extrahované objekty se do looting instance přidávají průběžně (po každé přečtené části dat).
+
+        Args:
+            getter_output:
+                GetterOutput vytvořený přes `GetterOutput.from_stream()`.
+
+        Returns:
+            ResultSet, který obsahuje všechna data od jednotlivých streamových parserů.
+        """
+        output = looting.ResultSet()
+        for result_set in _parse_stream(getter_output, self.archive is not None):
+            self.looting.add_result_set(result_set)
+            output.merge(result_set)
+        self._archive(getter_output)
+        return output
+
+    def _archive(self, getter_output: looting.GetterOutput):
+        """Uloží surová data GetterOutput(u) do archivu (viz `archive`); Pokud archiv není nastaven, nedělá nic."""
+        if self.archive is None or getter_output.raw is None:
+            return
+        try:
+            self.archive.store(getter_output)
+        except OSError:
+            # Archivace je "bonus", takže kvůli ní nechceme shodit získávání dat
+            LOGGER.exception("Archiving of %s data failed", getter_output.endpoint)
+
     def _resolve(
         self,
         unresolved: UnresolvedID | list[UnresolvedID] | looting.ResultSet,
         silence_querry_errors: bool = False,
+        workers: int | None = None,
     ) -> looting.ResultSet:
         """Pokusí se získat plnohodnotný objekt pro dané UnresolvedID za pomoci registrovaných resolverů.
 
@@ -907,6 +1875,11 @@ class BakalariAPI:
         Args:
             unresolved:
                 Jedno nebo více UnresolvedID, pro které se BakalářiAPI pokusí získat plnohodnotný objekt.
+            silence_querry_errors:
+                Pokud `True`, `BakalariQuerrySuccessError` z resolveru se ignoruje a zkusí se další resolver.
+            workers:
+                Maximální počet UnresolvedID, které se resolvují najednou.
+                Pokud je `None`, použije se hodnota atributu `resolve_workers`.
 
         Returns:
             ResultSet, který obsahuje všechna data od jednotlivých resolverů.
@@ -916,12 +1889,25 @@ class BakalariAPI:
         """
         if self.is_partial_init:
             raise exceptions.PartialInitError()
-        output = _resolve(unresolved, self, silence_querry_errors)
+        output = _resolve(
+            unresolved,
+            self,
+            silence_querry_errors,
+            self.resolve_workers if workers is None else workers,
+        )
         self.looting.add_result_set(output)
         return output
 
 
-from . import exceptions, looting, modules, seleniumhandler, sessions
+from . import (
+    archive,
+    cancellation,
+    exceptions,
+    looting,
+    modules,
+    seleniumhandler,
+    sessions,
+)
 from .objects import (
     BakalariObj,
     BakalariObject,
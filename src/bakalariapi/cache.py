@@ -0,0 +1,419 @@
+"""Modul obsahující cache HTTP odpovědí pro `RequestsSession`.
+
+Tento modul primárně implementuje:
+    ResponseCache - Cache odpovědí s TTL pro jednotlivé endpointy a revalidací přes `ETag`/`Last-Modified`
+    MemoryCacheBackend - Úložiště odpovědí v paměti (LRU)
+    DiskCacheBackend - Úložiště odpovědí na disku (LRU)
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import time
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .bakalari import Endpoint
+
+__all__ = [
+    "ResponseCache",
+    "ResponseCacheStats",
+    "CacheEntry",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "DiskCacheBackend",
+]
+
+
+class CacheEntry:
+    """Uložená odpověď serveru.
+
+    Atributy:
+        status:
+            Status kód odpovědi.
+        headers:
+            Hlavičky odpovědi.
+        content:
+            Obsah (tělo) odpovědi.
+        url:
+            (Konečná) URL odpovědi.
+        encoding:
+            Kódování odpovědi (viz `requests.Response.encoding`).
+        stored_at:
+            Čas (UNIX timestamp), kdy byla odpověď uložena (nebo naposledy revalidována).
+    """
+
+    def __init__(
+        self,
+        status: int,
+        headers: dict[str, str],
+        content: bytes,
+        url: str,
+        encoding: str | None,
+        stored_at: float,
+    ):
+        self.status: int = status
+        self.headers: dict[str, str] = headers
+        self.content: bytes = content
+        self.url: str = url
+        self.encoding: str | None = encoding
+        self.stored_at: float = stored_at
+
+    @property
+    def etag(self) -> str | None:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> str | None:
+        return self.headers.get("Last-Modified")
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> CacheEntry:
+        return cls(
+            response.status_code,
+            dict(response.headers),
+            response.content,
+            response.url,
+            response.encoding,
+            time(),
+        )
+
+    def to_response(self) -> requests.Response:
+        """Vytvoří z uložené odpovědi novou `requests.Response` instanci."""
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.url = self.url
+        response.encoding = self.encoding
+        return response
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "headers": self.headers,
+            "content": base64.b64encode(self.content).decode("ascii"),
+            "url": self.url,
+            "encoding": self.encoding,
+            "stored_at": self.stored_at,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> CacheEntry:
+        return cls(
+            data["status"],
+            data["headers"],
+            base64.b64decode(data["content"]),
+            data["url"],
+            data["encoding"],
+            data["stored_at"],
+        )
+
+
+class CacheBackend(ABC):
+    """Základní třída pro úložiště odpovědí."""
+
+    @abstractmethod
+    def get(self, key: str) -> CacheEntry | None:
+        """Vrátí uloženou odpověď pro daný klíč; Pokud pro klíč není nic uloženo, vrátí `None`."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry):
+        """Uloží odpověď pod daný klíč."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Odstraní uloženou odpověď pro daný klíč."""
+
+    @abstractmethod
+    def clear(self):
+        """Odstraní všechny uložené odpovědi."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Úložiště odpovědí v paměti.
+
+    Pokud je uloženo více než `max_entries` odpovědí, odstraní se nejdéle nepoužité (LRU).
+
+    Atributy:
+        max_entries:
+            Maximální počet uložených odpovědí.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries: int = max_entries
+        self.__lock = Lock()
+        self.__entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+
+class DiskCacheBackend(CacheBackend):
+    """Úložiště odpovědí na disku.
+
+    Každá odpověď je uložena v samostatném souboru v adresáři `directory`. Pořadí použití se určuje
+    podle času modifikace souborů - pokud je uloženo více než `max_entries` odpovědí, odstraní se nejdéle nepoužité (LRU).
+    Pozn.: Odpovědi obsahují osobní data, takže se soubory vytváří s právy pouze pro vlastníka.
+
+    Atributy:
+        directory:
+            Adresář, do kterého se odpovědi ukládají.
+        max_entries:
+            Maximální počet uložených odpovědí.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1024):
+        self.directory: str = directory
+        self.max_entries: int = max_entries
+        self.__lock = Lock()
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        with self.__lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = CacheEntry.from_json(json.load(f))
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+            except (ValueError, KeyError, OSError):
+                # Poškozený záznam (např. nedokončený zápis) prostě zahodíme
+                self.__remove(path)
+                return None
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with self.__lock:
+            with open(
+                os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                json.dump(entry.to_json(), f)
+            os.replace(tmp, path)
+            self.__evict()
+
+    def delete(self, key: str):
+        with self.__lock:
+            self.__remove(self._path(key))
+
+    def clear(self):
+        with self.__lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    self.__remove(os.path.join(self.directory, name))
+
+    def __remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def __evict(self):
+        files = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(".json")
+        ]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda x: x.stat().st_mtime)
+        for entry in files[: len(files) - self.max_entries]:
+            self.__remove(entry.path)
+
+
+class ResponseCacheStats:
+    """Statistiky `ResponseCache`.
+
+    Atributy:
+        hits:
+            Počet requestů, na které se odpovědělo z cache (bez requestu na server).
+        misses:
+            Počet cachovatelných requestů, které se musely poslat na server (a server vrátil nová data).
+        revalidations:
+            Počet requestů, u kterých server potvrdil (status kód 304), že uložená odpověď je stále platná.
+    """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+
+
+class ResponseCache:
+    """Cache HTTP odpovědí pro `RequestsSession` (viz `SessionManager.response_cache`).
+
+    Cachují se pouze úspěšné (status kód 200, bez přesměrování) odpovědi na GET a POST requesty na endpointy
+    v `ttls`. Klíčem je metoda, URL, tělo (a parametry) requestu a uživatelské jméno, takže jedna cache
+    (resp. jedno úložiště) může být sdílena více účty. Po uplynutí TTL se odpověď nezahodí, ale pokud server
+    poslal `ETag` nebo `Last-Modified` hlavičku, request se pošle jako podmíněný a pokud server odpoví 304,
+    použije se uložená odpověď. Po úspěšném requestu na endpoint v `invalidate_on` (tedy requestu, který mění
+    data na serveru) se cache vyprázdní.
+
+    Atributy:
+        backend:
+            Úložiště odpovědí.
+        ttls:
+            Slovník, kde klíč je endpoint (viz `Endpoint`) a hodnota doba v sekundách, po kterou je uložená odpověď platná.
+            Odpovědi z endpointů, které ve slovníku nejsou, se necachují.
+        invalidate_on:
+            Endpointy, po jejichž úspěšném requestu se cache vyprázdní.
+        stats:
+            Statistiky cache.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.backend: CacheBackend = (
+            MemoryCacheBackend() if backend is None else backend
+        )
+        self.ttls: dict[str, float] = (
+            {
+                Endpoint.GRADES: 60,
+                Endpoint.HOMEWORKS: 60,
+                Endpoint.KOMENS: 60,
+                Endpoint.KOMENS_GET: 300,
+                Endpoint.MEETINGS_OVERVIEW: 60,
+                Endpoint.MEETINGS_INFO: 300,
+                Endpoint.USER_INFO: 3600,
+            }
+            if ttls is None
+            else ttls
+        )
+        self.invalidate_on: set[str] = {
+            Endpoint.KOMENS_CONFIRM,
+            Endpoint.HOMEWORKS_DONE,
+        }
+        self.stats: ResponseCacheStats = ResponseCacheStats()
+
+    @staticmethod
+    def _match(url: str, endpoints) -> str | None:
+        path = urlparse(url).path
+        for endpoint in endpoints:
+            # Endpointy končící "/" mají za sebou ještě parametr v cestě (např. "MEETINGS_INFO")
+            if path.endswith(endpoint) or (
+                endpoint.endswith("/") and endpoint in path
+            ):
+                return endpoint
+        return None
+
+    def ttl_for(self, method: str, url: str) -> float | None:
+        """Vrátí TTL pro daný request; Pokud se request necachuje, vrátí `None`."""
+        if method.upper() not in ("GET", "POST"):
+            return None
+        endpoint = self._match(url, self.ttls)
+        return None if endpoint is None else self.ttls[endpoint]
+
+    @staticmethod
+    def key(method: str, url: str, username: str | None, **kwargs) -> str:
+        """Vrátí klíč pro daný request."""
+        body = json.dumps(
+            [
+                kwargs.get("params"),
+                kwargs.get("data"),
+                kwargs.get("json"),
+            ],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(
+            "\n".join((method.upper(), url, body, username or "")).encode()
+        ).hexdigest()
+
+    def clear(self):
+        """Odstraní všechny uložené odpovědi."""
+        self.backend.clear()
+
+    def fetch(
+        self,
+        method: str,
+        url: str,
+        username: str | None,
+        send: Callable[..., requests.Response],
+        **kwargs,
+    ) -> requests.Response:
+        """Vrátí odpověď na request z cache; Pokud v cache není (nebo již neplatí), pošle request přes `send`.
+
+        Args:
+            method:
+                HTTP metoda requestu.
+            url:
+                URL requestu.
+            username:
+                Uživatelské jméno, pod kterým se request posílá.
+            send:
+                Funkce, která request pošle; Dostane `kwargs` (případně doplněné o hlavičky pro podmíněný request).
+
+        Returns:
+            Odpověď serveru (nebo uložená odpověď).
+        """
+        ttl = self.ttl_for(method, url)
+        if ttl is None:
+            response = send(**kwargs)
+            if response.ok and self._match(url, self.invalidate_on) is not None:
+                self.clear()
+            return response
+
+        key = self.key(method, url, username, **kwargs)
+        entry = self.backend.get(key)
+        if entry is not None:
+            if time() - entry.stored_at < ttl:
+                self.stats.hits += 1
+                return entry.to_response()
+            headers = dict(kwargs.get("headers") or {})
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+            if len(headers) != 0:
+                kwargs["headers"] = headers
+
+        response = send(**kwargs)
+        if entry is not None and response.status_code == 304:
+            self.stats.revalidations += 1
+            entry.stored_at = time()
+            self.backend.set(key, entry)
+            return entry.to_response()
+        self.stats.misses += 1
+        # Přesměrování (typicky na přihlášení při neplatné session) se cachovat nesmí
+        if response.status_code == 200 and len(response.history) == 0:
+            self.backend.set(key, CacheEntry.from_response(response))
+        return response
@@ -0,0 +1,203 @@
+"""Modul obsahující deadliny a kooperativní rušení operací.
+
+Tento modul primárně implementuje:
+    CancellationToken - Token, přes který lze operaci zrušit (ručně nebo vypršením deadlinu)
+    current - Navrátí token platný v aktuálním kontextu
+
+Token se nepředává explicitně každému getteru a resolveru, ale platí pro celý kontext (viz `contextvars`),
+ve kterém je aktivní (`with token: ...`). `BakalariAPI` token propaguje i do vláken, ve kterých paralelně
+získává data, a `Transport` podle něj omezuje timeouty requestů.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, copy_context
+from threading import Event
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+from .exceptions import DeadlineExceededError, OperationCancelledError
+
+if TYPE_CHECKING:
+    from .transport import Timeout
+
+__all__ = ["CancellationToken", "current", "check", "limit_timeout", "run_with"]
+
+T = TypeVar("T")
+
+_current: ContextVar[CancellationToken | None] = ContextVar(
+    "bakalariapi_cancellation", default=None
+)
+# Zásobník tokenů pro `ContextVar.reset()` z `with` bloků; Musí být v kontextu (ne per-thread),
+# jelikož asyncio tasky sdílí thread, ale každý má vlastní kontext a `with` bloky opouští v libovolném pořadí
+_resets: ContextVar[tuple] = ContextVar("bakalariapi_cancellation_resets", default=())
+
+
+class CancellationToken:
+    """Token pro kooperativní zrušení operace.
+
+    Operace je zrušena, pokud byla zavolána metoda `cancel()`, vypršel deadline nebo byl zrušen rodičovský token.
+    Operace samotné se nepřerušují, ale před každým requestem (a v dalších "bezpečných" bodech) kontrolují
+    stav tokenu a případně vyhodí `OperationCancelledError` (resp. `DeadlineExceededError`).
+    Timeouty requestů se navíc omezí zbývajícím časem do deadlinu.
+
+    Token je context manager, který se po dobu `with` bloku nastaví jako token aktuálního kontextu (viz `current()`).
+    Do jiných threadů se token nepropaguje sám, funkce v nich je potřeba spustit přes `run_with()`.
+
+    Atributy:
+        deadline:
+            Deadline jako hodnota `time.monotonic()`; Pokud `None`, token deadline nemá.
+        parent:
+            Rodičovský token; Pokud je zrušen, je zrušen i tento token.
+    """
+
+    def __init__(
+        self,
+        timeout: float | None = None,
+        *,
+        deadline: float | None = None,
+        parent: CancellationToken | None = None,
+    ):
+        """
+        Args:
+            timeout:
+                Počet sekund (od teď), za které operace vyprší.
+            deadline:
+                Deadline jako hodnota `time.monotonic()`. Pokud je specifikován i `timeout`, platí dřívější z nich.
+            parent:
+                Rodičovský token.
+        """
+        if timeout is not None:
+            timeout_deadline = time.monotonic() + timeout
+            deadline = (
+                timeout_deadline if deadline is None else min(deadline, timeout_deadline)
+            )
+        self.deadline: float | None = deadline
+        self.parent: CancellationToken | None = parent
+        self.__event = Event()
+
+    def cancel(self):
+        """Zruší operaci (a všechny operace s tokeny, které mají tento token jako rodiče)."""
+        self.__event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Je operace zrušena (ručně, vypršením deadlinu nebo zrušením rodiče)?"""
+        if self.__event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.parent is not None and self.parent.cancelled
+
+    def remaining(self) -> float | None:
+        """Navrátí počet sekund do (nejbližšího) deadlinu; Pokud žádný deadline není, navrátí `None`."""
+        remaining = None
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.monotonic())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None and (
+                remaining is None or parent_remaining < remaining
+            ):
+                remaining = parent_remaining
+        return remaining
+
+    def check(self):
+        """Pokud je operace zrušena, vyhodí výjimku.
+
+        Raises:
+            DeadlineExceededError: Pokud vypršel deadline.
+            OperationCancelledError: Pokud byla operace zrušena.
+        """
+        if not self.cancelled:
+            return
+        if self._explicitly_cancelled():
+            raise OperationCancelledError("Operace byla zrušena")
+        raise DeadlineExceededError("Vypršel deadline operace")
+
+    def _explicitly_cancelled(self) -> bool:
+        return self.__event.is_set() or (
+            self.parent is not None and self.parent._explicitly_cancelled()
+        )
+
+    def limit_timeout(self, timeout: Timeout) -> Timeout:
+        """Omezí daný timeout (viz parametr `timeout` v `requests` modulu) zbývajícím časem do deadlinu.
+
+        Raises:
+            DeadlineExceededError: Pokud už deadline vypršel.
+            OperationCancelledError: Pokud byla operace zrušena.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return (min(timeout[0], remaining), min(timeout[1], remaining))
+        return min(timeout, remaining)
+
+    def wait(self, seconds: float) -> bool:
+        """Počká daný počet sekund (maximálně však do deadlinu) nebo do zrušení.
+
+        Returns:
+            `True`, pokud byla operace během čekání zrušena, jinak `False`.
+        """
+        end = time.monotonic() + seconds
+        while not self.cancelled:
+            left = end - time.monotonic()
+            if left <= 0:
+                break
+            remaining = self.remaining()
+            if remaining is not None:
+                left = min(left, remaining)
+            # Zrušení rodiče nenastaví náš event, takže v tom případě čekáme po kratších úsecích
+            self.__event.wait(left if self.parent is None else min(left, 0.1))
+        return self.cancelled
+
+    def __enter__(self) -> CancellationToken:
+        _resets.set(_resets.get() + (_current.set(self),))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        resets = _resets.get()
+        _resets.set(resets[:-1])
+        _current.reset(resets[-1])
+
+
+def current() -> CancellationToken | None:
+    """Navrátí token platný v aktuálním kontextu; Pokud žádný není, navrátí `None`."""
+    return _current.get()
+
+
+def check():
+    """Pokud je token aktuálního kontextu zrušen, vyhodí výjimku (viz `CancellationToken.check()`)."""
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+def limit_timeout(timeout: Timeout) -> Timeout:
+    """Omezí daný timeout tokenem aktuálního kontextu (viz `CancellationToken.limit_timeout()`)."""
+    token = _current.get()
+    if token is None:
+        return timeout
+    return token.limit_timeout(timeout)
+
+
+def _call_with(token: CancellationToken, func: Callable[..., T], args, kwargs) -> T:
+    _current.set(token)
+    return func(*args, **kwargs)
+
+
+def run_with(
+    token: CancellationToken | None, func: Callable[..., T], /, *args, **kwargs
+) -> T:
+    """Zavolá danou funkci (v kopii aktuálního kontextu) s daným tokenem jako tokenem kontextu.
+
+    Určeno především pro spouštění funkcí v jiných threadech (např. přes `Executor.submit()`),
+    do kterých se kontext (a tedy ani token) sám nepropaguje. Pokud je `token` `None`, funkce se pouze zavolá.
+    """
+    if token is None:
+        return func(*args, **kwargs)
+    return copy_context().run(_call_with, token, func, args, kwargs)
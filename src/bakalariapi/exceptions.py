@@ -50,6 +50,25 @@ class MissingSerializer(BakalariAPIError):
     """
 
 
+class SessionPoolTimeoutError(BakalariAPIError):
+    """Výjimka, která nastane, když se do vypršení timeoutu neuvolní (ani nelze vytvořit) žádná session z poolu `SessionManager`u."""
+
+
+class CircuitOpenError(BakalariAPIError):
+    """Výjimka, která nastane při pokusu o request, když je (po opakovaných chybách serveru) rozpojený `resilience.CircuitBreaker`."""
+
+
+class OperationCancelledError(BakalariAPIError):
+    """Výjimka, která nastane, když byla operace zrušena přes `cancellation.CancellationToken`.
+
+    Data, která se do zrušení podařilo získat, jsou (stejně jako bez zrušení) uložena v `Looting` instanci.
+    """
+
+
+class DeadlineExceededError(OperationCancelledError):
+    """Výjimka, která nastane, když vypršel deadline operace (viz `cancellation.CancellationToken`)."""
+
+
 class MissingDeserializer(BakalariAPIWarning):
     """Výjimka, která nastane při pokusu o deserilializaci dat, které vypadají, že by se dali deserializovat, ale není pro ně registrovaný deserializer."""
 
@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import json
 import logging
+from datetime import datetime
 from threading import Lock
-from typing import Generic, TypeVar, cast
+from typing import Any, Callable, Generic, Iterator, TypeVar, cast
 
 from bs4 import BeautifulSoup
 
@@ -34,16 +35,185 @@ __all__ = [
 
 LOGGER = logging.getLogger("bakalariapi.looting")
 
-GetterOutputTypeVar = TypeVar("GetterOutputTypeVar", BeautifulSoup, dict)
+GetterOutputTypeVar = TypeVar("GetterOutputTypeVar", BeautifulSoup, dict, bytes)
 
 
 class GetterOutput(Generic[GetterOutputTypeVar]):
-    """Třída používaná jako spojka mezi gettery a parsery."""
+    """Třída používaná jako spojka mezi gettery a parsery.
 
-    def __init__(self, endpoint: str, data: GetterOutputTypeVar):
+    Atributy:
+        endpoint:
+            Endpoint, ze kterého data pochází.
+        data:
+            Data pro parsery.
+        type:
+            Typ dat.
+        raw:
+            Surová data (odpověď serveru), ze kterých `data` vznikla; Pokud `None`, surová data nejsou k dispozici.
+            Slouží pro archivaci (viz `archive.RawArchive`) a pro parsování v jiném procesu (viz `BakalariAPI.parse_executor`).
+        query:
+            Parametry requestu (query string, tělo POST requestu, ...), kterým se data získala; Spolu s `endpoint`
+            identifikuje stránku (viz `BakalariAPI.skip_unchanged`). Pokud `None`, request žádné parametry neměl.
+
+    GetterOutput vytvořený přes `from_raw()` data ze surových dat vytvoří (naparsuje) až při prvním přístupu k `data`
+    a po doběhnutí všech parserů je zase uvolní (viz `release()`), takže strom stránky nedrží paměť, i když někdo
+    drží GetterOutput.
+    GetterOutput vytvořený přes `from_stream()` navíc surová data přečte (stáhne) až při prvním přístupu k `raw`
+    (resp. k `data`), nebo je lze číst po částech přes `stream()` (viz `BakalariAPI.stream_parsing`).
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        data: GetterOutputTypeVar,
+        raw: bytes | None = None,
+        query: str | None = None,
+    ):
         self.endpoint: str = endpoint
-        self.data: GetterOutputTypeVar = data
+        self.query: str | None = query
+        self._data: GetterOutputTypeVar | None = data
+        self._loader: Callable[[bytes], GetterOutputTypeVar] | None = None
+        self._stream: Iterator[bytes] | None = None
         self.type: type[GetterOutputTypeVar] = type(data)
+        self._raw: bytes | None = raw
+
+    @classmethod
+    def from_raw(
+        cls,
+        endpoint: str,
+        type_: type[GetterOutputTypeVar],
+        raw: bytes,
+        loader: Callable[[bytes], GetterOutputTypeVar],
+        query: str | None = None,
+    ) -> GetterOutput[GetterOutputTypeVar]:
+        """Vytvoří GetterOutput, jehož data se ze surových dat vytvoří až při prvním přístupu k `data`.
+
+        Args:
+            endpoint:
+                Endpoint, ze kterého data pochází.
+            type_:
+                Typ dat, který vrací `loader`.
+            raw:
+                Surová data (odpověď serveru).
+            loader:
+                Funkce, která ze surových dat vytvoří data pro parsery.
+            query:
+                Parametry requestu, kterým se data získala.
+        """
+        output = cls.__new__(cls)
+        output.endpoint = endpoint
+        output.query = query
+        output._data = None
+        output._loader = loader
+        output._stream = None
+        output.type = type_
+        output._raw = raw
+        return output
+
+    @classmethod
+    def from_stream(
+        cls,
+        endpoint: str,
+        type_: type[GetterOutputTypeVar],
+        stream: Iterator[bytes],
+        loader: Callable[[bytes], GetterOutputTypeVar],
+        query: str | None = None,
+    ) -> GetterOutput[GetterOutputTypeVar]:
+        """Vytvoří GetterOutput, jehož surová data se přečtou až při potřebě (viz `raw` a `stream()`).
+
+        Args:
+            endpoint:
+                Endpoint, ze kterého data pochází.
+            type_:
+                Typ dat, který vrací `loader`.
+            stream:
+                Iterátor surových dat po částech (např. `requests.Response.iter_content()`).
+            loader:
+                Funkce, která ze surových dat vytvoří data pro parsery.
+            query:
+                Parametry requestu, kterým se data získala.
+        """
+        output = cls.from_raw(endpoint, type_, b"", loader, query)
+        output._raw = None
+        output._stream = stream
+        return output
+
+    @property
+    def raw(self) -> bytes | None:
+        """Surová data (odpověď serveru); Pokud se ještě nepřečetla, přečtou se celá."""
+        if self._stream is not None:
+            self._raw = b"".join(self.stream())
+        return self._raw
+
+    @raw.setter
+    def raw(self, value: bytes | None):
+        self._raw = value
+
+    @property
+    def is_streamed(self) -> bool:
+        """Jsou surová data ještě nepřečtená (tzn. lze je číst po částech přes `stream()`)?"""
+        return self._stream is not None
+
+    def stream(self, keep_raw: bool = True) -> Iterator[bytes]:
+        """Iteruje surová data po částech tak, jak se čtou (resp. přichází ze serveru).
+
+        Surová data lze takto přečíst pouze jednou. Pokud už byla přečtena, vrátí se celá jako jedna část.
+
+        Args:
+            keep_raw:
+                Pokud `True`, přečtená data se uloží do `raw`. Pokud `False`, `raw` (a tedy i `data`)
+                po přečtení nebude k dispozici, ale data se nemusí držet v paměti celá najednou.
+        """
+        if self._stream is None:
+            if self._raw is not None:
+                yield self._raw
+            return
+        stream, self._stream = self._stream, None
+        chunks: list[bytes] = []
+        for chunk in stream:
+            if keep_raw:
+                chunks.append(chunk)
+            yield chunk
+        if keep_raw:
+            self._raw = b"".join(chunks)
+
+    @property
+    def data(self) -> GetterOutputTypeVar:
+        """Data pro parsery."""
+        if self._data is None:
+            raw = self.raw
+            if raw is None:
+                raise ValueError("Surová data nejsou k dispozici")
+            self._data = cast(Callable[[bytes], GetterOutputTypeVar], self._loader)(
+                raw
+            )
+        return self._data
+
+    @data.setter
+    def data(self, value: GetterOutputTypeVar):
+        self._data = value
+
+    @property
+    def is_loaded(self) -> bool:
+        """Jsou data již vytvořena (naparsována)?"""
+        return self._data is not None
+
+    def release(self) -> bool:
+        """Uvolní vytvořená data, pokud je lze znovu vytvořit ze surových dat (tzn. GetterOutput vznikl přes `from_raw()`).
+
+        Strom stránky (`BeautifulSoup`) se rozebere (`decompose()`), takže se jeho paměť uvolní hned a ne až
+        při (cyklickém) garbage collectingu. Při dalším přístupu k `data` se data vytvoří znovu.
+        Pozn.: Části uvolněného stromu (`Tag`y z `data`) již nelze používat.
+
+        Returns:
+            `True`, pokud byla data uvolněna, jinak `False`.
+        """
+        if self._data is None or self._loader is None or self._raw is None:
+            return False
+        data, self._data = self._data, None
+        if isinstance(data, BeautifulSoup):
+            data.decompose()
+        return True
 
 
 class ResultSet:
@@ -123,7 +293,7 @@ class ResultSet:
 class Looting:
     """Třída obsatarávající sesbírané objekty pro pozdější použití.
 
-    Pro získání dat z Looting instance je zde metoda `.get()`.
+    Pro získání dat z Looting instance jsou zde metody `.get()` a `.query()`.
 
     Atributy:
         data:
@@ -132,12 +302,22 @@ class Looting:
         unresolved:
             Slovník mají jako klíč název typu (string) a jako hodnotu slovík ID-UnresolvedID.
             Klíče ve "vnořených" slovnících jsou také (vždy) string.
+        cursors:
+            Slovník, kde klíč je endpoint (viz `Endpoint`) a hodnota čas začátku poslední úspěšné synchronizace
+            daného endpointu (viz `BakalariAPI.sync_grades()`, `BakalariAPI.sync_komens()` a `BakalariAPI.sync_meetings()`).
     """
 
     def __init__(self):
         self.__lock = Lock()
         self.data: dict[str, dict[str, objects.BakalariObject]] = {}
         self.unresolved: dict[str, dict[str, objects.UnresolvedID]] = {}
+        self.cursors: dict[str, datetime] = {}
+        # Název typu => atribut => hodnota => ID => objekt (viz `BakalariObject.index_keys`)
+        self.__indexes: dict[
+            str, dict[str, dict[Any, dict[str, objects.BakalariObject]]]
+        ] = {}
+        # Název typu => ID => hodnoty atributů, pod kterými je objekt zaindexován
+        self.__indexed: dict[str, dict[str, dict[str, Any]]] = {}
         # Proč máme "root" key jako 'str' a ne jako 'type'? V runtimu asi lepší to mít jako 'type', ale při serializaci
         # nechci řešit nemožnost serializovat typ 'type' a při deserializaci nechci konvertovat něco (= typ, jako který
         # se to serializuje) zpátky na 'type'. Navíc I guess, že když __name__ je atribut, tak to prakticky nezabere nic.
@@ -163,6 +343,30 @@ class Looting:
                     self.data[type(o).__name__][o.ID] = o
             else:
                 self.data[type(o).__name__] = {o.ID: o}
+            self.__unindex(type(o).__name__, o.ID)
+            self.__index(self.data[type(o).__name__][o.ID])
+
+    def __index(self, o: objects.BakalariObject):
+        """Zaindexuje daný objekt podle `index_keys` jeho typu."""
+        if len(o.index_keys) == 0:
+            return
+        values = {key: getattr(o, key) for key in o.index_keys}
+        indexes = self.__indexes.setdefault(type(o).__name__, {})
+        for key, value in values.items():
+            indexes.setdefault(key, {}).setdefault(value, {})[o.ID] = o
+        self.__indexed.setdefault(type(o).__name__, {})[o.ID] = values
+
+    def __unindex(self, type_name: str, ID: str):
+        """Odstraní objekt daného typu a ID z indexů."""
+        values = self.__indexed.get(type_name, {}).pop(ID, None)
+        if values is None:
+            return
+        indexes = self.__indexes[type_name]
+        for key, value in values.items():
+            bucket = indexes[key][value]
+            del bucket[ID]
+            if len(bucket) == 0:
+                del indexes[key][value]
 
     def add_loot(self, loot: objects.BakalariObject | list[objects.BakalariObject]):
         """Přidá loot.
@@ -197,6 +401,56 @@ class Looting:
         finally:
             self.__lock.release()
 
+    def touch(
+        self, refs: list[tuple[type[objects.BakalariObject], str, bool]], date: datetime
+    ) -> ResultSet | None:
+        """Označí loot jako získaný v daný čas, aniž by se znovu slučoval (viz `BakalariObject.merge()`).
+
+        Args:
+            refs:
+                Odkazy na loot jako trojice (typ, ID, nevyřešené), kde "nevyřešené" značí `UnresolvedID`
+                (typ je pak odhadovaný typ objektu). Viz `ref_result_set()`.
+            date:
+                Čas, kdy byl loot (znovu) získán.
+
+        Returns:
+            `ResultSet` s označeným lootem (`UnresolvedID` jsou nové instance); Pokud některý odkazovaný objekt
+            v lootu není, nic se neoznačí a navrátí se `None`.
+        """
+        output = ResultSet()
+        self.__lock.acquire()
+        try:
+            loot: list[objects.BakalariObject] = []
+            for type_, ID, unresolved in refs:
+                if unresolved:
+                    loot.append(objects.UnresolvedID(ID, type_))
+                    continue
+                o = self.data.get(type_.__name__, {}).get(ID)
+                if o is None:
+                    return None
+                loot.append(o)
+            for o in loot:
+                o._date = date
+                if isinstance(o, objects.UnresolvedID):
+                    self.__add_one(o)
+            output.add_loot(loot)
+        finally:
+            self.__lock.release()
+        return output
+
+    @staticmethod
+    def ref_result_set(
+        result_set: ResultSet,
+    ) -> list[tuple[type[objects.BakalariObject], str, bool]]:
+        """Navrátí odkazy na loot z daného ResultSetu pro `touch()`."""
+        return [
+            (o.type, o.ID, True)
+            if isinstance(o, objects.UnresolvedID)
+            else (type(o), o.ID, False)
+            for lst in result_set.data.values()
+            for o in lst
+        ]
+
     def get(self, type_: type[BakalariObj]) -> list[BakalariObj]:
         """Vrátí list objektů daného typu.
 
@@ -221,6 +475,79 @@ class Looting:
         except KeyError:
             return []
 
+    def query(
+        self,
+        type_: type[BakalariObj],
+        where: Callable[[BakalariObj], bool] | None = None,
+        **equals: Any,
+    ) -> list[BakalariObj]:
+        """Vrátí objekty daného typu, které mají dané hodnoty atributů a splňují danou podmínku.
+
+        Podmínky na indexované atributy (viz `BakalariObject.index_keys`) se vyhodnotí přes index, takže dotaz
+        neprochází všechny objekty daného typu, ale pouze ty s danou hodnotou (z nejmenšího z indexů).
+        Ostatní podmínky se kontrolují u každého takto vybraného objektu.
+
+        Args:
+            type_:
+                Typ objektů, který se má vrátit.
+            where:
+                Funkce, která pro daný objekt vrátí, zda se má vrátit; Pokud `None`, vrátí se všechny objekty,
+                které odpovídají `equals`.
+            **equals:
+                Atributy a hodnoty, které musí objekty mít (porovnává se přes `==`).
+
+        Returns:
+            List objektů.
+        """
+        self.__lock.acquire()
+        try:
+            indexes = self.__indexes.get(type_.__name__, {})
+            buckets = [
+                indexes.get(key, {}).get(value, {})
+                for key, value in equals.items()
+                if key in type_.index_keys
+            ]
+            if len(buckets) != 0:
+                candidates = list(min(buckets, key=len).values())
+            else:
+                store = self.unresolved if type_ == objects.UnresolvedID else self.data
+                candidates = list(store.get(type_.__name__, {}).values())
+        finally:
+            self.__lock.release()
+        # viz poznámka o `cast()` v "sessions.py"
+        return cast(
+            list[BakalariObj],
+            [
+                o
+                for o in candidates
+                if all(getattr(o, key) == value for key, value in equals.items())
+                and (where is None or where(cast(BakalariObj, o)))
+            ],
+        )
+
+    def reindex(self, o: objects.BakalariObject | None = None):
+        """Aktualizuje indexy (viz `query()`) po změně indexovaného atributu objektu mimo `Looting`.
+
+        Args:
+            o:
+                Objekt, jehož atributy se změnily; Pokud `None`, přestaví se indexy všech objektů.
+        """
+        self.__lock.acquire()
+        try:
+            if o is None:
+                self.__indexes.clear()
+                self.__indexed.clear()
+                for objs in self.data.values():
+                    for obj in objs.values():
+                        self.__index(obj)
+                return
+            stored = self.data.get(type(o).__name__, {}).get(o.ID)
+            if stored is not None:
+                self.__unindex(type(o).__name__, o.ID)
+                self.__index(stored)
+        finally:
+            self.__lock.release()
+
     def have_id(self, type_: type[BakalariObj], ID: str):
         if type_ == objects.UnresolvedID:
             raise ValueError("Nelze zkontrolovat přítomnost ID pro UnresolvedID")
@@ -229,6 +556,36 @@ class Looting:
         else:
             return False
 
+    def get_cursor(self, endpoint: str) -> datetime | None:
+        """Vrátí čas začátku poslední úspěšné synchronizace daného endpointu.
+
+        Args:
+            endpoint:
+                Endpoint, pro který se má čas vrátit.
+
+        Returns:
+            Čas začátku poslední úspěšné synchronizace nebo `None`, pokud endpoint ještě synchronizován nebyl.
+        """
+        return self.cursors.get(endpoint)
+
+    def set_cursor(self, endpoint: str, value: datetime | None):
+        """Nastaví čas začátku poslední úspěšné synchronizace daného endpointu.
+
+        Args:
+            endpoint:
+                Endpoint, pro který se má čas nastavit.
+            value:
+                Čas začátku synchronizace. Pokud je `None`, čas se odstraní (a další synchronizace bude úplná).
+        """
+        self.__lock.acquire()
+        try:
+            if value is None:
+                self.cursors.pop(endpoint, None)
+            else:
+                self.cursors[endpoint] = value
+        finally:
+            self.__lock.release()
+
     def resolve_unresolved(self, bakalariAPI: BakalariAPI):
         """Pokusí "vyřešit" všechny `UnresolvedID`.
 
@@ -247,6 +604,7 @@ class Looting:
             {
                 "data": self.data,
                 "unresolved": self.unresolved,
+                "cursors": self.cursors,
             }
         )
 
@@ -260,5 +618,9 @@ class Looting:
             for type_ in parsed["unresolved"]:
                 for obj in parsed["unresolved"][type_].values():
                     self.__add_one(obj)
+            # Data z verze před 4.1 kurzory nemají
+            for endpoint, cursor in parsed.get("cursors", {}).items():
+                if endpoint not in self.cursors or self.cursors[endpoint] < cursor:
+                    self.cursors[endpoint] = cursor
         finally:
             self.__lock.release()
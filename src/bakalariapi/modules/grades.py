@@ -5,33 +5,67 @@ import json
 from datetime import datetime
 from typing import cast
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag  # Kvůli mypy - https://github.com/python/mypy/issues/10826
 
-from ..bakalari import BakalariAPI, Endpoint, _register_parser
+from ..bakalari import (
+    BakalariAPI,
+    Endpoint,
+    _html_output,
+    _html_stream_output,
+    _register_parser,
+    _register_stream_parser,
+    _StreamParser,
+)
 from ..looting import GetterOutput, ResultSet
 from ..objects import Grade
 from ..sessions import RequestsSession
-from ..utils import parseHTML
 
 
 def getter(
     bakalariAPI: BakalariAPI, from_date: datetime | None = None
 ) -> GetterOutput[BeautifulSoup]:
     """Získá dané známky."""
+    query = (
+        None
+        if from_date is None
+        else f"dfrom={from_date.strftime('%Y%m%d')}0000&subt=obdobi"
+    )
+    stream = bakalariAPI._is_streamed(Endpoint.GRADES)
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
         response = session.get(
             bakalariAPI.get_endpoint(Endpoint.GRADES)
-            + (
-                ""
-                if from_date is None
-                else f"?dfrom={from_date.strftime('%Y%m%d')}0000&subt=obdobi"
-            )
+            + ("" if query is None else "?" + query),
+            stream=stream,
         )
-    return GetterOutput(Endpoint.GRADES, parseHTML(response.content))
+    if stream:
+        return _html_stream_output(Endpoint.GRADES, response, query)
+    return _html_output(Endpoint.GRADES, response.content, query)
+
+
+def _grade(data: dict) -> Grade:
+    """Vytvoří známku z dat (JSONu) v atributu "data-clasif"."""
+    return Grade(
+        data["id"],
+        data["nazev"],
+        data["MarkText"],
+        data["vaha"],
+        data["caption"],
+        data["poznamkakzobrazeni"],
+        data["MarkTooltip"] if data["MarkTooltip"] is not None else "",
+        datetime.strptime(data["strdatum"], "%d.%m.%Y"),
+        datetime.strptime(data["udel_datum"], "%d.%m.%Y"),
+        data["strporadivetrideuplne"],
+        data["typ"],
+    )
 
 
-@_register_parser(Endpoint.GRADES, BeautifulSoup)
+# Parser potřebuje pouze elementy s daty známek, ne celou (velkou) stránku
+@_register_parser(
+    Endpoint.GRADES,
+    BeautifulSoup,
+    parse_only=SoupStrainer("div", attrs={"data-clasif": True}),
+)
 def parser(getter_output: GetterOutput[BeautifulSoup]) -> ResultSet:
     """Parsuje stránku se známkami."""
     output = ResultSet()
@@ -41,20 +75,14 @@ def parser(getter_output: GetterOutput[BeautifulSoup]) -> ResultSet:
     for znamka in znamky_list:
         # `cast()` jelikož některé atributy mohou být multi-valued, tak zde je možný typ __getitem__ i `list`.
         # Ale tyto atributy jsou natrvdo předdefinované a "data-clasif" mezi nimi není.
-        data = json.loads(cast(str, znamka["data-clasif"]))
-        output.add_loot(
-            Grade(
-                data["id"],
-                data["nazev"],
-                data["MarkText"],
-                data["vaha"],
-                data["caption"],
-                data["poznamkakzobrazeni"],
-                data["MarkTooltip"] if data["MarkTooltip"] is not None else "",
-                datetime.strptime(data["strdatum"], "%d.%m.%Y"),
-                datetime.strptime(data["udel_datum"], "%d.%m.%Y"),
-                data["strporadivetrideuplne"],
-                data["typ"],
-            )
-        )
+        output.add_loot(_grade(json.loads(cast(str, znamka["data-clasif"]))))
     return output
+
+
+@_register_stream_parser(Endpoint.GRADES)
+class StreamParser(_StreamParser):
+    """Streamově parsuje stránku se známkami (data známky jsou celá v atributu, takže stačí začátky elementů)."""
+
+    def start(self, tag: str, attrs: dict[str, str]):
+        if tag == "div" and "data-clasif" in attrs:
+            self.output.add_loot(_grade(json.loads(attrs["data-clasif"])))
@@ -1,21 +1,27 @@
 """Modul obsahující funkce týkající se úkolů."""
 import logging
 from datetime import datetime
+from time import monotonic
 from typing import cast
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag  # Kvůli mypy - https://github.com/python/mypy/issues/10826
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as SeleniumConditions
 from selenium.webdriver.support.wait import WebDriverWait
 
-from ..bakalari import BakalariAPI, Endpoint, _register_parser
+from .. import cancellation
+from ..bakalari import (
+    BakalariAPI,
+    Endpoint,
+    _html_output,
+    _register_parser,
+)
 from ..exceptions import MissingElementError
 from ..looting import GetterOutput, ResultSet
 from ..objects import Homework, HomeworkFile
 from ..sessions import RequestsSession, SeleniumSession
-from ..utils import parseHTML
 
 LOGGER = logging.getLogger("bakalariapi.modules.homeworks")
 
@@ -24,7 +30,7 @@ def getter_fast(bakalariAPI: BakalariAPI) -> GetterOutput[BeautifulSoup]:
     """Získá pouze prvních 20 nehotových aktivních úkolů, ale je mnohem rychlejší než ostatní metody na získání úkolů."""
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
         response = session.get(bakalariAPI.get_endpoint(Endpoint.HOMEWORKS))
-    return GetterOutput(Endpoint.HOMEWORKS, parseHTML(response.content))
+    return _html_output(Endpoint.HOMEWORKS, response.content)
 
 
 def get_slow(
@@ -39,7 +45,8 @@ def get_slow(
     # TODO: Page size param
 
     with bakalariAPI.session_manager.get_session_or_create(SeleniumSession) as session:
-        session.session.get(bakalariAPI.get_endpoint(Endpoint.HOMEWORKS))
+        session.sync_cookies()
+        session.navigate(bakalariAPI.get_endpoint(Endpoint.HOMEWORKS))
         output = ResultSet()
 
         if not unfinished_only:
@@ -53,9 +60,11 @@ def get_slow(
         checkID = ""
 
         while True:
+            # Stránky, které už jsme naparsovali, jsou uložené v looting instanci, takže při zrušení se nic neztratí
+            cancellation.check()
             source = session.session.page_source
             temp_result = bakalariAPI._parse(
-                GetterOutput(Endpoint.HOMEWORKS, parseHTML(source))
+                _html_output(Endpoint.HOMEWORKS, source.encode())
             )
 
             if temp_result.get(Homework)[0].ID == checkID:  # Náš "fail check"
@@ -74,8 +83,14 @@ def get_slow(
                 except NoSuchElementException:
                     break  # Jsme na poslední stránce
                 el.click()
+                # Načtení další stránky je request na server, takže prodlužuje životnost sessionu
+                session.last_activity = monotonic()
                 try:
-                    WebDriverWait(session.session, first_loading_timeout, 0.1).until(
+                    WebDriverWait(
+                        session.session,
+                        cancellation.limit_timeout(first_loading_timeout),
+                        0.1,
+                    ).until(
                         SeleniumConditions.visibility_of_element_located(
                             (By.ID, "grdukoly_LPV")
                         )
@@ -85,12 +100,17 @@ def get_slow(
                     # Tuto "chybu" kdyžtak zachytíme naším "fail checkem", který případně cyklus ukončí
                     continue
                 try:
-                    WebDriverWait(session.session, second_loading_timeout).until_not(
+                    WebDriverWait(
+                        session.session,
+                        cancellation.limit_timeout(second_loading_timeout),
+                    ).until_not(
                         SeleniumConditions.visibility_of_element_located(
                             (By.ID, "grdukoly_LPV")
                         )
                     )
                 except TimeoutException:
+                    # Čekání mohlo být zkráceno deadlinem, což není "zaseknutí" Bakalářů
+                    cancellation.check()
                     LOGGER.info(
                         "Probrally stuck in infinity loop while loading homeworks, ending homework getter"
                     )
@@ -100,7 +120,11 @@ def get_slow(
     return output
 
 
-@_register_parser(Endpoint.HOMEWORKS, BeautifulSoup)
+@_register_parser(
+    Endpoint.HOMEWORKS,
+    BeautifulSoup,
+    parse_only=SoupStrainer(id="grdukoly_DXMainTable"),
+)
 def parser(getter_output: GetterOutput[BeautifulSoup]) -> ResultSet:
     """Parsuje získanou stránku s domácími úkoly a vrací parsované úkoly."""
     output = ResultSet()
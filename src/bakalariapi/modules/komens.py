@@ -4,15 +4,24 @@ from __future__ import annotations
 from datetime import datetime
 from typing import cast
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag  # Kvůli mypy - https://github.com/python/mypy/issues/10826
 
-from ..bakalari import BakalariAPI, Endpoint, _register_parser, _register_resolver
+from ..bakalari import (
+    BakalariAPI,
+    Endpoint,
+    _html_output,
+    _html_stream_output,
+    _json_output,
+    _register_parser,
+    _register_resolver,
+    _register_stream_parser,
+    _StreamParser,
+)
 from ..exceptions import MissingElementError
 from ..looting import GetterOutput, ResultSet
 from ..objects import Komens, KomensFile, UnresolvedID
 from ..sessions import RequestsSession
-from ..utils import parseHTML
 
 
 def getter_komens_ids(
@@ -25,17 +34,22 @@ def getter_komens_ids(
     Kvůli limitaci Bakalářů je možné načíst pouze 300 zpráv na jednou.
     """
     target = bakalariAPI.get_endpoint(Endpoint.KOMENS)
+    query = None
 
     if from_date is not None or to_date is not None:
-        target += "?s=custom"
+        query = "s=custom"
         if from_date is not None:
-            target += "&from=" + from_date.strftime("%d%m%Y")
+            query += "&from=" + from_date.strftime("%d%m%Y")
         if to_date is not None:
-            target += "&to=" + to_date.strftime("%d%m%Y")
+            query += "&to=" + to_date.strftime("%d%m%Y")
+        target += "?" + query
 
+    stream = bakalariAPI._is_streamed(Endpoint.KOMENS)
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
-        response = session.get(target)
-    return GetterOutput(Endpoint.KOMENS, parseHTML(response.content))
+        response = session.get(target, stream=stream)
+    if stream:
+        return _html_stream_output(Endpoint.KOMENS, response, query)
+    return _html_output(Endpoint.KOMENS, response.content, query)
 
 
 def getter_info(
@@ -45,11 +59,13 @@ def getter_info(
         response = session.post(
             bakalariAPI.get_endpoint(Endpoint.KOMENS_GET),
             json={"idmsg": ID, "context": context},
-        ).json()
-    return GetterOutput(Endpoint.KOMENS_GET, response)
+        )
+    return _json_output(Endpoint.KOMENS_GET, response.content)
 
 
-@_register_parser(Endpoint.KOMENS, BeautifulSoup)
+@_register_parser(
+    Endpoint.KOMENS, BeautifulSoup, parse_only=SoupStrainer(id="message_list_content")
+)
 def parser_main(getter_output: GetterOutput[BeautifulSoup]) -> ResultSet:
     output = ResultSet()
 
@@ -74,6 +90,74 @@ def parser_main(getter_output: GetterOutput[BeautifulSoup]) -> ResultSet:
     return output
 
 
+@_register_stream_parser(Endpoint.KOMENS)
+class StreamParser(_StreamParser):
+    """Streamově parsuje seznam Komens zpráv (IDčka zpráv jsou v tabulkách uvnitř `#message_list_content`).
+
+    Kontroluje stejnou strukturu jako `parser_main()` (a při jejím porušení vyhodí stejné výjimky), tzn. bere
+    první tabulku z každého přímého `li` prvního `ul` v `#message_list_content`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Otevřené elementy; Nezavřené elementy se (stejně jako v HTML) zavřou s jejich rodičem
+        self.stack: list[str] = []
+        # Úrovně (indexy do `stack`) `#message_list_content`, jeho prvního `ul` a aktuálního přímého `li` v něm
+        self.content_level: int | None = None
+        self.ul_level: int | None = None
+        self.li_level: int | None = None
+        self.found_content: bool = False
+        self.found_ul: bool = False
+        self.li_has_table: bool = False
+
+    def start(self, tag: str, attrs: dict[str, str]):
+        level = len(self.stack)
+        self.stack.append(tag)
+        if not self.found_content:
+            if attrs.get("id") == "message_list_content":
+                self.content_level = level
+                self.found_content = True
+        elif self.content_level is not None and not self.found_ul:
+            if tag == "ul":
+                self.ul_level = level
+                self.found_ul = True
+        elif self.ul_level is not None and self.li_level is None:
+            if tag == "li" and level == self.ul_level + 1:
+                self.li_level = level
+                self.li_has_table = False
+        elif self.li_level is not None and not self.li_has_table and tag == "table":
+            self.li_has_table = True
+            if "data-idmsg" not in attrs:
+                raise KeyError("data-idmsg")
+            self.output.add_loot(UnresolvedID(attrs["data-idmsg"], Komens))
+
+    def end(self, tag: str):
+        if tag not in self.stack:
+            return
+        while self.stack.pop() != tag:
+            pass
+        self.__closed()
+
+    def __closed(self):
+        level = len(self.stack)
+        if self.li_level is not None and level <= self.li_level:
+            self.li_level = None
+            if not self.li_has_table:
+                raise MissingElementError('komens.find("table")')
+        if self.ul_level is not None and level <= self.ul_level:
+            self.ul_level = None
+        if self.content_level is not None and level <= self.content_level:
+            self.content_level = None
+
+    def close(self):
+        self.stack.clear()
+        self.__closed()
+        if not self.found_content:
+            raise MissingElementError('find(id="message_list_content")')
+        if not self.found_ul:
+            raise MissingElementError('find(id="message_list_content").find("ul")')
+
+
 @_register_parser(Endpoint.KOMENS_GET, dict)
 def parser_info(getter_output: GetterOutput[dict]) -> ResultSet:
     jsn = getter_output.data
@@ -105,4 +189,6 @@ def parser_info(getter_output: GetterOutput[dict]) -> ResultSet:
 
 @_register_resolver(Komens)
 def resolver(bakalariAPI: BakalariAPI, unresolved: UnresolvedID) -> Komens:
-    return parser_info(getter_info(bakalariAPI, unresolved.ID)).get(Komens)[0]
+    getter_output = getter_info(bakalariAPI, unresolved.ID)
+    bakalariAPI._archive(getter_output)
+    return parser_info(getter_output).get(Komens)[0]
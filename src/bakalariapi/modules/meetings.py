@@ -1,12 +1,19 @@
 """Modul obsahující funkce týkající se online schůzek."""
-import json
 from datetime import datetime
 from typing import cast
+from urllib.parse import urlencode
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag  # Kvůli mypy - https://github.com/python/mypy/issues/10826
 
-from ..bakalari import BakalariAPI, Endpoint, _register_parser, _register_resolver
+from ..bakalari import (
+    BakalariAPI,
+    Endpoint,
+    _html_output,
+    _json_output,
+    _register_parser,
+    _register_resolver,
+)
 from ..exceptions import BakalariQuerrySuccessError, MissingElementError
 from ..looting import GetterOutput, ResultSet
 from ..objects import (
@@ -17,43 +24,48 @@ from ..objects import (
     UnresolvedID,
 )
 from ..sessions import RequestsSession
-from ..utils import line_iterator, parseHTML
+from ..utils import extract_js_json
 
 
 def getter_meeting(bakalariAPI: BakalariAPI, ID: str) -> GetterOutput[dict]:
     """Získá schůzku s daným ID."""
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
-        response = session.get(
-            bakalariAPI.get_endpoint(Endpoint.MEETINGS_INFO) + ID
-        ).json()
-    return GetterOutput(Endpoint.MEETINGS_INFO, response)
+        response = session.get(bakalariAPI.get_endpoint(Endpoint.MEETINGS_INFO) + ID)
+    return _json_output(Endpoint.MEETINGS_INFO, response.content)
 
 
 def getter_future_meetings_ids(bakalariAPI: BakalariAPI) -> GetterOutput[BeautifulSoup]:
     """Získá IDčka budoucích schůzek."""
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
         response = session.get(bakalariAPI.get_endpoint(Endpoint.MEETINGS_OVERVIEW))
-    return GetterOutput(Endpoint.MEETINGS_OVERVIEW, parseHTML(response.content))
+    return _html_output(Endpoint.MEETINGS_OVERVIEW, response.content)
 
 
 def getter_meetings_ids(
     bakalariAPI: BakalariAPI, from_date: datetime, to_date: datetime
 ) -> GetterOutput[dict]:
     """Získá IDčka daných schůzek."""
+    data = {
+        "TimeWindow": "FromTo",
+        "FilterByAuthor": "AllInvitations",
+        "MeetingFrom": from_date.strftime("%Y-%m-%dT%H:%M:%S") + "+00:00",
+        "MeetingTo": to_date.strftime("%Y-%m-%dT%H:%M:%S") + "+00:00",
+    }
     with bakalariAPI.session_manager.get_session_or_create(RequestsSession) as session:
         response = session.post(
-            bakalariAPI.get_endpoint(Endpoint.MEETINGS_OVERVIEW),
-            {
-                "TimeWindow": "FromTo",
-                "FilterByAuthor": "AllInvitations",
-                "MeetingFrom": from_date.strftime("%Y-%m-%dT%H:%M:%S") + "+00:00",
-                "MeetingTo": to_date.strftime("%Y-%m-%dT%H:%M:%S") + "+00:00",
-            },
-        ).json()
-    return GetterOutput(Endpoint.MEETINGS_OVERVIEW, response)
-
-
-@_register_parser(Endpoint.MEETINGS_OVERVIEW, BeautifulSoup)
+            bakalariAPI.get_endpoint(Endpoint.MEETINGS_OVERVIEW), data
+        )
+    return _json_output(Endpoint.MEETINGS_OVERVIEW, response.content, urlencode(data))
+
+
+_MEETINGS_DATA_PREFIX = "var meetingsData = "
+_STUDENTS_DATA_PREFIX = "model.Students = ko.mapping.fromJS("
+
+
+# Data jsou ve skriptech v hlavičce stránky
+@_register_parser(
+    Endpoint.MEETINGS_OVERVIEW, BeautifulSoup, parse_only=SoupStrainer("head")
+)
 def parser_meetings_overview_html(
     getter_output: GetterOutput[BeautifulSoup],
 ) -> ResultSet:
@@ -61,35 +73,26 @@ def parser_meetings_overview_html(
     if getter_output.data.head is None:
         raise MissingElementError("head")
     scripts = cast(list[Tag], getter_output.data.head("script"))
-    formatted = ""
+    text = None
     for script in scripts:
-        formatted = script.prettify()
-        if "var model = " in formatted:
+        # Obsah <script> elementu je jeden string, takže ho nemusíme nijak skládat (ani formátovat)
+        if script.string is not None and "var model = " in script.string:
+            text = str(script.string)
             break
-    loot = {"Meetings": False, "Students": False}
-    for line in line_iterator(formatted):
-        line = line.strip()
-        if line.startswith("var meetingsData = "):
-            loot["Meetings"] = True
-            meetings_json = json.loads(line.strip()[len("var meetingsData = ") : -1])
-            for meeting in meetings_json:
-                output.add_loot(UnresolvedID(str(meeting["Id"]), Meeting))
-        elif line.startswith("model.Students = ko.mapping.fromJS("):
-            loot["Students"] = True
-            students_json = json.loads(
-                line.strip()[len("model.Students = ko.mapping.fromJS(") : -2]
+    if text is None:
+        return output
+    data = extract_js_json(text, (_MEETINGS_DATA_PREFIX, _STUDENTS_DATA_PREFIX))
+    for meeting in data.get(_MEETINGS_DATA_PREFIX, []):
+        output.add_loot(UnresolvedID(str(meeting["Id"]), Meeting))
+    for student in data.get(_STUDENTS_DATA_PREFIX, []):
+        output.add_loot(
+            Student(
+                student["Id"],
+                student["Name"],
+                student["Surname"],
+                student["Class"],
             )
-            for student in students_json:
-                output.add_loot(
-                    Student(
-                        student["Id"],
-                        student["Name"],
-                        student["Surname"],
-                        student["Class"],
-                    )
-                )
-        if loot["Meetings"] and loot["Students"]:
-            break
+        )
     return output
 
 
@@ -136,6 +139,6 @@ def parser_meetings_info(getter_output: GetterOutput[dict]) -> ResultSet:
 
 @_register_resolver(Meeting)
 def resolver(bakalariAPI: BakalariAPI, unresolved: UnresolvedID[Meeting]) -> Meeting:
-    return parser_meetings_info(getter_meeting(bakalariAPI, unresolved.ID)).get(
-        Meeting
-    )[0]
+    getter_output = getter_meeting(bakalariAPI, unresolved.ID)
+    bakalariAPI._archive(getter_output)
+    return parser_meetings_info(getter_output).get(Meeting)[0]
@@ -94,9 +94,15 @@ class BakalariObject(SimpleSerializable, ABC, Upgradeable):
         _date:
             Čas, kdy byl objekt vytvořen.
             Uchováván, aby bylo možné porovnávat stáří dat.
+
+    Atributy třídy:
+        index_keys:
+            Atributy, podle kterých `Looting` objekty daného typu indexuje (viz `Looting.query()`).
+            Hodnoty těchto atributů musí být hashovatelné.
     """
 
     deserialization_keys = {"ID", "_date"}
+    index_keys: set[str] = set()
 
     def __init__(self, ID: str):
         self.ID = ID
@@ -247,6 +253,8 @@ class HomeworkFile(BakalariFile):
 class Komens(BakalariObject):
     """Třída/objekt držící informace o Komens (zprávě/zprách)"""
 
+    index_keys = {"sender", "need_confirm", "confirmed", "type"}
+
     def __init__(
         self,
         ID: str,
@@ -269,10 +277,15 @@ class Komens(BakalariObject):
 
     def confirm(self, bakalariAPI: BakalariAPI):
         """Potvrdí přečtení"""
-        bakalariAPI.session_manager.get_session_or_create(RequestsSession).post(
-            bakalariAPI.get_endpoint(Endpoint.KOMENS_CONFIRM), json={"idmsg": self.ID}
-        ).json()  # Jakože tohle jen jen ztráta výkonu... Actually to nemusíme vůbec parsovat...
+        with bakalariAPI.session_manager.get_session_or_create(
+            RequestsSession
+        ) as session:
+            session.post(
+                bakalariAPI.get_endpoint(Endpoint.KOMENS_CONFIRM),
+                json={"idmsg": self.ID},
+            ).json()  # Jakože tohle jen jen ztráta výkonu... Actually to nemusíme vůbec parsovat...
         self.confirmed = True
+        bakalariAPI.looting.reindex(self)
 
     def format(self, rich_colors: bool = False) -> str:
         return (
@@ -289,6 +302,8 @@ class Komens(BakalariObject):
 class Grade(BakalariObject):
     """Třída/objekt držící informace o Známkách/Klasifikaci"""
 
+    index_keys = {"subject", "grade", "type"}
+
     def __init__(
         self,
         ID: str,
@@ -497,6 +512,8 @@ class Student(BakalariObject):
 class Homework(BakalariObject):
     """Třída/objekt držící informace o domacím úkolu"""
 
+    index_keys = {"subject", "done"}
+
     def __init__(
         self,
         ID: str,
@@ -519,15 +536,19 @@ class Homework(BakalariObject):
 
     def mark_as_done(self, bakalariAPI: BakalariAPI, value: bool = True):
         """Označí úkol jako hotový"""
-        bakalariAPI.session_manager.get_session_or_create(RequestsSession).post(
-            bakalariAPI.get_endpoint(Endpoint.HOMEWORKS_DONE),
-            json={
-                "homeworkId": self.ID,
-                "completed": value
-                # "studentId": studentID
-            },
-        )
+        with bakalariAPI.session_manager.get_session_or_create(
+            RequestsSession
+        ) as session:
+            session.post(
+                bakalariAPI.get_endpoint(Endpoint.HOMEWORKS_DONE),
+                json={
+                    "homeworkId": self.ID,
+                    "completed": value
+                    # "studentId": studentID
+                },
+            )
         self.done = value
+        bakalariAPI.looting.reindex(self)
 
     def format(self, rich_colors: bool = False) -> str:
         if len(self.files) > 0:
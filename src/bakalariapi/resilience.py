@@ -0,0 +1,315 @@
+"""Modul obsahující politiky pro odolnost proti chybám serveru (a pro šetrnost k serveru).
+
+Tento modul primárně implementuje:
+    ResiliencePolicy - Politika, která se aplikuje na všechny requesty `RequestsSession`
+    RetryPolicy - Opakování requestů s exponenciálním čekáním (a jitterem)
+    CircuitBreaker - "Jistič", který při opakovaných chybách serveru dočasně zastaví requesty
+    TokenBucket - Omezovač počtu requestů za sekundu
+"""
+
+from __future__ import annotations
+
+import random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable
+from urllib.parse import urlparse
+
+import requests
+
+from . import cancellation, exceptions
+from .bakalari import Endpoint
+from .transport import Timeout
+
+__all__ = ["ResiliencePolicy", "RetryPolicy", "CircuitBreaker", "TokenBucket"]
+
+
+class RetryPolicy:
+    """Politika opakování requestů.
+
+    Opakují se pouze idempotentní requesty (viz `ResiliencePolicy.is_idempotent()`), a to při chybě spojení,
+    timeoutu nebo při odpovědi se status kódem z `statuses`. Mezi pokusy se čeká náhodnou dobu
+    z intervalu <0, min(`max_backoff`, `backoff` * 2^pokus)> ("full jitter"), aby se requesty
+    z více threadů/procesů neopakovaly všechny najednou.
+
+    Atributy:
+        max_retries:
+            Maximální počet opakování (tzn. celkem se request pošle maximálně `max_retries` + 1 krát).
+        backoff:
+            Základní doba čekání v sekundách.
+        max_backoff:
+            Maximální doba čekání v sekundách.
+        statuses:
+            Status kódy, při kterých se request opakuje.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 10,
+        statuses: frozenset[int] = frozenset({500, 502, 503, 504}),
+    ):
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.statuses: frozenset[int] = statuses
+
+    def delay(self, attempt: int) -> float:
+        """Vrátí dobu (v sekundách), po kterou se má čekat před opakováním.
+
+        Args:
+            attempt:
+                Pořadí opakování (od 0).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class CircuitBreaker:
+    """ "Jistič" pro jeden server.
+
+    Po `failure_threshold` chybách v řadě se jistič "rozpojí" a po dobu `reset_timeout` sekund všechny requesty
+    okamžitě selžou s `CircuitOpenError` (místo toho, aby čekaly na timeout nebo zbytečně zatěžovaly
+    nefunkční server). Poté se propustí jeden zkušební request - pokud projde, jistič se opět "spojí",
+    pokud ne, jistič zůstane rozpojený na dalších `reset_timeout` sekund.
+
+    Atributy:
+        failure_threshold:
+            Počet chyb v řadě, po kterém se jistič rozpojí.
+        reset_timeout:
+            Doba v sekundách, po kterou je jistič rozpojený.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.__lock = Lock()
+        self.__state: str = self.CLOSED
+        self.__failures: int = 0
+        self.__opened_at: float = 0
+
+    @property
+    def state(self) -> str:
+        """Současný stav jističe (`CLOSED`, `OPEN` nebo `HALF_OPEN`)."""
+        return self.__state
+
+    def before_request(self):
+        """Zkontroluje, zda lze poslat request.
+
+        Raises:
+            CircuitOpenError: Pokud je jistič rozpojený.
+        """
+        with self.__lock:
+            if self.__state == self.CLOSED:
+                return
+            if monotonic() - self.__opened_at >= self.reset_timeout:
+                # Propustíme jeden zkušební request, ostatní budou dál odmítány
+                # (pokud zkušební request nijak neskončí, za `reset_timeout` se propustí další)
+                self.__state = self.HALF_OPEN
+                self.__opened_at = monotonic()
+                return
+            raise exceptions.CircuitOpenError(
+                f"Server je (po opakovaných chybách) dočasně nedostupný; Další pokus bude možný za {max(0, self.reset_timeout - (monotonic() - self.__opened_at)):.1f} s"
+            )
+
+    def record_success(self):
+        """Zaznamená úspěšný request."""
+        with self.__lock:
+            self.__state = self.CLOSED
+            self.__failures = 0
+
+    def record_failure(self):
+        """Zaznamená neúspěšný request."""
+        with self.__lock:
+            self.__failures += 1
+            if (
+                self.__state == self.HALF_OPEN
+                or self.__failures >= self.failure_threshold
+            ):
+                self.__state = self.OPEN
+                self.__opened_at = monotonic()
+
+
+class TokenBucket:
+    """Omezovač počtu requestů ("token bucket").
+
+    Každý request spotřebuje jeden token, tokeny se doplňují rychlostí `rate` za sekundu až do `capacity`.
+    Pokud žádný token není k dispozici, request čeká, dokud se token nedoplní.
+
+    Atributy:
+        rate:
+            Počet tokenů (requestů), které se doplní za sekundu.
+        capacity:
+            Maximální počet tokenů, tedy kolik requestů lze poslat najednou (bez čekání).
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate: float = rate
+        self.capacity: float = rate if capacity is None else capacity
+        self.__lock = Lock()
+        self.__tokens: float = self.capacity
+        self.__updated: float = monotonic()
+
+    def acquire(self):
+        """Spotřebuje jeden token; Pokud žádný není k dispozici, počká, dokud se nedoplní.
+
+        Raises:
+            OperationCancelledError: Pokud byla operace během čekání zrušena (viz `cancellation`).
+        """
+        while True:
+            with self.__lock:
+                now = monotonic()
+                self.__tokens = min(
+                    self.capacity, self.__tokens + (now - self.__updated) * self.rate
+                )
+                self.__updated = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait = (1 - self.__tokens) / self.rate
+            token = cancellation.current()
+            if token is None:
+                sleep(wait)
+            elif token.wait(wait):
+                token.check()
+
+
+class ResiliencePolicy:
+    """Politika pro odolnost proti chybám serveru, která se aplikuje na všechny requesty `RequestsSession`.
+
+    Atributy:
+        timeouts:
+            Slovník, kde klíč je endpoint (viz `Endpoint`) a hodnota timeout pro requesty na tento endpoint.
+            Pro ostatní endpointy se použije výchozí timeout transportu (viz `Transport.timeout`).
+        retry:
+            Politika opakování requestů; Pokud `None`, requesty se neopakují.
+        breaker:
+            "Jistič" pro server; Pokud `None`, jistič se nepoužívá.
+        rate_limiter:
+            Omezovač počtu requestů; Pokud `None`, počet requestů se neomezuje.
+        idempotent_posts:
+            Endpointy, na které se posílají POST requesty, ale které jsou bezpečné k opakování (pouze čtou data).
+    """
+
+    def __init__(
+        self,
+        timeouts: dict[str, Timeout] | None = None,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        rate_limiter: TokenBucket | None = None,
+    ):
+        self.timeouts: dict[str, Timeout] = (
+            {
+                # Soubory můžou být (relativně) velké, takže jim dáme víc času
+                Endpoint.FILE: (10, 300),
+            }
+            if timeouts is None
+            else timeouts
+        )
+        self.retry: RetryPolicy | None = retry
+        self.breaker: CircuitBreaker | None = breaker
+        self.rate_limiter: TokenBucket | None = rate_limiter
+        self.idempotent_posts: set[str] = {
+            Endpoint.KOMENS_GET,
+            Endpoint.MEETINGS_OVERVIEW,
+        }
+
+    @classmethod
+    def default(cls) -> ResiliencePolicy:
+        """Vrátí výchozí politiku - opakování requestů a jistič, bez omezení počtu requestů."""
+        return cls(retry=RetryPolicy(), breaker=CircuitBreaker())
+
+    def _match(self, url: str, endpoints) -> str | None:
+        path = urlparse(url).path
+        for endpoint in endpoints:
+            # `in` místo `endswith()` kvůli endpointům s parametrem v cestě (např. "MEETINGS_INFO")
+            if endpoint in path:
+                return endpoint
+        return None
+
+    def timeout_for(self, url: str) -> Timeout:
+        """Vrátí timeout pro danou URL; Pokud pro endpoint není timeout nastaven, vrátí `None`."""
+        endpoint = self._match(url, self.timeouts)
+        return None if endpoint is None else self.timeouts[endpoint]
+
+    def is_idempotent(self, method: str, url: str) -> bool:
+        """Zjistí, zda je request idempotentní (a tedy zda ho lze bezpečně opakovat)."""
+        method = method.upper()
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return True
+        return method == "POST" and self._match(url, self.idempotent_posts) is not None
+
+    def execute(
+        self,
+        method: str,
+        url: str,
+        send: Callable[..., requests.Response],
+        **kwargs,
+    ) -> requests.Response:
+        """Pošle request přes `send` a aplikuje na něj tuto politiku.
+
+        Args:
+            method:
+                HTTP metoda requestu.
+            url:
+                URL requestu.
+            send:
+                Funkce, která request pošle; Dostane `kwargs` (případně doplněné o timeout).
+
+        Returns:
+            Odpověď serveru.
+
+        Raises:
+            CircuitOpenError: Pokud je jistič rozpojený.
+            DeadlineExceededError: Pokud vypršel deadline operace.
+            OperationCancelledError: Pokud byla operace zrušena.
+        """
+        if kwargs.get("timeout") is None:
+            timeout = self.timeout_for(url)
+            if timeout is not None:
+                kwargs["timeout"] = timeout
+            else:
+                kwargs.pop("timeout", None)
+        # Neidempotentní requesty se neopakují (např. potvrzení zprávy by se mohlo provést dvakrát)
+        retry = self.retry if self.is_idempotent(method, url) else None
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_request()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = send(**kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                # Timeout zkrácený deadlinem (viz `Transport`) není chyba serveru, takže se do jističe nepočítá
+                token = cancellation.current()
+                if token is not None and token.cancelled:
+                    token.check()
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if retry is None or attempt >= retry.max_retries:
+                    raise
+            else:
+                if response.status_code < 500:
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    return response
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if (
+                    retry is None
+                    or attempt >= retry.max_retries
+                    or response.status_code not in retry.statuses
+                ):
+                    return response
+                response.close()
+            token = cancellation.current()
+            if token is None:
+                sleep(retry.delay(attempt))
+            elif token.wait(retry.delay(attempt)):
+                token.check()
+            attempt += 1
@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import atexit
+import logging
 from enum import Enum
+from threading import Lock
+from time import monotonic
 
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.remote.webdriver import WebDriver
 
 __all__ = ["Browser", "SeleniumHandler"]
 
+LOGGER = logging.getLogger("bakalariapi.seleniumhandler")
+
 
 class Browser(Enum):
     """Enum prohlížečů/browserů podporovaných Seleniem"""
@@ -22,18 +29,43 @@ class Browser(Enum):
 
 
 class SeleniumHandler:
-    """Třída obsahujcí nastavení pro Selenium."""
+    """Třída obsahujcí nastavení pro Selenium.
+
+    Zároveň spravuje pool již spuštěných WebDriverů - místo ukončení se WebDriver vrátí do poolu přes `release()`
+    a při dalším `acquire()` se použije znovu, takže se nemusí znovu spouštět prohlížeč.
+
+    Atributy:
+        browser:
+            Prohlížeč, který se má použít.
+        executable_path:
+            Cesta ke spustitelnému WebDriveru.
+        params:
+            Další parametry pro WebDriver.
+        pool_size:
+            Maximální počet volných WebDriverů, které se v poolu udržují.
+            Pokud je 0, WebDrivery se neudržují a při uvolnění se rovnou ukončí.
+        idle_ttl:
+            Doba v sekundách, po které se volný (nepoužívaný) WebDriver v poolu ukončí.
+    """
 
     def __init__(
         self,
         browser: Browser,
         executable_path: str | None = None,
         params: dict | None = None,
+        pool_size: int = 2,
+        idle_ttl: float = 300,
     ):
         self.browser: Browser = browser
         self.executable_path: str | None = executable_path
         self.params: dict = {} if params is None else params
+        self.pool_size: int = pool_size
+        self.idle_ttl: float = idle_ttl
+        self.__lock = Lock()
+        # Volné WebDrivery spolu s časem (`monotonic()`) jejich uvolnění
+        self.__idle: list[tuple[WebDriver, float]] = []
         self.build_params()
+        atexit.register(self.close_all)
 
     def open(self, try_silent: bool = True) -> WebDriver:
         """Spustí a vrátí WebDriver instanci"""
@@ -62,6 +94,100 @@ class SeleniumHandler:
             raise ValueError()
         return driver
 
+    def acquire(self) -> WebDriver:
+        """Vrátí volný WebDriver z poolu; Pokud v poolu žádný není, spustí nový.
+
+        Po použití by se měl WebDriver vrátit do poolu přes `release()`.
+        """
+        self._evict_expired()
+        with self.__lock:
+            if len(self.__idle) != 0:
+                # Bereme naposledy uvolněný, protože ten je nejdál od vypršení `idle_ttl`
+                driver, _ = self.__idle.pop()
+                return driver
+        return self.open()
+
+    def release(self, driver: WebDriver, reset_url: str | None = None):
+        """Vrátí WebDriver do poolu.
+
+        Před vrácením se WebDriver "resetuje" - smažou se všechny cookies a pokud je `reset_url` specifikována,
+        přejde se na ni (typicky na přihlašovací stránku, aby se další session mohla rovnou přihlásit).
+        Pokud je pool plný nebo se reset nepovede, WebDriver se ukončí.
+
+        Args:
+            driver:
+                WebDriver, který se vrací.
+            reset_url:
+                URL, na kterou se má WebDriver po smazání cookies navigovat.
+        """
+        with self.__lock:
+            full = len(self.__idle) >= self.pool_size
+        if full:
+            self._quit(driver)
+            return
+        try:
+            driver.delete_all_cookies()
+            if reset_url is not None:
+                driver.get(reset_url)
+        except WebDriverException:
+            # WebDriver je nejspíše již mrtvý (např. zavřený prohlížeč), takže ho do poolu nevracíme
+            self._quit(driver)
+            return
+        with self.__lock:
+            # Mezitím mohl pool zaplnit někdo jiný
+            pooled = len(self.__idle) < self.pool_size
+            if pooled:
+                self.__idle.append((driver, monotonic()))
+        if not pooled:
+            self._quit(driver)
+        self._evict_expired()
+
+    def prelaunch(self, count: int | None = None) -> int:
+        """Předem spustí WebDrivery do poolu, aby je `acquire()` nemusel spouštět.
+
+        Args:
+            count:
+                Počet WebDriverů, které mají být v poolu; Pokud `None`, pool se naplní do `pool_size`.
+
+        Returns:
+            Počet nově spuštěných WebDriverů.
+        """
+        count = self.pool_size if count is None else min(count, self.pool_size)
+        launched = 0
+        while True:
+            with self.__lock:
+                if len(self.__idle) >= count:
+                    break
+            driver = self.open()
+            with self.__lock:
+                self.__idle.append((driver, monotonic()))
+            launched += 1
+        return launched
+
+    def close_all(self):
+        """Ukončí všechny volné WebDrivery v poolu."""
+        with self.__lock:
+            idle = self.__idle
+            self.__idle = []
+        for driver, _ in idle:
+            self._quit(driver)
+
+    def _evict_expired(self):
+        """Ukončí volné WebDrivery, které jsou v poolu déle než `idle_ttl`."""
+        now = monotonic()
+        with self.__lock:
+            expired = [d for d, t in self.__idle if now - t >= self.idle_ttl]
+            self.__idle = [(d, t) for d, t in self.__idle if now - t < self.idle_ttl]
+        for driver in expired:
+            self._quit(driver)
+
+    @staticmethod
+    def _quit(driver: WebDriver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            LOGGER.debug("WebDriver se nepodařilo ukončit (nejspíše je již ukončen)")
+
     def build_params(self):
         path = (
             {"executable_path": self.executable_path}
@@ -2,18 +2,35 @@
 
 from __future__ import annotations
 
+import asyncio
 import atexit
+import heapq
 import json
+import logging
+import os
+import tempfile
 from abc import ABC, abstractmethod
-from threading import Lock, Thread
-from time import sleep
-from typing import TypeVar
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from threading import Condition, Lock, RLock, Thread
+from time import monotonic, sleep
+from typing import Iterator, TypeVar
 
 import requests
+from requests.cookies import RequestsCookieJar
 from selenium.webdriver.remote.webdriver import WebDriver
 
 from . import exceptions, utils
 from .bakalari import BakalariAPI, Endpoint
+from .cache import ResponseCache
+from .resilience import ResiliencePolicy
+from .transport import Transport
+
+LOGGER = logging.getLogger("bakalariapi.sessions")
+
+# Verze formátu souboru se stavem (viz `SessionManager.save_state()`)
+STATE_VERSION = 1
 
 
 class BakalariSession(ABC):
@@ -26,6 +43,9 @@ class BakalariSession(ABC):
             Reference k přidružené BakalariAPI instanci, tedy instanci, pro kterou je tato session validní.
         busy:
             Je session zaneprázdněná?
+        last_activity:
+            Čas (dle `time.monotonic()`) posledního requestu, který prodloužil životnost sessionu.
+            Podle něj `SessionExtendScheduler` pozná, že session není potřeba prodlužovat.
     """
 
     def __init__(
@@ -33,7 +53,9 @@ class BakalariSession(ABC):
     ):
         self.bakalariAPI: BakalariAPI = bakalariAPI
         self.busy: bool = setBusy
+        self.last_activity: float = monotonic()
         self._auto_extend: bool = False
+        self._enter_depth: int = 0
         if login:
             self.login()
 
@@ -51,7 +73,7 @@ class BakalariSession(ABC):
         Returns:
             Zbývající životnost sessionu.
         """
-        return int(float(self.get_session_info()["remainingTime"]))
+        return int(float(self.get_session_info()["data"]["remainingTime"]))
         # Taková cesta, jak převést string float na int :)
 
     @abstractmethod
@@ -106,73 +128,177 @@ class BakalariSession(ABC):
         """Ukončí smyčku na obnovování životnosti sessionu.
 
         Smyčce může trvat jeden cyklus (resp. dobu intervalu) než se ukončí.
+        Ukončí i automatické obnovování přes `SessionExtendScheduler`.
         """
         self._auto_extend = False
 
     def __enter__(self: Session) -> Session:
         self.busy = True
+        self._enter_depth += 1
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.busy = False
+        # Vnořené `with` bloky session neuvolní, uvolní ji až ten vnější
+        self._enter_depth -= 1
+        if self._enter_depth <= 0:
+            self._enter_depth = 0
+            self.bakalariAPI.session_manager.release_session(self)
 
 
 class RequestsSession(BakalariSession):
-    """Session využívající `requests` modul."""
+    """Session využívající `requests` modul.
+
+    Všechny `RequestsSession` jednoho `SessionManager`u sdílí pool spojení přes `SessionManager.transport`,
+    cookies má ale každá session vlastní.
+
+    Atributy:
+        session:
+            `requests.Session` této session (tedy hlavně cookies).
+        transport:
+            Sdílený transport, přes který se vykonávají requesty.
+    """
 
     def __init__(
         self, bakalariAPI: BakalariAPI, setBusy: bool = True, login: bool = True
     ):
-        self.session = requests.session()
+        self.transport: Transport = bakalariAPI.session_manager.transport
+        self.session: requests.Session = self.transport.new_session()
         super().__init__(bakalariAPI, setBusy, login)
 
     def extend(self):
-        with self:
-            self.session.get(self.bakalariAPI.get_endpoint(Endpoint.SESSION_EXTEND))
+        self.request("GET", self.bakalariAPI.get_endpoint(Endpoint.SESSION_EXTEND))
 
     def kill(self, nice=True):
         if nice:
-            self.session.get(self.bakalariAPI.get_endpoint(Endpoint.LOGOUT))
+            self.request("GET", self.bakalariAPI.get_endpoint(Endpoint.LOGOUT))
         self.session.close()
         super().kill(nice)
 
     def get_session_info(self) -> dict:
-        with self:
-            output = self.session.get(
-                self.bakalariAPI.get_endpoint(Endpoint.SESSION_INFO)
-            ).json()
+        # Nejde přes `request()`, aby se nezměnilo `last_activity` (dotaz na info životnost neprodlužuje)
+        output = self._send(
+            "GET", self.bakalariAPI.get_endpoint(Endpoint.SESSION_INFO)
+        ).json()
         return output
 
     def login(self) -> bool:
-        with self:
-            output = self.session.post(
-                self.bakalariAPI.get_endpoint(Endpoint.LOGIN),
-                {
-                    "username": self.bakalariAPI.username,
-                    "password": self.bakalariAPI.password,
-                },
-                allow_redirects=False,
-            ).is_redirect
+        manager = self.bakalariAPI.session_manager
+        if not manager.coalesce_logins:
+            return self._login()
+        (output, cookies), shared = manager.login_flight.do(
+            (self.bakalariAPI.get_endpoint(Endpoint.LOGIN), self.bakalariAPI.username),
+            lambda: (self._login(), self.session.cookies.copy()),
+        )
+        if shared and output:
+            # Přihlásila se jiná session, takže si jen převezmeme její cookies
+            self.session.cookies.update(cookies)
+        return output
+
+    def _login(self) -> bool:
+        output = self.post(
+            self.bakalariAPI.get_endpoint(Endpoint.LOGIN),
+            {
+                "username": self.bakalariAPI.username,
+                "password": self.bakalariAPI.password,
+            },
+            allow_redirects=False,
+        ).is_redirect
+        if output:
+            self.bakalariAPI.session_manager.cookies.publish(self.session.cookies)
         return output
 
     def is_logged(self) -> bool:
-        with self:
-            response = self.session.get(
-                self.bakalariAPI.get_endpoint(Endpoint.DASHBOARD), allow_redirects=False
-            )
+        response = self.request(
+            "GET",
+            self.bakalariAPI.get_endpoint(Endpoint.DASHBOARD),
+            allow_redirects=False,
+        )
         return not response.is_redirect
 
-    def get(self, *args, **kwargs) -> requests.Response:
-        """Stejné jako `.session.get()`"""
-        return self.session.get(*args, **kwargs)
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Stejné jako `.session.request()`, ale aplikuje se `SessionManager.policy`.
+
+        Pokud není specifikován timeout, použije se timeout z politiky pro daný endpoint, případně `transport.timeout`.
+        Pokud je nastavena `SessionManager.response_cache`, odpověď se (pokud je to možné) vezme z ní. Neplatí pro `stream` requesty.
+        """
+        cache = self.bakalariAPI.session_manager.response_cache
+        if cache is None or kwargs.get("stream", False):
+            return self._send_active(method, url, **kwargs)
+        return cache.fetch(
+            method,
+            url,
+            self.bakalariAPI.username,
+            partial(self._send_active, method, url),
+            **kwargs,
+        )
+
+    def _send_active(self, method: str, url: str, **kwargs) -> requests.Response:
+        # Odpověď z cache session neprodlouží, takže aktivitu zaznamenáváme až při skutečném requestu
+        self.last_activity = monotonic()
+        return self._send(method, url, **kwargs)
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        policy = self.bakalariAPI.session_manager.policy
+        if policy is None:
+            return self.transport.request(self.session, method, url, **kwargs)
+        return policy.execute(
+            method,
+            url,
+            partial(self.transport.request, self.session, method, url),
+            **kwargs,
+        )
 
-    def post(self, *args, **kwargs) -> requests.Response:
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Stejné jako `.session.get()`
+
+        Pokud je zapnuté `SessionManager.coalesce_requests`, souběžné stejné GET requesty (ze všech sessionů
+        `SessionManager`u) se sloučí do jednoho a všechny dostanou stejnou odpověď. Neplatí pro `stream` requesty.
+        """
+        kwargs.setdefault("allow_redirects", True)
+        manager = self.bakalariAPI.session_manager
+        if not manager.coalesce_requests or kwargs.get("stream", False):
+            return self.request("GET", url, **kwargs)
+        # Parametry můžou obsahovat slovníky (např. "params"), takže jako klíč použijeme jejich reprezentaci
+        key = (url, repr(sorted(kwargs.items())))
+        response, _ = manager.request_flight.do(
+            key, partial(self.request, "GET", url, **kwargs)
+        )
+        return response
+
+    def post(self, url: str, data=None, json=None, **kwargs) -> requests.Response:
         """Stejné jako `.session.post()`"""
-        return self.session.post(*args, **kwargs)
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+
+class AsyncRequestsSession(RequestsSession):
+    """Session využívající `requests` modul, který navíc poskytuje asynchroní varianty `get()` a `post()`.
+
+    `requests` modul je blokující, takže se requesty vykonávají v executoru běžícího event loopu
+    (defaultně v jeho sdíleném thread poolu), aby neblokovaly event loop.
+    """
+
+    async def get_async(self, *args, **kwargs) -> requests.Response:
+        """Asynchroní varianta `.get()`"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.get, *args, **kwargs)
+        )
+
+    async def post_async(self, *args, **kwargs) -> requests.Response:
+        """Asynchroní varianta `.post()`"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(self.post, *args, **kwargs)
+        )
 
 
 class SeleniumSession(BakalariSession):
-    """Session využívající Selenium."""
+    """Session využívající Selenium.
+
+    S "requests akcelerací" se přihlášení i dotazy na stav sessionu (`get_session_info()`, `extend()`, `is_logged()`)
+    provádí přes `requests` s lokálními cookies (bez dotazování WebDriveru) a do prohlížeče se cookies nahrají
+    až ve chvíli, kdy je prohlížeč potřeba (viz `sync_cookies()`). Pokud již existuje platné přihlášení jiné session
+    (viz `SessionManager.cookies`), session ho převezme a vůbec se nepřihlašuje.
+    Pozn.: Převzaté přihlášení je sdílené, takže odhlášení této session (`kill()` s `nice=True`) odhlásí i ostatní.
+    """
 
     def __init__(
         self,
@@ -183,103 +309,409 @@ class SeleniumSession(BakalariSession):
     ):
         if bakalariAPI.selenium_handler is None:
             raise exceptions.MissingSeleniumHandlerError()
-        self.session: WebDriver = bakalariAPI.selenium_handler.open()
+        self.session: WebDriver = bakalariAPI.selenium_handler.acquire()
         self.requests_acceleration: bool = enable_requests_acceleration
+        # Lokální cookies a jejich verze; `_browser_version` je verze lokálních cookies, která je nahraná v prohlížeči
+        self._cookies: RequestsCookieJar = RequestsCookieJar()
+        self._cookies_version: int = 0
+        self._browser_version: int = 0
         super().__init__(bakalariAPI, setBusy, login)
 
+    def _set_cookies(self, cookies: RequestsCookieJar, in_browser: bool = False):
+        """Nastaví lokální cookies; Pokud `in_browser` je `False`, do prohlížeče se nahrají až při `sync_cookies()`."""
+        self._cookies = cookies.copy()
+        self._cookies_version += 1
+        if in_browser:
+            self._browser_version = self._cookies_version
+
+    def sync_cookies(self):
+        """Nahraje lokální cookies do prohlížeče, pokud tam ještě nejsou.
+
+        Mělo by se volat před navigací prohlížeče na stránku, která vyžaduje přihlášení.
+        """
+        if self._browser_version == self._cookies_version:
+            return
+        login_url = self.bakalariAPI.get_endpoint(Endpoint.LOGIN)
+        # Musíme být na správné stránce, jelikož jinak se nám vrátí error o špatné doméně,
+        # kterou si to případně domyslí, když je na dané stránce I guess a asi není nejlepší
+        # řešení dávat doménu "na tvrdo" (domain = bakalariAPI.url), takže to je (zatím) takto
+        # (WebDriver z poolu už na přihlašovací stránce většinou je)
+        if self.session.current_url != login_url:
+            self.session.get(login_url)
+        self.session.delete_all_cookies()
+        for cookie in utils.cookies_requests2webdriver(self._cookies):
+            self.session.add_cookie(cookie)
+        self._browser_version = self._cookies_version
+
+    def navigate(self, url: str):
+        """Načte v prohlížeči danou stránku.
+
+        Na rozdíl od přímého `self.session.get()` zaznamená aktivitu sessionu (viz `BakalariSession.last_activity`).
+        """
+        self.last_activity = monotonic()
+        self.session.get(url)
+
     def get_session_info(self) -> dict:
         if self.requests_acceleration:
-            return requests.get(
+            return self.bakalariAPI.session_manager._request(
+                "GET",
                 self.bakalariAPI.get_endpoint(Endpoint.SESSION_INFO),
-                cookies=utils.cookies_webdriver2requests(self.session),
+                cookies=self._cookies,
             ).json()
         else:
-            with self:
-                self.session.get(self.bakalariAPI.get_endpoint(Endpoint.SESSION_INFO))
-                output = json.loads(self.session.page_source)
+            self.session.get(self.bakalariAPI.get_endpoint(Endpoint.SESSION_INFO))
+            output = json.loads(self.session.page_source)
             return output
 
     def extend(self):
+        self.last_activity = monotonic()
         if self.requests_acceleration:
-            requests.get(
+            self.bakalariAPI.session_manager._request(
+                "GET",
                 self.bakalariAPI.get_endpoint(Endpoint.SESSION_EXTEND),
-                cookies=utils.cookies_webdriver2requests(self.session),
+                cookies=self._cookies,
             )
         else:
-            with self:
-                self.session.get(self.bakalariAPI.get_endpoint(Endpoint.SESSION_EXTEND))
+            self.navigate(self.bakalariAPI.get_endpoint(Endpoint.SESSION_EXTEND))
 
     def kill(self, nice=True):
         # try:
         if nice:
-            self.session.get(self.bakalariAPI.get_endpoint(Endpoint.LOGOUT))
-        self.session.close()
+            if self.requests_acceleration:
+                # Prohlížeč nemusí mít cookies vůbec nahrané, takže se odhlásíme přes lokální cookies
+                self.bakalariAPI.session_manager._request(
+                    "GET",
+                    self.bakalariAPI.get_endpoint(Endpoint.LOGOUT),
+                    cookies=self._cookies,
+                )
+            else:
+                self.session.get(self.bakalariAPI.get_endpoint(Endpoint.LOGOUT))
         # except WebDriverException: # Kvůli tomu, když nějakým záhadným způsobem je už webdriver mrtvý (resp. zavřený) :)
         #     #No... Dost nepěkné řešení, jelikož tohle chytí úplně všecho, co se pokazí, ale lepší řešení neexistuje eShrug
         #     pass
+        # WebDriver neukončujeme, ale vracíme do poolu (kde se "resetuje" a případně i ukončí)
+        if self.bakalariAPI.selenium_handler is None:
+            self.session.quit()
+        else:
+            self.bakalariAPI.selenium_handler.release(
+                self.session, self.bakalariAPI.get_endpoint(Endpoint.LOGIN)
+            )
         super().kill(nice)
 
     def login(self) -> bool:
+        manager = self.bakalariAPI.session_manager
         if self.requests_acceleration:
-            response = requests.post(
+            cookies, _ = manager.cookies.snapshot()
+            if len(cookies) != 0:
+                # Zkusíme převzít přihlášení jiné session
+                self._set_cookies(cookies)
+                try:
+                    if self.get_remaining() > 0:
+                        return True
+                except (ValueError, KeyError):
+                    # Neplatné přihlášení je většinou přesměrováno na login, takže nedostaneme JSON
+                    pass
+            response = manager._request(
+                "POST",
                 self.bakalariAPI.get_endpoint(Endpoint.LOGIN),
-                {
+                data={
                     "username": self.bakalariAPI.username,
                     "password": self.bakalariAPI.password,
                 },
                 allow_redirects=False,
             )
             if response.is_redirect:
-                with self:
-                    cookies = utils.cookies_requests2webdriver(response.cookies)
-
-                    # Musíme být na správné stránce, jelikož jinak se nám vrátí error o špatné doméně,
-                    # kterou si to případně domyslí, když je na dané stránce I guess a asi není nejlepší
-                    # řešení dávat doménu "na tvrdo" (domain = bakalariAPI.url), takže to je (zatím) takto
-                    self.session.get(self.bakalariAPI.get_endpoint(Endpoint.LOGIN))
-                    for cookie in cookies:
-                        self.session.add_cookie(cookie)
+                self._set_cookies(response.cookies)
+                manager.cookies.publish(response.cookies)
                 return True
             else:
                 return False
         else:
-            with self:
-                self.session.get(self.bakalariAPI.get_endpoint(Endpoint.LOGIN))
-                self.session.find_element_by_id("username").send_keys(
-                    self.bakalariAPI.username
-                )
-                self.session.find_element_by_id("password").send_keys(
-                    self.bakalariAPI.password
-                )
-                self.session.find_element_by_id("loginButton").click()
-                output = self.session.current_url != self.bakalariAPI.get_endpoint(
-                    Endpoint.LOGIN
-                )
+            self.navigate(self.bakalariAPI.get_endpoint(Endpoint.LOGIN))
+            self.session.find_element_by_id("username").send_keys(
+                self.bakalariAPI.username
+            )
+            self.session.find_element_by_id("password").send_keys(
+                self.bakalariAPI.password
+            )
+            self.session.find_element_by_id("loginButton").click()
+            output = self.session.current_url != self.bakalariAPI.get_endpoint(
+                Endpoint.LOGIN
+            )
+            if output:
+                cookies = RequestsCookieJar()
+                for cookie in self.session.get_cookies():
+                    cookies.set(
+                        cookie["name"],
+                        cookie["value"],
+                        domain=cookie.get("domain"),
+                        path=cookie.get("path", "/"),
+                    )
+                self._set_cookies(cookies, in_browser=True)
+                manager.cookies.publish(cookies)
             return output
 
     def is_logged(self) -> bool:
         if self.requests_acceleration:
-            response = requests.get(
+            response = self.bakalariAPI.session_manager._request(
+                "GET",
                 self.bakalariAPI.get_endpoint(Endpoint.DASHBOARD),
-                cookies=utils.cookies_webdriver2requests(self.session),
+                cookies=self._cookies,
                 allow_redirects=False,
             )
             return not response.is_redirect
         else:
-            with self:
-                self.session.get(self.bakalariAPI.get_endpoint(Endpoint.DASHBOARD))
-                output = self.session.current_url == self.bakalariAPI.get_endpoint(
-                    Endpoint.DASHBOARD
-                )
+            self.navigate(self.bakalariAPI.get_endpoint(Endpoint.DASHBOARD))
+            output = self.session.current_url == self.bakalariAPI.get_endpoint(
+                Endpoint.DASHBOARD
+            )
             return output
 
 
+class SharedCookieJar:
+    """Sdílené (verzované) cookies jednoho účtu.
+
+    Sessiony sem po úspěšném přihlášení publikují své cookies, takže jiné sessiony (např. `SeleniumSession`)
+    mohou přihlášení převzít bez dalšího přihlašování. Při každé změně se zvýší verze.
+
+    Atributy:
+        version:
+            Verze cookies; Zvyšuje se s každou změnou.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__cookies: RequestsCookieJar = RequestsCookieJar()
+        self.version: int = 0
+
+    def publish(self, cookies: RequestsCookieJar):
+        """Nahradí sdílené cookies danými cookies."""
+        with self.__lock:
+            self.__cookies = cookies.copy()
+            self.version += 1
+
+    def snapshot(self) -> tuple[RequestsCookieJar, int]:
+        """Vrátí kopii sdílených cookies a jejich verzi."""
+        with self.__lock:
+            return self.__cookies.copy(), self.version
+
+    def clear(self):
+        """Odstraní všechny sdílené cookies."""
+        self.publish(RequestsCookieJar())
+
+
 Session = TypeVar("Session", bound=BakalariSession)
 
 
+class _ExtendPlan:
+    """Stav prodlužování jednoho sessionu v `SessionExtendScheduler`u."""
+
+    def __init__(self, session: BakalariSession):
+        self.session: BakalariSession = session
+        # Čas (`monotonic()`), kdy (podle posledních známých informací) session vyprší
+        self.expires_at: float | None = None
+        # Čas, ke kterému byl `expires_at` naposledy spočítán
+        self.observed_at: float = 0
+        # Celková životnost sessionu (tzn. zbývající čas hned po requestu); Zjistí se z "session_info"
+        self.lifetime: float | None = None
+        self.seq: int = 0
+
+
+class SessionExtendScheduler:
+    """Plánovač, který v jediném (daemon) threadu prodlužuje životnost sessionů.
+
+    Místo prodlužování sessionu každou minutu si plánovač z "session_info" zjistí, kdy session vyprší,
+    a naplánuje prodloužení až na dobu `lead` sekund před vypršením. Pokud mezitím session udělala nějaký
+    request (viz `BakalariSession.last_activity`), tak se její životnost prodloužila sama a prodlužování
+    se jen posune bez jakéhokoli requestu.
+
+    Jeden plánovač může (a defaultně tak je) sdílet více `SessionManager`ů, viz `SessionExtendScheduler.shared()`.
+
+    Atributy:
+        lead:
+            Kolik sekund před vypršením sessionu se má session prodloužit.
+        retry_interval:
+            Za kolik sekund se má prodloužení zopakovat, pokud se nepovedlo (např. kvůli chybě připojení).
+        busy_interval:
+            Za kolik sekund se má prodloužení zopakovat, pokud byla session zaneprázdněná (viz `BakalariSession.busy`).
+    """
+
+    _shared: SessionExtendScheduler | None = None
+    _shared_lock = RLock()
+
+    def __init__(
+        self, lead: float = 60, retry_interval: float = 60, busy_interval: float = 5
+    ):
+        self.lead: float = lead
+        self.retry_interval: float = retry_interval
+        self.busy_interval: float = busy_interval
+        self.__condition = Condition(RLock())
+        self.__heap: list[tuple[float, int, _ExtendPlan]] = []
+        self.__plans: dict[BakalariSession, _ExtendPlan] = {}
+        self.__seq: int = 0
+        self.__thread: Thread | None = None
+
+    @classmethod
+    def shared(cls) -> SessionExtendScheduler:
+        """Vrátí sdílenou instanci plánovače (vytvoří ji při prvním volání)."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add(self, session: BakalariSession):
+        """Začne automaticky prodlužovat životnost dané session.
+
+        Automatické prodlužování skončí s `session.stop_extend_loop()` (a tedy i s `session.kill()`) nebo s `remove()`.
+        """
+        with self.__condition:
+            session._auto_extend = True
+            plan = _ExtendPlan(session)
+            self.__plans[session] = plan
+            # Nejdřív se zjistí, kolik času session zbývá
+            self.__push(plan, monotonic())
+            if self.__thread is None:
+                self.__thread = Thread(
+                    target=self.__loop, daemon=True, name="bakalariapi-session-extend"
+                )
+                self.__thread.start()
+
+    def remove(self, session: BakalariSession):
+        """Přestane automaticky prodlužovat životnost dané session."""
+        with self.__condition:
+            self.__plans.pop(session, None)
+            # Záznam v haldě se zahodí až při jeho vyzvednutí
+
+    def __len__(self) -> int:
+        return len(self.__plans)
+
+    def __push(self, plan: _ExtendPlan, when: float):
+        self.__seq += 1
+        plan.seq = self.__seq
+        heapq.heappush(self.__heap, (when, plan.seq, plan))
+        self.__condition.notify()
+
+    def __loop(self):
+        while True:
+            with self.__condition:
+                while True:
+                    if len(self.__heap) == 0:
+                        self.__condition.wait()
+                        continue
+                    when, seq, plan = self.__heap[0]
+                    if plan.seq != seq or self.__plans.get(plan.session) is not plan:
+                        # Zastaralý záznam (session byla odebrána nebo přeplánována)
+                        heapq.heappop(self.__heap)
+                        continue
+                    delay = when - monotonic()
+                    if delay > 0:
+                        self.__condition.wait(delay)
+                        continue
+                    heapq.heappop(self.__heap)
+                    break
+            if not plan.session._auto_extend:
+                self.remove(plan.session)
+                continue
+            try:
+                next_run = self.__process(plan)
+            except Exception:
+                LOGGER.exception("Nepodařilo se prodloužit session %s", plan.session)
+                next_run = monotonic() + self.retry_interval
+            with self.__condition:
+                if next_run is None:
+                    self.__plans.pop(plan.session, None)
+                elif self.__plans.get(plan.session) is plan:
+                    self.__push(plan, next_run)
+
+    def __process(self, plan: _ExtendPlan) -> float | None:
+        """Zpracuje naplánovanou session a vrátí čas (`monotonic()`), kdy se má zpracovat znovu.
+
+        Pokud vrátí `None`, session již není platná a dále se nezpracovává.
+        """
+        session = plan.session
+        now = monotonic()
+        if (
+            plan.lifetime is not None
+            and plan.expires_at is not None
+            and session.last_activity > plan.observed_at
+        ):
+            # Session od posledního zpracování udělala request, takže se její životnost prodloužila sama
+            plan.expires_at = session.last_activity + plan.lifetime
+            plan.observed_at = session.last_activity
+        if plan.expires_at is not None and plan.expires_at - now > self.lead:
+            return plan.expires_at - self.lead
+        # Session si po dobu prodlužování zapůjčíme, aby ji mezitím nikdo jiný nezískal
+        manager = session.bakalariAPI.session_manager
+        if not manager._try_checkout(session):
+            # Session právě používá někdo jiný (u `SeleniumSession` bez akcelerace bychom mu navigovali WebDriver),
+            # takže to zkusíme později; Pokud mezitím udělá request, prodlouží se sama
+            return now + self.busy_interval
+        try:
+            return self.__extend(plan)
+        finally:
+            manager.release_session(session)
+
+    def __extend(self, plan: _ExtendPlan) -> float | None:
+        """Zjistí zbývající čas (zapůjčené) session a případně ji prodlouží; Viz `__process()`."""
+        session = plan.session
+        remaining = session.get_remaining()
+        now = monotonic()
+        if remaining <= 0:
+            # Session je již odhlášená, takže ji není co prodlužovat
+            return None
+        plan.lifetime = max(plan.lifetime or 0, remaining)
+        plan.expires_at = now + remaining
+        plan.observed_at = now
+        if remaining > self.lead:
+            return plan.expires_at - self.lead
+
+        session.extend()
+        plan.expires_at = session.last_activity + plan.lifetime
+        plan.observed_at = session.last_activity
+        # Pokud je životnost sessionu kratší než `lead`, tak ji alespoň nebudeme prodlužovat neustále dokola
+        return max(plan.expires_at - self.lead, monotonic() + self.retry_interval)
+
+
+class SessionPoolStats:
+    """Statistiky poolu sessionů (jednoho typu) v `SessionManager`u.
+
+    Atributy:
+        checkouts:
+            Počet vydaných (zapůjčených) sessionů.
+        created:
+            Počet vytvořených (a tedy i přihlášených) sessionů.
+        waits:
+            Počet zapůjčení, při kterých se muselo čekat na uvolnění sessionu.
+        timeouts:
+            Počet zapůjčení, u kterých vypršel timeout.
+        total_wait:
+            Celková doba čekání na uvolnění sessionu v sekundách.
+        max_wait:
+            Nejdelší doba čekání na uvolnění sessionu v sekundách.
+    """
+
+    def __init__(self):
+        self.checkouts: int = 0
+        self.created: int = 0
+        self.waits: int = 0
+        self.timeouts: int = 0
+        self.total_wait: float = 0
+        self.max_wait: float = 0
+
+    @property
+    def average_wait(self) -> float:
+        """Průměrná doba čekání na uvolnění sessionu v sekundách (počítají se pouze zapůjčení, u kterých se čekalo)."""
+        return self.total_wait / self.waits if self.waits != 0 else 0
+
+
 class SessionManager:
     """Classa, která spravuje sessiony.
 
+    Sessiony jsou spravovány jako pool - pro každý typ sessionu může existovat maximálně `max_sessions` sessionů.
+    Pokud jsou všechny zaneprázdněné a limit je vyčerpán, `get_session_or_create()` (resp. `lease()`) čeká,
+    dokud se některá session neuvolní. Session se uvolní na konci `with` bloku (`with session:`, resp.
+    `with session_manager.lease(...) as session:`) nebo voláním `release_session()`.
+
     Atributy:
         bakalariAPI:
             Reference k BakalářiAPI, pro které spravuje sessiony.
@@ -287,24 +719,143 @@ class SessionManager:
             Slovník, který obsahuje všechny sessiony pod správou tohoto SessionMannageru.
             Klič je typ sessionu jako string (tedy název classy sessionu) a hodnota je list sessionů tohoto typu.
         start_auto_extend:
-            Pokud `True`, automaticky u sessionů zapne `auto_extend()` v nové daemon threadu.
+            Pokud `True`, automaticky u sessionů zapne prodlužování životnosti přes `extend_scheduler`.
             Pokud `False`, tak nic.
-            Default je `False`, jelikož ve většině případů session přežije po potřebnou dobu i bez `extend()`
-            a zbytečně se nevytvářejí theady.
+            Default je `False`, jelikož ve většině případů session přežije po potřebnou dobu i bez `extend()`.
+        extend_scheduler:
+            Plánovač, přes který se prodlužuje životnost sessionů (pokud je `start_auto_extend` `True`).
+            Defaultně sdílený plánovač (`SessionExtendScheduler.shared()`).
+        coalesce_logins:
+            Pokud `True`, souběžná přihlášení `RequestsSession` sessionů se sloučí do jednoho
+            a všechny tyto sessiony budou sdílet stejné přihlášení (cookies).
+            Pozn.: Odhlášení jedné z těchto sessionů (`kill()` s `nice=True`) odhlásí i ostatní.
+        coalesce_requests:
+            Pokud `True`, souběžné stejné GET requesty přes `RequestsSession.get()` se sloučí do jednoho.
+        cookies:
+            Sdílené cookies posledního přihlášení (viz `SharedCookieJar`).
+        login_flight:
+            `utils.SingleFlight` pro slučování přihlášení.
+        request_flight:
+            `utils.SingleFlight` pro slučování GET requestů.
+        response_cache:
+            Cache odpovědí pro requesty `RequestsSession` sessionů (viz `cache.ResponseCache`).
+            Pokud `None` (default), odpovědi se necachují.
+        policy:
+            Politika (timeouty, opakování, jistič, omezení počtu requestů) pro requesty `RequestsSession` sessionů
+            a pro requesty mimo ně (např. akcelerované requesty `SeleniumSession`, viz `_request()`).
+            Pokud `None`, requesty se posílají bez ní. Defaultně `ResiliencePolicy.default()`.
+            Jedna politika (a tedy i jistič) může být sdílena více `SessionManager`y na stejném serveru.
+        transport:
+            Sdílený HTTP transport (pool spojení a výchozí timeouty) pro všechny sessiony.
+            Pokud není specifikován, vytvoří se nový s velikostí poolu podle `max_sessions`.
+            Jeden transport může sdílet více `SessionManager`ů (např. pro více účtů na stejném serveru).
+        max_sessions:
+            Maximální počet sessionů jednoho typu, které `get_session_or_create()` vytvoří.
+            Pokud je `None`, počet sessionů není omezen.
+        min_idle:
+            Minimální počet volných (a již přihlášených) sessionů jednoho typu, které se udržují v poolu.
+            Pool se doplňuje na pozadí po zapůjčení sessionu daného typu, případně lze pool doplnit přes `fill_idle()`.
+        stats:
+            Slovník, který jako klíč má typ sessionu a jako hodnotu statistiky (`SessionPoolStats`) pro daný typ.
     """
 
-    def __init__(self, ref: BakalariAPI, start_auto_extend: bool = False):
-        self.__lock = Lock()
+    def __init__(
+        self,
+        ref: BakalariAPI,
+        start_auto_extend: bool = False,
+        max_sessions: int | None = 8,
+        min_idle: int = 0,
+        extend_scheduler: SessionExtendScheduler | None = None,
+        transport: Transport | None = None,
+        policy: ResiliencePolicy | None = None,
+        response_cache: ResponseCache | None = None,
+    ):
+        self.__lock = RLock()
+        self.__condition = Condition(self.__lock)
+        self.__creating: dict[type[BakalariSession], int] = {}
+        self.__filling: set[type[BakalariSession]] = set()
         self.bakalariAPI: BakalariAPI = ref
         self.sessions: utils.ListDict[BakalariSession] = utils.ListDict()
         self.start_auto_extend: bool = start_auto_extend
+        self.transport: Transport = (
+            Transport(pool_maxsize=max_sessions or 10)
+            if transport is None
+            else transport
+        )
+        self.policy: ResiliencePolicy | None = (
+            ResiliencePolicy.default() if policy is None else policy
+        )
+        self.response_cache: ResponseCache | None = response_cache
+        self.extend_scheduler: SessionExtendScheduler = (
+            SessionExtendScheduler.shared()
+            if extend_scheduler is None
+            else extend_scheduler
+        )
+        self.max_sessions: int | None = max_sessions
+        self.min_idle: int = min_idle
+        self.stats: dict[type[BakalariSession], SessionPoolStats] = {}
+        self.cookies: SharedCookieJar = SharedCookieJar()
+        self.coalesce_logins: bool = True
+        self.coalesce_requests: bool = True
+        self.login_flight: utils.SingleFlight[
+            tuple[bool, RequestsCookieJar]
+        ] = utils.SingleFlight()
+        self.request_flight: utils.SingleFlight[requests.Response] = utils.SingleFlight()
         atexit.register(self.kill_all, False)
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Vykoná request mimo `RequestsSession` (přes `transport.session`, tedy bez cookies) s aplikací `policy`."""
+        if self.policy is None:
+            return self.transport.request(self.transport.session, method, url, **kwargs)
+        return self.policy.execute(
+            method,
+            url,
+            partial(self.transport.request, self.transport.session, method, url),
+            **kwargs,
+        )
+
+    def _get_stats(self, session_class: type[BakalariSession]) -> SessionPoolStats:
+        return self.stats.setdefault(session_class, SessionPoolStats())
+
+    def _count(self, session_class: type[BakalariSession]) -> int:
+        """Vrátí počet sessionů daného typu včetně těch, které se právě vytvářejí."""
+        return len(self.sessions.get(session_class, [])) + self.__creating.get(
+            session_class, 0
+        )
+
+    def _count_idle(self, session_class: type[BakalariSession]) -> int:
+        return sum(
+            1 for session in self.sessions.get(session_class, []) if not session.busy
+        )
+
+    def _new_session(self, session_class: type[Session], set_busy: bool) -> Session:
+        """Vytvoří novou session pro slot, který byl už dříve rezervován v `__creating`."""
+        try:
+            session = session_class(self.bakalariAPI, set_busy)
+        except BaseException:
+            with self.__condition:
+                self.__creating[session_class] -= 1
+                # Rezervovaný slot je zase volný, takže může někdo z čekajících vytvořit vlastní session
+                self.__condition.notify_all()
+            raise
+        with self.__condition:
+            self.__creating[session_class] -= 1
+            self.register_session(session)
+            self._get_stats(session_class).created += 1
+        self._on_new_session(session)
+        return session
+
+    def _on_new_session(self, session: BakalariSession):
+        """Zavolá se pro každou nově přidanou (vytvořenou/obnovenou) session."""
+        if self.start_auto_extend:
+            self.extend_scheduler.add(session)
+
     def create_session(self, session_class: type[Session], set_busy=True) -> Session:
         """Vytvoří novou session daného typu a navrátí ji.
 
         Pozn.:
             Nová session bude přidána do správy tohoto SessionManageru.
+            Tato metoda nebere v potaz `max_sessions`, session se vytvoří vždy.
 
         Argumenty:
             session_class:
@@ -312,11 +863,9 @@ class SessionManager:
             set_busy:
                 Měla by být nová session označena jako "busy"? (Default: True)
         """
-        session = session_class(self.bakalariAPI, set_busy)
-        self.register_session(session)
-        if self.start_auto_extend:
-            Thread(target=session.extend_loop, daemon=True).start()
-        return session
+        with self.__lock:
+            self.__creating[session_class] = self.__creating.get(session_class, 0) + 1
+        return self._new_session(session_class, set_busy)
 
     def get_session(
         self,
@@ -340,6 +889,8 @@ class SessionManager:
             for session in self.sessions[session_class]:
                 if not (filter_busy and session.busy):
                     session.busy = set_busy
+                    if set_busy:
+                        self._get_stats(session_class).checkouts += 1
                     return session
         return None
 
@@ -348,8 +899,11 @@ class SessionManager:
         session_class: type[Session],
         set_busy: bool = True,
         filter_busy: bool = True,
+        timeout: float | None = None,
     ) -> Session:
-        """Navrátí (volnou) session daného typu. Pokud taková neexistuje, vrátí None.
+        """Navrátí (volnou) session daného typu. Pokud taková neexistuje, vytvoří novou.
+
+        Pokud je již vytvořeno `max_sessions` sessionů daného typu, čeká, dokud se některá z nich neuvolní.
 
         Argumenty:
             session_class:
@@ -358,11 +912,156 @@ class SessionManager:
                 Měla by být vrácená session označena jako "busy"? (Default: True)
             filter_busy:
                 Ignorovat zaneprázdněné sessiony při hledání? (Default: True)
+            timeout:
+                Maximální doba čekání na uvolnění sessionu v sekundách.
+                Pokud je `None`, čeká se neomezeně dlouho. (Default: None)
+
+        Raises:
+            SessionPoolTimeoutError: Pokud se do vypršení timeoutu žádná session neuvolnila.
         """
-        session = self.get_session(session_class, set_busy, filter_busy)
-        return (
-            self.create_session(session_class, set_busy) if session is None else session
-        )
+        start = None
+        with self.__condition:
+            while True:
+                session = self.get_session(session_class, set_busy, filter_busy)
+                if session is not None:
+                    break
+                if self.max_sessions is None or (
+                    self._count(session_class) < self.max_sessions
+                ):
+                    # Rezervujeme si slot, session se ale vytvoří (a přihlásí) až mimo zámek
+                    self.__creating[session_class] = (
+                        self.__creating.get(session_class, 0) + 1
+                    )
+                    break
+                if start is None:
+                    start = monotonic()
+                remaining = None if timeout is None else timeout - (monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    self._get_stats(session_class).timeouts += 1
+                    raise exceptions.SessionPoolTimeoutError(
+                        f"Během {timeout} s se neuvolnila žádná session typu {session_class.__name__}"
+                    )
+                self.__condition.wait(remaining)
+            if start is not None:
+                waited = monotonic() - start
+                stats = self._get_stats(session_class)
+                stats.waits += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+        if session is None:
+            session = self._new_session(session_class, set_busy)
+            if set_busy:
+                with self.__lock:
+                    self._get_stats(session_class).checkouts += 1
+        self._top_up(session_class)
+        return session
+
+    @contextmanager
+    def lease(
+        self, session_class: type[Session], timeout: float | None = None
+    ) -> Iterator[Session]:
+        """Zapůjčí (volnou) session daného typu, která se na konci `with` bloku zase uvolní.
+
+        Použití:
+            with bakalariAPI.session_manager.lease(RequestsSession) as session:
+                session.get(...)
+
+        Argumenty:
+            session_class:
+                Typ session, která se má zapůjčit.
+            timeout:
+                Maximální doba čekání na uvolnění sessionu v sekundách (viz `get_session_or_create()`).
+
+        Raises:
+            SessionPoolTimeoutError: Pokud se do vypršení timeoutu žádná session neuvolnila.
+        """
+        with self.get_session_or_create(session_class, timeout=timeout) as session:
+            yield session
+
+    def _try_checkout(self, session: BakalariSession) -> bool:
+        """Označí danou session jako zaneprázdněnou, pokud již zaneprázdněná není.
+
+        Returns:
+            `True`, pokud se session podařilo označit (a je tedy nutné ji pak uvolnit přes `release_session()`),
+            jinak `False`.
+        """
+        with self.__lock:
+            if session.busy:
+                return False
+            session.busy = True
+            return True
+
+    def release_session(self, session: BakalariSession):
+        """Uvolní danou session a probudí ty, kteří čekají na volnou session.
+
+        Argumenty:
+            session:
+                Session, která se uvolní.
+        """
+        with self.__condition:
+            session.busy = False
+            self.__condition.notify_all()
+
+    def fill_idle(self, session_class: type[Session]) -> int:
+        """Vytvoří (a přihlásí) tolik nových volných sessionů, aby jich bylo alespoň `min_idle`.
+
+        Počet sessionů je stále omezen `max_sessions`.
+
+        Argumenty:
+            session_class:
+                Typ sessionů, které se mají vytvořit.
+
+        Returns:
+            Počet nově vytvořených sessionů.
+        """
+        created = 0
+        while True:
+            with self.__lock:
+                if (
+                    self._count_idle(session_class)
+                    + self.__creating.get(session_class, 0)
+                    >= self.min_idle
+                ):
+                    break
+                if (
+                    self.max_sessions is not None
+                    and self._count(session_class) >= self.max_sessions
+                ):
+                    break
+                self.__creating[session_class] = (
+                    self.__creating.get(session_class, 0) + 1
+                )
+            self._new_session(session_class, False)
+            created += 1
+        return created
+
+    def _top_up(self, session_class: type[BakalariSession]):
+        """Pokud je v poolu méně než `min_idle` volných sessionů, doplní je na pozadí."""
+        if self.min_idle <= 0:
+            return
+        with self.__lock:
+            if (
+                session_class in self.__filling
+                or self._count_idle(session_class) >= self.min_idle
+            ):
+                return
+            self.__filling.add(session_class)
+        Thread(
+            target=self.__fill_idle_worker,
+            args=(session_class,),
+            daemon=True,
+            name="bakalariapi-session-pool",
+        ).start()
+
+    def __fill_idle_worker(self, session_class: type[BakalariSession]):
+        try:
+            self.fill_idle(session_class)
+        except Exception:
+            # Doplňování je jen optimalizace - pokud se nepovede, session se vytvoří až při zapůjčení
+            LOGGER.exception("Nepodařilo se doplnit pool sessionů %s", session_class)
+        finally:
+            with self.__lock:
+                self.__filling.discard(session_class)
 
     def register_session(self, session: BakalariSession):
         """Přidá danou session do správy SessionManageru.
@@ -376,7 +1075,9 @@ class SessionManager:
             session:
                 Session, která se přidá do správy SessionManageru.
         """
-        self.sessions.setdefault(type(session), []).append(session)
+        with self.__condition:
+            self.sessions.setdefault(type(session), []).append(session)
+            self.__condition.notify_all()
 
     def unregister_session(self, session: BakalariSession) -> bool:
         """Odebere danou session ze správy SessionManageru.
@@ -385,13 +1086,150 @@ class SessionManager:
             session:
                 Session, která se odebere ze správy SessionManageru.
         """
-        if type(session) in self.sessions:
-            try:
-                self.sessions[type(session)].remove(session)
-            except ValueError:
+        with self.__condition:
+            if type(session) in self.sessions:
+                try:
+                    self.sessions[type(session)].remove(session)
+                except ValueError:
+                    return False
+                self.extend_scheduler.remove(session)
+                # Uvolnil se slot, takže někdo z čekajících může vytvořit novou session
+                self.__condition.notify_all()
+                return True
+            return False
+
+    def save_state(self, path: str):
+        """Uloží stav přihlášení do souboru, aby ho šlo při dalším spuštění obnovit přes `load_state()`.
+
+        Ukládají se cookies všech `RequestsSession` sessionů, `ServerInfo` a `UserInfo`. Heslo se neukládá.
+        Jelikož soubor obsahuje přihlašovací cookies, vytváří se s právy pouze pro vlastníka.
+
+        Pozn.:
+            Pokud se sessiony po uložení odhlásí (např. přes `kill_all()` s `nice=True`), uložené cookies
+            se tím zneplatní a při obnovení se bude nutné znovu přihlásit.
+
+        Argumenty:
+            path:
+                Cesta k souboru, do kterého se stav uloží.
+        """
+        with self.__lock:
+            sessions = [
+                session
+                for session_class, lst in self.sessions.items()
+                if issubclass(session_class, RequestsSession)
+                for session in lst
+            ]
+        server_info = self.bakalariAPI.server_info
+        user_info = self.bakalariAPI.user_info
+        state = {
+            "version": STATE_VERSION,
+            "url": server_info.url,
+            "username": self.bakalariAPI.username,
+            "server_info": {
+                "version": server_info.version,
+                "version_date": None
+                if server_info.version_date is None
+                else server_info.version_date.isoformat(),
+                "evid_number": server_info.evid_number,
+            },
+            "user_info": {
+                "type": user_info.type,
+                "hash": user_info.hash,
+                "ID": user_info.ID,
+            },
+            "sessions": [
+                utils.cookies_requests2json(session.session.cookies)
+                for session in sessions
+            ],
+        }
+        # Zapisujeme do dočasného souboru, aby se při pádu nepoškodil předchozí stav; `mkstemp()` soubor vždy
+        # nově vytvoří (s právy pouze pro vlastníka), takže nepřevezme práva případného pozůstatku
+        fd, tmp_path = tempfile.mkstemp(
+            ".tmp",
+            os.path.basename(path) + ".",
+            os.path.dirname(os.path.abspath(path)),
+        )
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load_state(self, path: str) -> bool:
+        """Obnoví stav přihlášení uložený přes `save_state()`.
+
+        Stav se obnoví pouze v případě, že se shoduje URL serveru a uživatelské jméno.
+        `ServerInfo` a `UserInfo` se obnoví vždy (tzn. i když již žádná session není platná).
+        Platnost uložených sessionů se ověří přes endpoint "session_info", neplatné sessiony se zahodí.
+        Obnovených sessionů nebude více než `max_sessions`.
+
+        Argumenty:
+            path:
+                Cesta k souboru s uloženým stavem.
+
+        Returns:
+            `True`, pokud se obnovila alespoň jedna platná (přihlášená) session, jinak `False`.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        # Nejdříve se celý stav naparsuje, aby se poškozený soubor neobnovil jen napůl
+        try:
+            if (
+                not isinstance(state, dict)
+                or state.get("version") != STATE_VERSION
+                or state["url"] != self.bakalariAPI.server_info.url
+                or state["username"] != self.bakalariAPI.username
+            ):
                 return False
-            return True
-        return False
+            version = state["server_info"]["version"]
+            version_date = (
+                None
+                if state["server_info"]["version_date"] is None
+                else datetime.fromisoformat(state["server_info"]["version_date"])
+            )
+            evid_number = state["server_info"]["evid_number"]
+            user_type = state["user_info"]["type"]
+            user_hash = state["user_info"]["hash"]
+            user_ID = state["user_info"]["ID"]
+            jars = [
+                utils.cookies_json2requests(cookies) for cookies in state["sessions"]
+            ]
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        server_info = self.bakalariAPI.server_info
+        server_info.version = version
+        server_info.version_date = version_date
+        server_info.evid_number = evid_number
+        user_info = self.bakalariAPI.user_info
+        user_info.type = user_type
+        user_info.hash = user_hash
+        user_info.ID = user_ID
+
+        restored = 0
+        for jar in jars:
+            if self.max_sessions is not None and restored >= self.max_sessions:
+                break
+            session = RequestsSession(self.bakalariAPI, False, False)
+            session.session.cookies = jar
+            try:
+                valid = session.get_remaining() > 0
+            except (ValueError, KeyError):
+                # Neplatná session je většinou přesměrována na login, takže nedostaneme JSON
+                valid = False
+            if not valid:
+                session.kill(False)
+                continue
+            self.register_session(session)
+            self._on_new_session(session)
+            self.cookies.publish(session.session.cookies)
+            restored += 1
+        return restored != 0
 
     def kill_all(self, nice: bool = True, session_class: type[Session] | None = None):
         """Ukončí všechny sessiony.
@@ -403,33 +1241,36 @@ class SessionManager:
             session_class:
                 Typ sessionů, které se mají ukončit; Pokud je None, ukončí se všechny. (Default: None)
         """
-        with self.__lock:
+        with self.__condition:
             if session_class is None:
                 for sessions in self.sessions.values():
                     for session in sessions:
+                        self.extend_scheduler.remove(session)
                         session.kill(nice)
                 self.sessions = utils.ListDict()
             else:
                 for session in self.sessions[session_class]:
+                    self.extend_scheduler.remove(session)
                     session.kill(nice)
                 del self.sessions[session_class]
+            self.__condition.notify_all()
 
     def kill_dead(self, session_class: type[Session] | None = None):
-        """Ukončí všechny sessiony, které jsou již odhlášeni z Bakalářů.
+        """Ukončí všechny (volné) sessiony, které jsou již odhlášeni z Bakalářů.
 
         Argumenty:
             session_class:
                 Typ sessionů, které se mají ukončit; Pokud je None, ukončí se všechny. (Default: None)
         """
-        with self.__lock:
+        with self.__condition:
             if session_class is None:
-                for sessions in self.sessions.values():
-                    for session in sessions:
-                        if not session.is_logged():
-                            session.kill(False)
-                            self.unregister_session(session)
+                sessions = [s for lst in self.sessions.values() for s in lst]
             else:
-                for session in self.sessions[session_class]:
-                    if not session.is_logged():
-                        session.kill(False)
-                        self.unregister_session(session)
+                sessions = list(self.sessions.get(session_class, []))
+            for session in sessions:
+                # Zaneprázdněné sessiony právě někdo používá, takže je nekontrolujeme (a hlavně nezabíjíme)
+                if session.busy:
+                    continue
+                if not session.is_logged():
+                    session.kill(False)
+                    self.unregister_session(session)
@@ -0,0 +1,127 @@
+"""Modul obsahující sdílený HTTP transport pro sessiony.
+
+Tento modul primárně implementuje:
+    Transport - Sdílený pool spojení (keep-alive) a výchozí timeouty pro všechny sessiony jednoho serveru
+"""
+
+from __future__ import annotations
+
+from http.cookiejar import DefaultCookiePolicy
+from typing import Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import cancellation
+
+__all__ = ["Transport", "Timeout"]
+
+Timeout = Union[float, tuple[float, float], None]
+
+
+class _SharedHTTPAdapter(HTTPAdapter):
+    """`HTTPAdapter`, který se nezavře při zavření `requests.Session`, do které je připojen.
+
+    `requests.Session.close()` zavírá všechny své adaptéry, ale sdílený adaptér (a jeho pool spojení)
+    používají i ostatní sessiony, takže ho může zavřít pouze `Transport`.
+    """
+
+    def close(self):
+        pass
+
+    def close_pool(self):
+        super().close()
+
+
+class Transport:
+    """Sdílený HTTP transport pro všechny sessiony jednoho serveru.
+
+    Všechny sessiony, které transport používají, sdílí jeden pool spojení, takže se spojení (a TLS sessiony)
+    znovu používají a requesty neplatí za nové TCP+TLS spojení. Cookies ale zůstávají pro každou session vlastní.
+
+    Atributy:
+        adapter:
+            Sdílený `HTTPAdapter` s poolem spojení.
+        timeout:
+            Výchozí timeout pro requesty (viz parametr `timeout` v `requests` modulu),
+            tedy buď jedno číslo nebo dvojce (connect timeout, read timeout) v sekundách.
+        session:
+            `requests.Session` bez vlastních cookies pro requesty, které nepatří žádné `RequestsSession`
+            (např. kontrola běhu serveru nebo requesty "zrychlené" `SeleniumSession`).
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 8,
+        timeout: Timeout = (10, 60),
+        max_retries: int = 0,
+    ):
+        """
+        Args:
+            pool_maxsize:
+                Maximální počet spojení, která se v poolu udržují pro jeden server.
+                Měl by odpovídat maximálnímu počtu sessionů, které najednou dělají requesty.
+            timeout:
+                Výchozí timeout pro requesty.
+            max_retries:
+                Počet opakování při chybě spojení (viz `HTTPAdapter`).
+        """
+        self.adapter: _SharedHTTPAdapter = _SharedHTTPAdapter(
+            # Spojujeme se (skoro) vždy jen na jeden server, takže stačí jeden pool (resp. pár poolů kvůli přesměrováním)
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+        )
+        self.timeout: Timeout = timeout
+        self.session: requests.Session = self.new_session()
+        # Tahle session se sdílí, takže si nesmí pamatovat žádné cookies (např. z přihlášení)
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        """Připojí sdílený adaptér k dané `requests.Session` a navrátí ji."""
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def new_session(self) -> requests.Session:
+        """Vytvoří novou `requests.Session`, která používá sdílený pool spojení."""
+        return self.mount(requests.Session())
+
+    def request(
+        self, session: requests.Session, method: str, url: str, **kwargs
+    ) -> requests.Response:
+        """Vykoná request přes danou `requests.Session` s výchozím timeoutem (pokud není timeout specifikován).
+
+        Pokud je v aktuálním kontextu aktivní `cancellation.CancellationToken`, před requestem se zkontroluje
+        a timeout se omezí zbývajícím časem do jeho deadlinu.
+
+        Raises:
+            OperationCancelledError: Pokud byla operace zrušena (resp. request kvůli deadlinu nestihl doběhnout).
+        """
+        token = cancellation.current()
+        if token is None:
+            kwargs.setdefault("timeout", self.timeout)
+            return session.request(method, url, **kwargs)
+        kwargs["timeout"] = token.limit_timeout(kwargs.get("timeout", self.timeout))
+        try:
+            return session.request(method, url, **kwargs)
+        except requests.Timeout:
+            # Timeout, který jsme zkrátili kvůli deadlinu, je ve skutečnosti vypršení deadlinu
+            if token.cancelled:
+                token.check()
+            raise
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Vykoná GET request bez cookies přes `session` (tedy mimo jakoukoli `RequestsSession`)."""
+        return self.request(self.session, "GET", url, **kwargs)
+
+    def post(self, url: str, data=None, **kwargs) -> requests.Response:
+        """Vykoná POST request bez cookies přes `session` (tedy mimo jakoukoli `RequestsSession`)."""
+        return self.request(self.session, "POST", url, data=data, **kwargs)
+
+    def close(self):
+        """Zavře všechna spojení v poolu.
+
+        Transport lze používat i po zavření, spojení se případně otevřou znovu.
+        """
+        self.adapter.close_pool()
@@ -2,11 +2,27 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import re
 import sys
 import warnings
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any, Generic, TypeVar, Union, cast, get_args, overload
+from html.parser import HTMLParser
+from threading import Event, Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    TypeVar,
+    Union,
+    cast,
+    get_args,
+    overload,
+)
 
 # Pojďme si zodpovědět ozázku, proč je tu tohle?
 # Núže... Bylo nebylo, pyright zase zklamal. Teda ne že bych se divil,
@@ -41,12 +57,15 @@ if TYPE_CHECKING:
 else:
     from typing import _ProtocolMeta
 
-from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning, SoupStrainer
 from bs4.element import Tag  # Kvůli mypy - https://github.com/python/mypy/issues/10826
 from requests.cookies import RequestsCookieJar
 from selenium.webdriver.remote.webdriver import WebDriver
 from typing_extensions import TypeGuard
 
+from . import cancellation
+from .exceptions import OperationCancelledError
+
 LOGGER = logging.getLogger("bakalariapi.utils")
 
 
@@ -89,11 +108,200 @@ def line_iterator(text: str):
         prevnl = nextnl
 
 
-def parseHTML(markup: str | bytes) -> BeautifulSoup:
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_js_json(script: str, prefixes: Iterable[str]) -> dict[str, Any]:
+    """Najde v JavaScriptovém kódu JSON hodnoty, které následují za danými prefixy, a dekóduje je.
+
+    Určeno pro data, která Bakaláři vkládají do stránky jako JS přiřazení či argumenty,
+    např. `var data = [...];` (prefix "var data = ") nebo `fn({...});` (prefix "fn(").
+    Kód se prochází pouze jednou a hodnoty se dekódují přímo z něj (bez kopírování po řádcích).
+
+    Args:
+        script:
+            JavaScriptový kód.
+        prefixes:
+            Prefixy, za kterými (případně po mezerách) začíná JSON hodnota.
+
+    Returns:
+        Slovník, kde klíč je prefix a hodnota dekódovaná JSON hodnota za jeho prvním výskytem.
+        Prefixy, které v kódu nejsou (nebo za nimi není validní JSON), ve slovníku nejsou.
+    """
+    prefixes = list(prefixes)
+    output: dict[str, Any] = {}
+    pattern = re.compile("|".join(re.escape(prefix) for prefix in prefixes))
+    position = 0
+    while len(output) != len(prefixes):
+        match = pattern.search(script, position)
+        if match is None:
+            break
+        position = match.end()
+        if match.group() in output:
+            continue
+        while position < len(script) and script[position].isspace():
+            position += 1
+        try:
+            output[match.group()], position = _JSON_DECODER.raw_decode(
+                script, position
+            )
+        except json.JSONDecodeError:
+            pass
+    return output
+
+
+PARSER_BACKENDS = ("lxml", "html.parser")
+"""Podporované parsery (backendy) pro `parseHTML()` v pořadí, v jakém se preferují."""
+
+
+def _parser_backend_available(backend: str) -> bool:
+    if backend == "html.parser":
+        return True
+    try:
+        __import__(backend)
+    except ImportError:
+        return False
+    return True
+
+
+def available_parser_backends() -> list[str]:
+    """Vrátí parsery (backendy) pro `parseHTML()`, které jsou k dispozici (tzn. jsou nainstalované)."""
+    return [x for x in PARSER_BACKENDS if _parser_backend_available(x)]
+
+
+_parser_backend: str = available_parser_backends()[0]
+
+
+def get_parser_backend() -> str:
+    """Vrátí parser (backend), který se používá v `parseHTML()`."""
+    return _parser_backend
+
+
+def set_parser_backend(backend: str | None):
+    """Nastaví parser (backend), který se používá v `parseHTML()`.
+
+    Args:
+        backend:
+            Název parseru (viz `PARSER_BACKENDS`). Pokud `None`, vybere se nejrychlejší dostupný parser
+            (tzn. "lxml", pokud je nainstalovaný, jinak "html.parser").
+
+    Raises:
+        ValueError: Pokud daný parser není podporován nebo není nainstalován.
+    """
+    global _parser_backend
+    if backend is None:
+        _parser_backend = available_parser_backends()[0]
+        return
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Parser '{backend}' není podporován")
+    if not _parser_backend_available(backend):
+        raise ValueError(f"Parser '{backend}' není nainstalován")
+    _parser_backend = backend
+
+
+def parseHTML(
+    markup: str | bytes,
+    backend: str | None = None,
+    parse_only: SoupStrainer | None = None,
+) -> BeautifulSoup:
+    """Naparsuje HTML.
+
+    Pro parsování se použije "lxml" (pokud je nainstalovaný), který je výrazně rychlejší, jinak "html.parser"
+    ze standardní knihovny (viz `set_parser_backend()`). Parsery se shodují ve všem, co BakalářiAPI z HTML čte.
+
+    Args:
+        markup:
+            HTML, které se má naparsovat.
+        backend:
+            Parser, který se má použít; Pokud `None`, použije se nastavený parser (viz `get_parser_backend()`).
+        parse_only:
+            Pokud není `None`, strom se postaví pouze z částí, které odpovídají danému `SoupStrainer`u
+            (což je rychlejší a paměťově úspornější než stavět celý strom).
+    """
     with warnings.catch_warnings():
         # viz docstring warningu
         warnings.simplefilter("ignore", MarkupResemblesLocatorWarning)
-        return BeautifulSoup(markup, "html.parser")
+        return BeautifulSoup(
+            markup,
+            _parser_backend if backend is None else backend,
+            parse_only=parse_only,
+        )
+
+
+# Elementy, které nemají obsah ani konečný tag (lxml pro ně i tak hlásí konec, `HTMLParser` ne)
+VOID_ELEMENTS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+
+
+class _HTMLParserFeeder(HTMLParser):
+    """`HTMLParser`, který (stejně jako lxml) předává události target objektu."""
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        # Atributy bez hodnoty má lxml jako prázdný string, `HTMLParser` jako `None`
+        self.target.start(tag, {k: "" if v is None else v for k, v in attrs})
+        if tag in VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag not in VOID_ELEMENTS:
+            self.target.end(tag)
+
+    def handle_data(self, data: str):
+        self.target.data(data)
+
+    def close(self):
+        super().close()
+        return self.target.close()
+
+
+def incremental_parser(target, backend: str | None = None):
+    """Vytvoří inkrementální HTML parser, který lze krmit po částech (např. tak, jak přichází ze serveru).
+
+    Parser nestaví žádný strom, ale rovnou volá metody daného target objektu:
+        start(tag: str, attrs: dict[str, str]) - začátek elementu
+        end(tag: str) - konec elementu (hlásí se i pro elementy bez konečného tagu, viz `VOID_ELEMENTS`)
+        data(data: str) - text (může být rozdělen do více volání)
+        close() - konec dokumentu; Co vrátí, vrátí i `close()` parseru
+
+    Args:
+        target:
+            Objekt, kterému parser předává události.
+        backend:
+            Parser, který se má použít; Pokud `None`, použije se nastavený parser (viz `get_parser_backend()`).
+
+    Returns:
+        Parser s metodami `feed(data: str)` a `close()`.
+    """
+    if (_parser_backend if backend is None else backend) == "lxml":
+        from lxml import etree
+
+        return etree.HTMLParser(target=target)
+    return _HTMLParserFeeder(target)
 
 
 def bs_get_text(soup: Tag) -> str:
@@ -310,6 +518,115 @@ def cookies_requests2webdriver(cookies: RequestsCookieJar) -> list[dict[str, Any
     ]
 
 
+def cookies_requests2json(cookies: RequestsCookieJar) -> list[dict[str, Any]]:
+    """Převede `RequestsCookieJar` do formátu, který lze uložit jako JSON (viz `cookies_json2requests()`)."""
+    return [
+        {
+            "name": cookie.name,
+            "value": cookie.value,
+            "path": cookie.path,
+            "domain": cookie.domain,
+            "secure": cookie.secure,
+            "expires": cookie.expires,
+        }
+        for cookie in cookies
+    ]
+
+
+def cookies_json2requests(cookies: list[dict[str, Any]]) -> RequestsCookieJar:
+    """Převede cookies z formátu vytvořeného `cookies_requests2json()` zpět na `RequestsCookieJar`."""
+    jar = RequestsCookieJar()
+    for cookie in cookies:
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            path=cookie["path"],
+            domain=cookie["domain"],
+            secure=cookie["secure"],
+            expires=cookie["expires"],
+        )
+    return jar
+
+
+class _FlightCall(Generic[T0]):
+    """Jedno probíhající volání v `SingleFlight`."""
+
+    def __init__(self):
+        self.event: Event = Event()
+        self.result: T0 | None = None
+        self.exception: Exception | None = None
+        # Zda volání doběhlo (s výsledkem nebo sdílenou výjimkou); Pokud ne, čekající volání se vykonají znovu
+        self.done: bool = False
+
+
+class SingleFlight(Generic[T0]):
+    """Sloučí souběžná volání se stejným klíčem do jednoho ("single flight").
+
+    Pokud pro daný klíč již nějaké volání probíhá, další volání se nevykonají, ale počkají na to probíhající
+    a dostanou stejný výsledek (resp. stejnou výjimku). Výsledek se nikam neukládá - jakmile volání skončí,
+    další volání se stejným klíčem se opět vykoná.
+
+    Čekajícím voláním se předávají pouze výjimky typu `Exception` mimo `OperationCancelledError`
+    (a `DeadlineExceededError`), která vznikla z tokenu (viz `cancellation`) vykonávajícího volání. Ostatní výjimky
+    (např. `KeyboardInterrupt`) se týkají pouze threadu vykonávajícího volání - čekající volání se v takovém případě
+    vykoná znovu. Čekající volání se během čekání řídí vlastním tokenem.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__calls: dict[Hashable, _FlightCall[T0]] = {}
+
+    def do(self, key: Hashable, func: Callable[[], T0]) -> tuple[T0, bool]:
+        """Vykoná `func`, pokud pro daný klíč již neprobíhá jiné volání, jinak počká na jeho výsledek.
+
+        Args:
+            key:
+                Klíč, podle kterého se volání slučují.
+            func:
+                Funkce, která se má vykonat.
+
+        Returns:
+            Dvojce (výsledek, sdílený), kde "sdílený" je `True`, pokud výsledek pochází z jiného (souběžného) volání.
+
+        Raises:
+            OperationCancelledError: Pokud byl během čekání zrušen token aktuálního kontextu.
+        """
+        while True:
+            with self.__lock:
+                call = self.__calls.get(key)
+                leader = call is None
+                if call is None:
+                    call = _FlightCall()
+                    self.__calls[key] = call
+            if leader:
+                break
+            token = cancellation.current()
+            if token is None:
+                call.event.wait()
+            else:
+                while not call.event.wait(0.1):
+                    token.check()
+            if not call.done:
+                continue
+            if call.exception is not None:
+                raise call.exception
+            return cast(T0, call.result), True
+        try:
+            call.result = func()
+            call.done = True
+        except OperationCancelledError:
+            raise
+        except Exception as e:
+            call.exception = e
+            call.done = True
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.event.set()
+        return cast(T0, call.result), False
+
+
 def is_typed_dict(data_dict: Any, typed_dict: type[T0]) -> TypeGuard[T0]:
     # Měl by tu být i paramter "type_check: bool", ale jelikož `typing` modul nemá žádnou
     # metodu, která by ověřila správnost typu, tak by bylo potřeba napsat vlastní typechecker
@@ -8,20 +8,20 @@ import json
 import logging
 import logging.config
 import os
-import threading
 import time
 import traceback
 import warnings
 import webbrowser
 from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
-from typing import IO, TYPE_CHECKING, Any, Callable, cast
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, cast
 
 import bakalariapi
 import platformdirs
 import requests
 import rich
 from bakalariapi.utils import cs_timedelta, parseHTML
+from bs4 import BeautifulSoup
 from prompt_toolkit.input import create_input
 from prompt_toolkit.key_binding import KeyPress
 from prompt_toolkit.keys import Keys
@@ -47,6 +47,7 @@ dirs = platformdirs.PlatformDirs(
 )
 CONFIG_FILE = "config.json"
 TIME_FILE = "_lasttime"
+STATE_FILE = "_state"
 
 
 @dataclass
@@ -63,6 +64,7 @@ class Args:
     auto_run: bool = True
     no_init: bool = False
     no_import: bool = False
+    no_state: bool = False
     no_config: bool = False
 
     commands: list[str] = field(default_factory=list)
@@ -147,6 +149,14 @@ def partial_init_notice():
     )
 
 
+def revalidation_notice(type_: type[bakalariapi.objects.BakalariObject]):
+    if api.is_revalidating(type_):
+        rich_print(
+            "Zobrazená data jsou zastaralá, nová se načítají na pozadí. Pro čerstvá data můžete použít parametr \"-f\".",
+            color="yellow",
+        )
+
+
 def dialog_ano_ne(
     text: str = "", default: bool | None = None, color: str | None = None
 ) -> bool:
@@ -394,6 +404,8 @@ def disable_ssl():
     bakalariapi.sessions.RequestsSession.__init__ = patch(
         bakalariapi.sessions.RequestsSession.__init__
     )
+    # Requesty mimo `RequestsSession` (např. "zrychlené" requesty `SeleniumSession`) jdou přes sdílenou session transportu
+    api.session_manager.transport.session.verify = False
     # Když nastavíme `verify` na `False` (v `requests` modulu), `urllib3` si začne stěžovat
     warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
@@ -457,13 +469,27 @@ def Init() -> bool:
             args.password = ""
         api.password = args.password
 
+    restored = False
+    if not args.no_state:
+        try:
+            restored = api.session_manager.load_state(get_io_filepath(STATE_FILE))
+        except requests.exceptions.RequestException:
+            # Server nejspíše neběží, což se zjistí (a vyřeší) až při kontrole přihlašovacích údajů
+            pass
+
     try:
-        rich_print(
-            f"Kontrola stavu serveru a přihlašovacích údajů pro uživatele [cyan]{api.username}[/cyan]...",
-            highlight=False,
-        )
+        if restored:
+            rich_print(
+                f"Obnoveno přihlášení uživatele [cyan]{api.username}[/cyan] z minulého spuštění",
+                highlight=False,
+            )
+        else:
+            rich_print(
+                f"Kontrola stavu serveru a přihlašovacích údajů pro uživatele [cyan]{api.username}[/cyan]...",
+                highlight=False,
+            )
         try:
-            if not api.is_login_valid():
+            if not restored and not api.is_login_valid():
                 rich_print("Přihlašovací údaje jsou neplatné", color="red")
                 partial_init_mode()
                 return False
@@ -493,6 +519,11 @@ def Init() -> bool:
         partial_init_mode()
         return False
     rich_print("Server běží a přihlašovací údaje jsou správné", color="green")
+    if restored and api.server_info.version is not None:
+        # Informace o serveru a uživateli jsou také již obnovené, takže není potřeba volat `api.init()`
+        print("Nastaveno:")
+        ServerInfo()
+        return True
     print("Nastavuji...")
     try:
         with warnings.catch_warnings():
@@ -528,47 +559,39 @@ def ServerInfo():
 
 
 def Command_Komens(limit: int | None = None, force_fresh: bool = False):
-    def fresh() -> list[bakalariapi.Komens]:
-        if api.is_partial_init:
-            partial_init_notice()
-            return []
-        output: list[bakalariapi.Komens] = []
-        with Progress() as progress:
-            task = RichTask(
-                progress, progress.add_task("Získávání zpráv", start=False, total=0)
-            )
-            unresolved = api._parse(
-                bakalariapi.modules.komens.getter_komens_ids(api)
-            ).get(bakalariapi.UnresolvedID)[:limit]
-            task.update(total=len(unresolved))
-            for unresolved_id in unresolved:
-                output.append(api._resolve(unresolved_id).get(bakalariapi.Komens)[0])
-                task.update(advance=1)
-
-        return output
-
-    if force_fresh:
-        zpravy = fresh()
-    else:
+    zpravy: Iterable[bakalariapi.Komens] = []
+    length = 0
+
+    def set_length(completed: int, total: int):
+        nonlocal length
+        length = total
+
+    if not force_fresh:
         zpravy = api.get_komens(bakalariapi.GetMode.CACHED)
-        if len(zpravy) == 0:
+        length = len(zpravy)
+        if length == 0:
             print("Žádné zprávy v Lootingu, zkouším načíst ze serveru")
-            zpravy = fresh()
+    if force_fresh or length == 0:
+        if api.is_partial_init:
+            partial_init_notice()
+            return
+        print("Získávám zprávy...")
+        # Zprávy se zobrazují hned, jak se načtou (zbytek se načítá na pozadí)
+        zpravy = api.iter_komens(limit=limit, progress=set_length)
 
-    length = len(zpravy)
-    if length == 0:
-        print("Nebyly nalezeny žádné aktualní schůzky")
-        return
-    cls()
-    count = 1
+    count = 0
     for zprava in zpravy:
+        count += 1
+        if count == 1:
+            cls()
         try:
             show(zprava, f"*** Zpráva {count} z {length} ***")
-            count += 1
             cls()
         except KeyboardInterrupt:
             print("\n")
             break
+    if count == 0:
+        print("Nebyly nalezeny žádné aktualní zprávy")
 
 
 def Command_Znamky(force_fresh: bool = False):
@@ -578,12 +601,13 @@ def Command_Znamky(force_fresh: bool = False):
         znamky = api.get_grades(
             bakalariapi.GetMode.FRESH
             if force_fresh
-            else bakalariapi.GetMode.CACHED_OR_FRESH
+            else bakalariapi.GetMode.STALE_WHILE_REVALIDATE
         )
     except bakalariapi.exceptions.PartialInitError:
         partial_init_notice()
         return
 
+    revalidation_notice(bakalariapi.Grade)
     length = len(znamky)
     print(f"Známky získány ({length}), zobrazuji...")
     cls()
@@ -599,46 +623,39 @@ def Command_Znamky(force_fresh: bool = False):
 
 
 def Command_Schuzky(force_fresh: bool = False):
-    def fresh():
-        if api.is_partial_init:
-            partial_init_notice()
-            return []
-        output = []
-        with Progress() as progress:
-            task = RichTask(
-                progress, progress.add_task("Získávání schůzek", start=False, total=0)
-            )
-            unresolved = api._parse(
-                bakalariapi.modules.meetings.getter_future_meetings_ids(api)
-            ).get(bakalariapi.UnresolvedID)
-            task.update(total=len(unresolved))
-            for unresolved_id in unresolved:
-                output.append(api._resolve(unresolved_id).get(bakalariapi.Meeting)[0])
-                task.update(advance=1)
-        return output
-
-    if force_fresh:
-        schuzky = fresh()
-    else:
+    schuzky: Iterable[bakalariapi.Meeting] = []
+    length = 0
+
+    def set_length(completed: int, total: int):
+        nonlocal length
+        length = total
+
+    if not force_fresh:
         schuzky = api.get_meetings(bakalariapi.GetMode.CACHED)
-        if len(schuzky) == 0:
+        length = len(schuzky)
+        if length == 0:
             print("Žádné schůzky v Lootingu, zkouším načíst ze serveru")
-            schuzky = fresh()
+    if force_fresh or length == 0:
+        if api.is_partial_init:
+            partial_init_notice()
+            return
+        print("Získávám schůzky...")
+        # Schůzky se zobrazují hned, jak se načtou (zbytek se načítá na pozadí)
+        schuzky = api.iter_meetings(progress=set_length)
 
-    length = len(schuzky)
-    if length == 0:
-        print("Nebyly nalezeny žádné aktualní schůzky")
-        return
-    cls()
-    count = 1
+    count = 0
     for schuzka in schuzky:
+        count += 1
+        if count == 1:
+            cls()
         try:
             show(schuzka, f"*** Schůzka {count} z {length} ***")
-            count += 1
             cls()
         except KeyboardInterrupt:
             print("\n")
             break
+    if count == 0:
+        print("Nebyly nalezeny žádné aktualní schůzky")
 
 
 def Command_Studenti(force_fresh: bool = False):
@@ -648,12 +665,13 @@ def Command_Studenti(force_fresh: bool = False):
         studenti = api.get_students(
             bakalariapi.GetMode.FRESH
             if force_fresh
-            else bakalariapi.GetMode.CACHED_OR_FRESH
+            else bakalariapi.GetMode.STALE_WHILE_REVALIDATE
         )
     except bakalariapi.exceptions.PartialInitError:
         partial_init_notice()
         return
 
+    revalidation_notice(bakalariapi.Student)
     length = len(studenti)
     print(f"Studenti získáni, počet studentů je {length}")
     try:
@@ -686,14 +704,14 @@ def Command_Ukoly(fast: bool = False, force_fresh: bool = False):
             ukoly = api.get_homeworks(
                 bakalariapi.GetMode.FRESH
                 if force_fresh
-                else bakalariapi.GetMode.CACHED_OR_FRESH,
+                else bakalariapi.GetMode.STALE_WHILE_REVALIDATE,
                 fast_mode=True,
             )
         else:
             ukoly = api.get_homeworks(
                 bakalariapi.GetMode.FRESH
                 if force_fresh
-                else bakalariapi.GetMode.CACHED_OR_FRESH,
+                else bakalariapi.GetMode.STALE_WHILE_REVALIDATE,
                 fast_mode=False,
                 unfinished_only=False,
                 only_first_page=False,
@@ -702,6 +720,7 @@ def Command_Ukoly(fast: bool = False, force_fresh: bool = False):
         partial_init_notice()
         return
 
+    revalidation_notice(bakalariapi.Homework)
     hotove = 0
     nehotove = 0
     for ukol in ukoly:
@@ -737,6 +756,11 @@ def Command_Ukoly(fast: bool = False, force_fresh: bool = False):
 
 def Command_Konec(nice: bool = True, export_data: bool = True):
     shell_instance.stop_loop()
+    if not args.no_state and not api.is_partial_init:
+        os.makedirs(dirs.user_data_dir, exist_ok=True)
+        api.session_manager.save_state(get_io_filepath(STATE_FILE))
+        # Uložené sessiony nesmíme odhlásit, jinak by se uložený stav nedal obnovit
+        nice = False
     api.kill(nice)
     if export_data:
         with get_io_file("main", True) as f:
@@ -972,6 +996,179 @@ def TestHW():
         print("Konečná ravděpodobnost úspěšnosti je %.2f%%" % probrallity)
 
 
+def TestParsers():
+    backends = bakalariapi.utils.available_parser_backends()
+    if len(backends) < 2:
+        rich_print(
+            f"K dispozici je pouze parser '{backends[0]}', pro porovnání nainstalujte lxml",
+            color="yellow",
+        )
+
+    def strip_date(data: Any) -> Any:
+        # `_date` je čas vytvoření objektu, takže se mezi parsery (logicky) liší
+        if isinstance(data, dict):
+            return {k: strip_date(v) for k, v in data.items() if k != "_date"}
+        if isinstance(data, list):
+            return [strip_date(x) for x in data]
+        return data
+
+    def parse_stream(
+        getter_output: bakalariapi.looting.GetterOutput, backend: str
+    ) -> bakalariapi.looting.ResultSet:
+        # Stránku pošleme streamovým parserům po částech, stejně jako by přicházela ze serveru
+        raw = cast(bytes, getter_output.raw)
+        result = bakalariapi.looting.ResultSet()
+        for result_set in bakalariapi.bakalari._parse_stream(
+            bakalariapi.looting.GetterOutput.from_stream(
+                getter_output.endpoint,
+                BeautifulSoup,
+                (raw[i : i + 64 * 1024] for i in range(0, len(raw), 64 * 1024)),
+                parseHTML,
+            ),
+            False,
+            backend,
+        ):
+            result.merge(result_set)
+        return result
+
+    def parse(
+        getter_output: bakalariapi.looting.GetterOutput, backend: str, mode: str
+    ) -> tuple[list, float]:
+        raw = cast(bytes, getter_output.raw)
+        # Bereme nejlepší z několika pokusů, ať měření neovlivní "zahřívání" (a jiné procesy)
+        duration = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            if mode == "stream":
+                result = parse_stream(getter_output, backend)
+            else:
+                result = bakalariapi.bakalari._parse(
+                    bakalariapi.looting.GetterOutput(
+                        getter_output.endpoint,
+                        bakalariapi.bakalari._parse_html(
+                            getter_output.endpoint, raw, backend
+                        )
+                        if mode == "výběr"
+                        else parseHTML(raw, backend),
+                        getter_output.raw,
+                    )
+                )
+            duration = min(duration, time.perf_counter() - start)
+        return (
+            [
+                strip_date(bakalariapi.serialization.serialize(o, True))
+                for objs in result.data.values()
+                for o in objs
+            ],
+            duration,
+        )
+
+    print("Získávám stránky...")
+    pages = {
+        "známky": bakalariapi.modules.grades.getter(api, datetime(1, 1, 1)),
+        "úkoly": bakalariapi.modules.homeworks.getter_fast(api),
+        "komens": bakalariapi.modules.komens.getter_komens_ids(
+            api, datetime(1953, 1, 1), datetime.today() + timedelta(1)
+        ),
+        "schůzky": bakalariapi.modules.meetings.getter_future_meetings_ids(api),
+    }
+    mismatches = 0
+    for name, getter_output in pages.items():
+        # Referencí je celý strom z "html.parser", tedy to, co se parsovalo vždy
+        modes = ["", "výběr"]
+        if getter_output.endpoint in bakalariapi.bakalari._stream_parsers:
+            modes.append("stream")
+        results = {
+            f"{backend}{f' ({mode})' if mode else ''}": parse(
+                getter_output, backend, mode
+            )
+            for mode in modes
+            for backend in reversed(backends)
+        }
+        reference_backend, (reference, _) = next(iter(results.items()))
+        line = f"{name} ({len(cast(bytes, getter_output.raw)) // 1024} KB, {len(reference)} objektů):"
+        for backend, (output, duration) in results.items():
+            line += f" {backend} {duration * 1000:.1f} ms;"
+            if output != reference:
+                mismatches += 1
+                rich_print(
+                    f"Parser '{backend}' se u stránky '{name}' neshoduje s parserem '{reference_backend}'",
+                    color="red",
+                )
+        print(line)
+    return mismatches
+
+
+def TestStream():
+    def parse(raw: bytes, endpoint: str, backend: str, stream: bool) -> str:
+        # Výsledek (případně typ výjimky) jako text, ať jde porovnat i selhání
+        try:
+            if stream:
+                result = bakalariapi.looting.ResultSet()
+                for result_set in bakalariapi.bakalari._parse_stream(
+                    bakalariapi.looting.GetterOutput.from_stream(
+                        endpoint,
+                        BeautifulSoup,
+                        (raw[i : i + 1024] for i in range(0, len(raw), 1024)),
+                        parseHTML,
+                    ),
+                    False,
+                    backend,
+                ):
+                    result.merge(result_set)
+            else:
+                result = bakalariapi.bakalari._parse(
+                    bakalariapi.looting.GetterOutput(
+                        endpoint, parseHTML(raw, backend), raw
+                    )
+                )
+        except Exception as e:
+            return type(e).__name__
+        return repr(
+            sorted(
+                (type(o).__name__, o.ID)
+                for objs in result.data.values()
+                for o in objs
+            )
+        )
+
+    print("Získávám stránky...")
+    pages = {
+        "známky": bakalariapi.modules.grades.getter(api, datetime(1, 1, 1)),
+        "komens": bakalariapi.modules.komens.getter_komens_ids(
+            api, datetime(1953, 1, 1), datetime.today() + timedelta(1)
+        ),
+    }
+    # Poškozené varianty stránek; Streamový parser musí selhat (nebo uspět) stejně jako normální parser
+    breakages: dict[str, list[tuple[bytes, bytes]]] = {
+        "komens": [
+            (b'id="message_list_content"', b'id="message_list"'),
+            (b"data-idmsg", b"data-id"),
+            (b"<table", b"<div"),
+            (b"<ul", b"<ol"),
+        ],
+    }
+    mismatches = 0
+    for name, getter_output in pages.items():
+        raw = cast(bytes, getter_output.raw)
+        variants = [("", raw)] + [
+            (f" ({old.decode()} => {new.decode()})", raw.replace(old, new))
+            for old, new in breakages.get(name, [])
+        ]
+        for variant, data in variants:
+            for backend in bakalariapi.utils.available_parser_backends():
+                reference = parse(data, getter_output.endpoint, backend, False)
+                output = parse(data, getter_output.endpoint, backend, True)
+                if output != reference:
+                    mismatches += 1
+                    rich_print(
+                        f"Streamový parser ({backend}) se u stránky '{name}{variant}' neshoduje s normálním parserem",
+                        color="red",
+                    )
+    print(f"Neshod: {mismatches}")
+    return mismatches
+
+
 ##################################################
 #####                MAIN                    #####
 ##################################################
@@ -1050,6 +1247,13 @@ def main():
         dest="no_import",
         default=None,
     )
+    parser.add_argument(
+        "--no-state",
+        help="Pokud je tato flaga přítomna, nebude se obnovovat (ani ukládat) stav přihlášení z minulého spuštění",
+        action="store_true",
+        dest="no_state",
+        default=None,
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -1148,6 +1352,8 @@ def main():
         )
 
     api = bakalariapi.BakalariAPI(args.url, args.username, args.password, selenium)
+    # Opakované příkazy (a souběžné úlohy) tak během chvíle nestahují stejné stránky znovu
+    api.session_manager.response_cache = bakalariapi.cache.ResponseCache()
 
     successful_init = False
     if not args.no_init:
@@ -1185,51 +1391,14 @@ def main():
     if args.auto_run:
         if successful_init:
 
-            def task_ukoly(api: bakalariapi.BakalariAPI, task: RichTask):
-                length = len(
-                    api.get_homeworks(bakalariapi.GetMode.FRESH, fast_mode=True)
-                )
-                task.update(total=length, completed=length)
-
-            def task_komens(api: bakalariapi.BakalariAPI, task: RichTask):
-                unresolved = api._parse(
-                    bakalariapi.modules.komens.getter_komens_ids(
-                        api,
-                        from_date=None if lasttime is None else lasttime - timedelta(5),
-                    )
-                ).get(bakalariapi.UnresolvedID)
-                task.update(total=len(unresolved))
-                task.start()
-                for unresolved_id in unresolved:
-                    api._resolve(unresolved_id)
-                    task.update(advance=1)
-
-            def task_znamky(api: bakalariapi.BakalariAPI, task: RichTask):
-                length = len(api.get_all_grades())
-                task.update(total=length, completed=length)
-
-            def task_schuzky(api: bakalariapi.BakalariAPI, task: RichTask):
-                unresolved = api._parse(
-                    bakalariapi.modules.meetings.getter_future_meetings_ids(api)
-                ).get(bakalariapi.UnresolvedID)
-                task.update(total=len(unresolved))
-                task.start()
-                for unresolved_id in unresolved:
-                    api._resolve(unresolved_id)
-                    task.update(advance=1)
-
-            @dataclass
-            class Task:
-                description: str
-                function: Callable[[bakalariapi.BakalariAPI, RichTask], None]
-                start: bool = True
-
-            tasks: list[Task] = [
-                Task("Získání Komens zpráv", task_komens, False),
-                Task("Získání schůzek", task_schuzky, False),
-                Task("Získání úkolů", task_ukoly),
-                Task("Získání známek", task_znamky),
-            ]
+            # Komens zprávy, schůzky a známky se synchronizují inkrementálně (viz `Looting.cursors`),
+            # takže se (kromě prvního spuštění) načítají jen nová data
+            tasks: dict[type[bakalariapi.BakalariObject], str] = {
+                bakalariapi.Komens: "Získání Komens zpráv",
+                bakalariapi.Meeting: "Získání schůzek",
+                bakalariapi.Homework: "Získání úkolů",
+                bakalariapi.Grade: "Získání známek",
+            }
 
             def autorun():
                 # Zkusil jsem implementovat vlastní řešení pro 0-length progress bary,
@@ -1266,25 +1435,27 @@ def main():
                     "{task.completed}/{task.total}",
                     TimeRemainingColumn(),
                 ) as progress:
-                    threads: list[threading.Thread] = []
-                    for task in tasks:
-                        thread = threading.Thread(
-                            target=task.function,
-                            args=(
-                                api,
-                                RichTask(
-                                    progress,
-                                    progress.add_task(
-                                        task.description, start=task.start, total=0
-                                    ),
-                                ),
-                            ),
+                    rich_tasks = {
+                        type_: RichTask(
+                            progress, progress.add_task(description, total=0)
                         )
-                        thread.start()
-                        threads.append(thread)
-                    for thread in threads:
-                        thread.join()
+                        for type_, description in tasks.items()
+                    }
+                    api.fetch(
+                        list(tasks),
+                        progress=lambda type_, completed, total: rich_tasks[
+                            type_
+                        ].update(total=total, completed=completed),
+                        incremental=True,
+                    )
 
+            komens_endpoint = bakalariapi.bakalari.Endpoint.KOMENS
+            if (
+                lasttime != datetime.max
+                and api.looting.get_cursor(komens_endpoint) is None
+            ):
+                # Bez kurzoru (např. s čistou looting instancí) navážeme na poslední spuštění shellu
+                api.looting.set_cursor(komens_endpoint, lasttime)
             print()
             autorun()
         else:
@@ -1304,9 +1475,9 @@ def main():
         )
 
         first = True
-        for znamka in filter(
+        for znamka in api.looting.query(
+            bakalariapi.Grade,
             lambda x: min(lasttime, today - timedelta(5)) < x.date1 and x.grade != "?",
-            api.looting.get(bakalariapi.Grade),
         ):
             if first:
                 first = False
@@ -1319,9 +1490,7 @@ def main():
         nothing &= first
 
         first = True
-        for komens in filter(
-            lambda x: x.grade == "?", api.looting.get(bakalariapi.Grade)
-        ):
+        for komens in api.looting.query(bakalariapi.Grade, grade="?"):
             if first:
                 first = False
                 print("Nadcházející klasifikace:")
@@ -1331,10 +1500,10 @@ def main():
         nothing &= first
 
         first = True
-        for schuzka in filter(
+        for schuzka in api.looting.query(
+            bakalariapi.Meeting,
             lambda x: today_aware < x.start_time
             and x.start_time < today_aware + timedelta(2),
-            api.looting.get(bakalariapi.Meeting),
         ):
             if first:
                 first = False
@@ -1345,7 +1514,7 @@ def main():
         nothing &= first
 
         first = True
-        for ukol in filter(lambda x: not x.done, api.looting.get(bakalariapi.Homework)):
+        for ukol in api.looting.query(bakalariapi.Homework, done=False):
             if first:
                 first = False
                 print("Úkoly:")
@@ -1355,10 +1524,10 @@ def main():
         nothing &= first
 
         first = True
-        for znamka in filter(
+        for znamka in api.looting.query(
+            bakalariapi.Komens,
             lambda x: (x.need_confirm and not x.confirmed)
             or min(lasttime, today - timedelta(5)) < x.time,
-            api.looting.get(bakalariapi.Komens),
         ):
             if first:
                 first = False